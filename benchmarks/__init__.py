@@ -0,0 +1,4 @@
+"""
+Benchmarks
+端到端性能基准 - 在仓库根目录运行: python -m benchmarks.tick_loop
+"""
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Algorithm Benchmark
+调度算法对比 - 在同一流量上运行多个控制器，比较等待时间、系统时间和完成率
+
+在仓库根目录运行::
+
+    python -m benchmarks.algorithms --quick
+    python -m benchmarks.algorithms --building 4x20 --density 0.1 --seeds 5
+    python -m benchmarks.algorithms --traffic down_peak --density 0.03 --algorithm look_v2 --algorithm look_v2_bounce
+
+乘客在前 arrival_ticks 个tick内到达，之后继续运行到 duration 以便送完乘客。
+模拟器的指标只统计已送达的乘客；这里另外把未送达的乘客按运行结束时刻截断计入
+（censored），避免丢下难送的乘客反而指标更好。
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from elevator.client.base_controller import ElevatorController
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.models import TrafficPattern
+from elevator.core.simulator import (
+    ElevatorSimulation,
+    create_down_peak_traffic_pattern,
+    create_random_traffic_pattern,
+)
+
+BUILDINGS: List[Tuple[int, int]] = [(2, 6), (3, 10), (4, 20), (8, 50)]
+QUICK_BUILDINGS: List[Tuple[int, int]] = [(2, 6), (3, 10)]
+# 流量密度：每部电梯每tick平均到达的乘客数
+DENSITIES: List[float] = [0.1, 0.15]
+
+ControllerFactory = Callable[[], ElevatorController]
+# 流量生成函数：(电梯数, 楼层数, 到达tick数, 每tick到达率, 随机种子) -> 流量
+TRAFFIC_PATTERNS: Dict[str, Callable[..., TrafficPattern]] = {
+    "random": create_random_traffic_pattern,
+    "down_peak": create_down_peak_traffic_pattern,
+}
+
+
+def _look_v2() -> ElevatorController:
+    from controller import LookV2Controller
+
+    return LookV2Controller(debug=False, use_parking=True)
+
+
+def _look_v2_bounce() -> ElevatorController:
+    from controller import LookV2Controller
+
+    return LookV2Controller(debug=False, use_parking=False)
+
+
+def _look_v2_no_en_route() -> ElevatorController:
+    from controller import LookV2Controller
+
+    return LookV2Controller(debug=False, en_route_pickup=False)
+
+
+def _optimal_look() -> ElevatorController:
+    from elevator.client_examples.optimal_look import OptimalLookController
+
+    return OptimalLookController(debug=False)
+
+
+ALGORITHMS: Dict[str, ControllerFactory] = {"look_v2": _look_v2, "optimal_look": _optimal_look}
+# 不在默认对比中的变体，可用 --algorithm 指定
+VARIANTS: Dict[str, ControllerFactory] = {
+    "look_v2_bounce": _look_v2_bounce,
+    "look_v2_no_en_route": _look_v2_no_en_route,
+}
+
+
+@dataclass
+class AlgorithmCase:
+    """一个对比用例"""
+
+    elevators: int
+    floors: int
+    density: float
+    arrival_ticks: int = 200
+    duration: int = 300
+    seed: int = 0
+    traffic: str = "random"
+
+    @property
+    def name(self) -> str:
+        prefix = "" if self.traffic == "random" else f"{self.traffic}/"
+        return f"{prefix}{self.elevators}x{self.floors}/d{self.density:g}/s{self.seed}"
+
+
+class _CapturingSimulation(ElevatorSimulation):
+    """切换流量前保存乘客记录（切换后乘客会被清空）"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.captured: List[Tuple[int, int, int, bool]] = []
+        self.captured_tick = 0
+
+    def next_traffic_round(self, full_reset: bool = False) -> bool:
+        if self.tick > 0 and not self.captured:
+            self.captured = [
+                (p.arrive_tick, p.pickup_tick, p.dropoff_tick, p.arrived) for p in self.passengers.values()
+            ]
+            self.captured_tick = self.tick
+        return super().next_traffic_round(full_reset)
+
+
+def _percentile(values: Sequence[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100.0))]
+
+
+def _censored_metrics(passengers: Sequence[Tuple[int, int, int, bool]], end_tick: int) -> Dict[str, float]:
+    """所有乘客的等待/系统时间，未上梯或未送达的按 end_tick 截断"""
+    wait_times = [(pickup if pickup > 0 else end_tick) - arrive for arrive, pickup, _, _ in passengers]
+    system_times = [(dropoff if arrived else end_tick) - arrive for arrive, _, dropoff, arrived in passengers]
+    count = len(passengers)
+    return {
+        "average_wait_time": sum(wait_times) / count if count else 0.0,
+        "p95_wait_time": _percentile(wait_times, 95),
+        "average_system_time": sum(system_times) / count if count else 0.0,
+        "p95_system_time": _percentile(system_times, 95),
+    }
+
+
+@contextlib.contextmanager
+def _quiet() -> Iterator[None]:
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def run_case(case: AlgorithmCase, controller_factory: ControllerFactory) -> Dict[str, Any]:
+    """
+    在用例的流量上运行一个控制器
+
+    Returns:
+        可JSON序列化的结果：模拟器指标（metrics）和截断统计（censored）
+    """
+    traffic = TRAFFIC_PATTERNS[case.traffic](
+        case.elevators, case.floors, case.arrival_ticks, case.density * case.elevators, seed=case.seed
+    )
+    traffic.metadata["duration"] = case.duration
+    simulation = _CapturingSimulation(traffic)
+    with _quiet():
+        controller = controller_factory()
+        controller.api_client = LocalAPIClient(simulation)
+        controller.recorder = None
+        controller.start()
+
+    metrics = simulation.round_results[0]["metrics"] if simulation.round_results else simulation.get_metrics()
+    return {
+        "case": case.name,
+        **asdict(case),
+        "metrics": metrics,
+        "censored": _censored_metrics(simulation.captured, simulation.captured_tick),
+    }
+
+
+def build_cases(
+    buildings: Sequence[Tuple[int, int]] = BUILDINGS,
+    densities: Sequence[float] = DENSITIES,
+    seeds: int = 3,
+    arrival_ticks: int = 200,
+    duration: int = 300,
+    traffic: str = "random",
+) -> List[AlgorithmCase]:
+    """生成用例网格"""
+    return [
+        AlgorithmCase(elevators, floors, density, arrival_ticks, duration, seed, traffic)
+        for elevators, floors in buildings
+        for density in densities
+        for seed in range(seeds)
+    ]
+
+
+def run_comparison(
+    cases: Sequence[AlgorithmCase], algorithms: Optional[Dict[str, ControllerFactory]] = None
+) -> Dict[str, Any]:
+    """在每个用例上运行所有算法，并汇总各算法的平均值"""
+    algorithms = algorithms or ALGORITHMS
+    results: List[Dict[str, Any]] = []
+    for case in cases:
+        row = {"case": case.name, "algorithms": {}}
+        for name, factory in algorithms.items():
+            row["algorithms"][name] = run_case(case, factory)
+        results.append(row)
+        print(_format_row(row), flush=True)
+    return {"results": results, "summary": summarize(results)}
+
+
+def summarize(results: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    """各算法在所有用例上的平均截断指标和完成率"""
+    summary: Dict[str, Dict[str, float]] = {}
+    for row in results:
+        for name, result in row["algorithms"].items():
+            totals = summary.setdefault(name, {"cases": 0})
+            totals["cases"] += 1
+            for key, value in result["censored"].items():
+                totals[key] = totals.get(key, 0.0) + value
+            metrics = result["metrics"]
+            completion = (
+                metrics["completed_passengers"] / metrics["total_passengers"] if metrics["total_passengers"] else 1.0
+            )
+            totals["completion"] = totals.get("completion", 0.0) + completion
+    for totals in summary.values():
+        cases = totals["cases"]
+        for key in totals:
+            if key != "cases":
+                totals[key] /= cases
+    return summary
+
+
+def _format_row(row: Dict[str, Any]) -> str:
+    parts = [f"{row['case']:<28}"]
+    for name, result in row["algorithms"].items():
+        censored = result["censored"]
+        metrics = result["metrics"]
+        parts.append(
+            f"{name} sys {censored['average_system_time']:>6.1f}/{censored['p95_system_time']:>6.1f}"
+            f" wait {censored['average_wait_time']:>6.1f}"
+            f" done {metrics['completed_passengers']}/{metrics['total_passengers']}"
+        )
+    return "  ".join(parts)
+
+
+def _parse_building(value: str) -> Tuple[int, int]:
+    elevators, floors = value.lower().split("x", 1)
+    return int(elevators), int(floors)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare dispatch algorithms on the same traffic")
+    parser.add_argument("--quick", action="store_true", help="只运行小规模楼宇")
+    parser.add_argument("--building", action="append", type=_parse_building, help="楼宇规模，如 4x20，可重复")
+    parser.add_argument("--density", action="append", type=float, help="每部电梯每tick的到达率，可重复")
+    parser.add_argument("--seeds", type=int, default=3, help="每个规模和密度运行的随机种子数")
+    parser.add_argument("--arrival-ticks", type=int, default=200, help="乘客到达的tick数")
+    parser.add_argument("--duration", type=int, default=300, help="每个用例运行的总tick数")
+    parser.add_argument("--traffic", choices=sorted(TRAFFIC_PATTERNS), default="random", help="流量模式")
+    parser.add_argument("--algorithm", action="append", choices=sorted({**ALGORITHMS, **VARIANTS}), help="参与对比的算法，可重复")
+    parser.add_argument("--output", type=Path, help="结果JSON文件")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(
+        buildings=args.building or (QUICK_BUILDINGS if args.quick else BUILDINGS),
+        densities=args.density or DENSITIES,
+        seeds=args.seeds,
+        arrival_ticks=args.arrival_ticks,
+        duration=args.duration,
+        traffic=args.traffic,
+    )
+    available = {**ALGORITHMS, **VARIANTS}
+    algorithms = {name: available[name] for name in args.algorithm} if args.algorithm else ALGORITHMS
+    report = run_comparison(cases, algorithms)
+
+    print("\nSummary (censored system time avg/p95, wait avg, completion):")
+    for name, totals in report["summary"].items():
+        print(
+            f"  {name:<14} sys {totals['average_system_time']:>6.1f}/{totals['p95_system_time']:>6.1f}"
+            f"  wait {totals['average_wait_time']:>6.1f}  completion {totals['completion']:.1%}"
+        )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
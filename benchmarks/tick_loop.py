@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Tick Loop Benchmark
+端到端tick循环基准 - 统计 ticks/s、每tick请求数、回调耗时、解码耗时和记录器开销
+
+在仓库根目录运行::
+
+    python -m benchmarks.tick_loop --quick
+    python -m benchmarks.tick_loop --output base.json
+    python -m benchmarks.tick_loop --output new.json --compare base.json
+
+每个用例分别在进程内引擎（inprocess）和本地HTTP模拟器（http）上运行，
+结果保存为JSON，可在不同提交之间对比。
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from elevator.client.api_client import ElevatorAPIClient
+from elevator.client.base_controller import ElevatorController
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+from elevator.server.local_server import LocalSimulatorServer
+from elevator.visualization.recorder import SimulationRecorder
+
+# 楼宇规模（电梯数, 楼层数）
+BUILDINGS: List[Tuple[int, int]] = [(2, 6), (4, 20), (8, 50), (16, 100), (32, 150), (64, 200)]
+QUICK_BUILDINGS: List[Tuple[int, int]] = [(2, 6), (4, 20), (8, 50)]
+# 流量密度：每部电梯每tick平均到达的乘客数
+DENSITIES: List[float] = [0.1, 0.3]
+TRANSPORTS: List[str] = ["inprocess", "http"]
+RESULT_VERSION = 1
+
+ControllerFactory = Callable[[], ElevatorController]
+
+
+@dataclass
+class BenchmarkCase:
+    """一个基准用例"""
+
+    elevators: int
+    floors: int
+    density: float
+    ticks: int = 200
+    transport: str = "inprocess"
+    record: bool = True
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.transport}/{self.elevators}x{self.floors}/d{self.density:g}"
+
+
+class _Stats:
+    """耗时采样"""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.transport_s = 0.0  # 传输层累计耗时，用于从 get_state/step 中扣除
+
+    def wrap(self, key: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        samples = self.samples[key]
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                samples.append(time.perf_counter() - start)
+
+        return timed
+
+    def total(self, key: str) -> float:
+        return sum(self.samples.get(key, ()))
+
+    def summary(self, key: str) -> Dict[str, float]:
+        values = sorted(self.samples.get(key, ()))
+        if not values:
+            return {"count": 0, "total_ms": 0.0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": len(values),
+            "total_ms": sum(values) * 1000.0,
+            "mean_ms": sum(values) / len(values) * 1000.0,
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000.0,
+            "max_ms": values[-1] * 1000.0,
+        }
+
+
+def _instrument_client(client: ElevatorAPIClient, stats: _Stats) -> None:
+    """统计请求数、传输耗时和解码耗时（get_state/step 总耗时减去其中的传输耗时）"""
+    for name in ("_send_get_request", "_send_post_request"):
+        send = getattr(client, name)
+
+        def timed_send(*args: Any, _send: Callable[..., Any] = send, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return _send(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                stats.samples["transport"].append(elapsed)
+                stats.transport_s += elapsed
+
+        setattr(client, name, timed_send)
+
+    for name in ("get_state", "step"):
+        call = getattr(client, name)
+
+        def timed_decode(*args: Any, _call: Callable[..., Any] = call, _name: str = name, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            transport_before = stats.transport_s
+            try:
+                return _call(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start - (stats.transport_s - transport_before)
+                stats.samples[f"decode.{_name}"].append(elapsed)
+
+        setattr(client, name, timed_decode)
+
+
+def _instrument_controller(controller: ElevatorController, stats: _Stats) -> None:
+    """统计每个回调的耗时（包含回调内部的代理查询和命令请求）"""
+    for name in dir(controller):
+        if name.startswith("on_") and name not in ("on_start", "on_stop"):
+            setattr(controller, name, stats.wrap(f"callback.{name}", getattr(controller, name)))
+
+
+def _instrument_recorder(recorder: SimulationRecorder, stats: _Stats) -> None:
+    recorder.record_state = stats.wrap("recorder.record_state", recorder.record_state)  # type: ignore[method-assign]
+    recorder.save = stats.wrap("recorder.save", recorder.save)  # type: ignore[method-assign]
+
+
+def _default_controller() -> ElevatorController:
+    from controller import LookV2Controller
+
+    # 停放默认只对进程内客户端开启，这里固定为往返待命，两种传输方式运行同一个算法
+    return LookV2Controller(debug=False, use_parking=False)
+
+
+@contextlib.contextmanager
+def _quiet() -> Iterator[None]:
+    """控制器运行时大量打印，基准中丢弃标准输出"""
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def run_case(case: BenchmarkCase, controller_factory: Optional[ControllerFactory] = None) -> Dict[str, Any]:
+    """
+    运行一个基准用例
+
+    Args:
+        case: 基准用例
+        controller_factory: 创建控制器的函数，默认 LookV2Controller
+
+    Returns:
+        可JSON序列化的结果
+    """
+    factory = controller_factory or _default_controller
+    traffic = create_random_traffic_pattern(
+        case.elevators, case.floors, case.ticks, case.density * case.elevators, seed=case.seed
+    )
+    simulation = ElevatorSimulation(traffic)
+    stats = _Stats()
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(_quiet())
+        if case.transport == "http":
+            server = stack.enter_context(LocalSimulatorServer(simulation))
+            client: ElevatorAPIClient = ElevatorAPIClient(server.url)
+        elif case.transport == "inprocess":
+            client = LocalAPIClient(simulation)
+        else:
+            raise ValueError(f"Unknown transport: {case.transport}")
+        _instrument_client(client, stats)
+
+        controller = factory()
+        controller.api_client = client
+        if case.record:
+            controller.recorder = SimulationRecorder(Path(stack.enter_context(tempfile.TemporaryDirectory())))
+            _instrument_recorder(controller.recorder, stats)
+        else:
+            controller.recorder = None
+        _instrument_controller(controller, stats)
+
+        start = time.perf_counter()
+        controller.start()
+        wall_s = time.perf_counter() - start
+
+    result = simulation.round_results[-1] if simulation.round_results else {"metrics": simulation.get_metrics()}
+    ticks = len(stats.samples["decode.step"])
+    per_tick = 1000.0 / ticks if ticks else 0.0
+    transport_s = stats.total("transport")
+    decode_s = stats.total("decode.get_state") + stats.total("decode.step")
+    recorder_s = stats.total("recorder.record_state") + stats.total("recorder.save")
+    callbacks = {
+        key.split(".", 1)[1]: stats.summary(key) for key in sorted(stats.samples) if key.startswith("callback.")
+    }
+    return {
+        "case": case.name,
+        **asdict(case),
+        "ticks_run": ticks,
+        "wall_s": wall_s,
+        "ticks_per_s": ticks / wall_s if wall_s > 0 else 0.0,
+        "requests": len(stats.samples["transport"]),
+        "requests_per_tick": len(stats.samples["transport"]) / ticks if ticks else 0.0,
+        "transport_ms_per_tick": transport_s * per_tick,
+        "decode_ms_per_tick": decode_s * per_tick,
+        "callback_ms_per_tick": sum(c["total_ms"] for c in callbacks.values()) / ticks if ticks else 0.0,
+        "recorder_ms_per_tick": recorder_s * per_tick,
+        "recorder_save_ms": stats.total("recorder.save") * 1000.0,
+        "callbacks": callbacks,
+        "metrics": result["metrics"],
+    }
+
+
+def build_cases(
+    buildings: Sequence[Tuple[int, int]] = BUILDINGS,
+    densities: Sequence[float] = DENSITIES,
+    transports: Sequence[str] = TRANSPORTS,
+    ticks: int = 200,
+    record: bool = True,
+    seed: int = 0,
+) -> List[BenchmarkCase]:
+    """生成用例网格"""
+    return [
+        BenchmarkCase(elevators, floors, density, ticks, transport, record, seed)
+        for elevators, floors in buildings
+        for density in densities
+        for transport in transports
+    ]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return output.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    cases: Sequence[BenchmarkCase], controller_factory: Optional[ControllerFactory] = None
+) -> Dict[str, Any]:
+    """运行所有用例并附带环境信息"""
+    results = []
+    for case in cases:
+        results.append(run_case(case, controller_factory))
+        print(_format_row(results[-1]), flush=True)
+    return {
+        "version": RESULT_VERSION,
+        "revision": _git_revision(),
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """对比两次基准结果，返回每个共同用例的 ticks/s 变化"""
+    baseline_by_case = {r["case"]: r for r in baseline.get("results", [])}
+    lines = []
+    for result in current.get("results", []):
+        old = baseline_by_case.get(result["case"])
+        if old is None or not old["ticks_per_s"]:
+            continue
+        ratio = result["ticks_per_s"] / old["ticks_per_s"]
+        lines.append(
+            f"{result['case']:<28} {old['ticks_per_s']:>10.1f} -> {result['ticks_per_s']:>10.1f} ticks/s"
+            f"  x{ratio:.2f}  req/tick {old['requests_per_tick']:.1f} -> {result['requests_per_tick']:.1f}"
+        )
+    return lines
+
+
+def _format_row(result: Dict[str, Any]) -> str:
+    return (
+        f"{result['case']:<28} {result['ticks_per_s']:>10.1f} ticks/s"
+        f"  req/tick {result['requests_per_tick']:>6.1f}"
+        f"  transport {result['transport_ms_per_tick']:>8.3f}ms"
+        f"  decode {result['decode_ms_per_tick']:>8.3f}ms"
+        f"  callbacks {result['callback_ms_per_tick']:>8.3f}ms"
+        f"  recorder {result['recorder_ms_per_tick']:>7.3f}ms"
+    )
+
+
+def _parse_building(value: str) -> Tuple[int, int]:
+    elevators, floors = value.lower().split("x", 1)
+    return int(elevators), int(floors)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="End-to-end tick loop benchmark")
+    parser.add_argument("--quick", action="store_true", help="只运行小规模楼宇")
+    parser.add_argument("--building", action="append", type=_parse_building, help="楼宇规模，如 16x100，可重复")
+    parser.add_argument("--density", action="append", type=float, help="每部电梯每tick的到达率，可重复")
+    parser.add_argument("--transport", action="append", choices=TRANSPORTS, help="传输方式，可重复")
+    parser.add_argument("--ticks", type=int, default=200, help="每个用例的tick数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-record", action="store_true", help="不启用记录器")
+    parser.add_argument("--output", type=Path, help="结果JSON文件")
+    parser.add_argument("--compare", type=Path, help="与之前的结果JSON对比")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(
+        buildings=args.building or (QUICK_BUILDINGS if args.quick else BUILDINGS),
+        densities=args.density or DENSITIES,
+        transports=args.transport or TRANSPORTS,
+        ticks=args.ticks,
+        record=not args.no_record,
+        seed=args.seed,
+    )
+    report = run_benchmarks(cases)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {baseline.get('revision') or args.compare}:")
+        for line in compare(report, baseline):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -24,17 +24,32 @@ LOOK V2 电梯调度算法 - 简化版本
 - 不返回当前楼层（会导致死循环）
 - 让电梯按LOOK算法自然移动，最终会服务所有乘客
 """
-from typing import List, Optional, Set
+from typing import List, Optional
 from elevator.client.base_controller import ElevatorController
+from elevator.client.demand_index import DemandIndex
+from elevator.client.dispatcher import GlobalDispatcher, HallCall
+from elevator.client.floor_set import FloorSet
 from elevator.client.gui_controller import GUIController
+from elevator.client.local_client import LocalAPIClient
+from elevator.client.parking import ParkingPlanner
 from elevator.client.proxy_models import ProxyElevator, ProxyFloor, ProxyPassenger
 from elevator.core.models import Direction, SimulationEvent
+from elevator.utils.log import DEBUG, get_logger
+
+log = get_logger("look_v2")
 
 
 class LookV2Controller(ElevatorController):
     """LOOK V2 控制器 - 实时决策版本"""
 
-    def __init__(self, server_url: str = "http://127.0.0.1:8000", debug: bool = False):
+    def __init__(
+        self,
+        server_url: str = "http://127.0.0.1:8000",
+        debug: bool = False,
+        use_dispatcher: bool = True,
+        use_parking: Optional[bool] = None,
+        en_route_pickup: bool = True,
+    ):
         super().__init__(server_url, debug)
         self.max_floor = 0
         self.floors: List[ProxyFloor] = []
@@ -48,24 +63,67 @@ class LookV2Controller(ElevatorController):
         # 存储乘客信息：passenger_id -> destination
         self.passenger_destinations: dict[int, int] = {}
 
+        # 楼层呼叫需求索引：由事件增量维护，替代每次停靠时遍历所有楼层
+        self.demand = DemandIndex()
+
+        # 全局调度：每个tick结束时把楼层呼叫指派给电梯，避免多部电梯追同一个呼叫
+        # 空电梯停靠后等待本tick的指派结果再决定去向
+        # 载客电梯不去接已指派给其他电梯的呼叫
+        self.use_dispatcher = use_dispatcher
+        self.dispatcher: Optional[GlobalDispatcher] = None
+        self._awaiting_dispatch: dict[int, ProxyElevator] = {}
+        # 已被指派的呼叫楼层：方向 -> 电梯ID -> 楼层集合
+        self._claimed_floors: dict[Direction, dict[int, FloorSet]] = {Direction.UP: {}, Direction.DOWN: {}}
+
+        # 空闲停放：按呼叫楼层的需求预测，把没有目标的电梯分区停在预计响应最快的楼层
+        # 关闭时没有目标的电梯在 F0/F1 之间往返待命
+        # 默认（None）只对进程内模拟器（LocalAPIClient）开启：停放的电梯不下发指令，
+        # 外部模拟器服务器在没有指令时可能停滞，HTTP 客户端保持往返待命
+        self.use_parking = use_parking
+        self.parking: Optional[ParkingPlanner] = None
+        self._parked: dict[int, int] = {}  # 停放中（含前往停放楼层途中）的电梯ID -> 停放楼层
+
+        # 顺路停靠：运行中的载客电梯经过楼层时，前方出现同方向呼叫则立即改派停靠
+        self.en_route_pickup = en_route_pickup
+
     def on_init(self, elevators: List[ProxyElevator], floors: List[ProxyFloor]) -> None:
         """初始化"""
-        print("[LOOK V2] 算法初始化（实时决策版本）")
-        print(f"  管理 {len(elevators)} 部电梯，服务 {len(floors)} 层楼")
+        log.info("[LOOK V2] 算法初始化（实时决策版本）")
+        log.info(lambda: f"  管理 {len(elevators)} 部电梯，服务 {len(floors)} 层楼")
 
         self.max_floor = len(floors) - 1
         self.floors = floors
 
+        # 重建需求索引（初始化时可能已有等待的乘客）
+        self.demand.clear()
+        for floor in floors:
+            for passenger_id in floor.up_queue:
+                self.demand.add_call(passenger_id, floor.floor, Direction.UP)
+            for passenger_id in floor.down_queue:
+                self.demand.add_call(passenger_id, floor.floor, Direction.DOWN)
+
+        if self.use_dispatcher:
+            self.dispatcher = GlobalDispatcher(len(floors))
+        self._awaiting_dispatch.clear()
+        self._claimed_floors = {Direction.UP: {}, Direction.DOWN: {}}
+        use_parking = self.use_parking
+        if use_parking is None:
+            use_parking = isinstance(self.api_client, LocalAPIClient)
+        self.parking = ParkingPlanner(len(floors)) if use_parking else None
+        self._parked.clear()
+
         # 初始化电梯扫描方向为UP
         for elevator in elevators:
             self.elevator_scan_direction[elevator.id] = Direction.UP
-            print(f"  电梯 E{elevator.id} 初始化，扫描方向: UP")
+            log.info(lambda: f"  电梯 E{elevator.id} 初始化，扫描方向: UP")
 
     def on_passenger_call(self, passenger: ProxyPassenger, floor: ProxyFloor, direction: str) -> None:
         """乘客呼叫 - 记录乘客目的地信息"""
-        print(f"[CALL] 乘客 {passenger.id}: F{passenger.origin} -> F{passenger.destination}")
+        log.debug(lambda: f"[CALL] 乘客 {passenger.id}: F{passenger.origin} -> F{passenger.destination}")
         # 记录乘客目的地
         self.passenger_destinations[passenger.id] = passenger.destination
+        if self.parking is not None:
+            self.parking.record_call(passenger.origin, self.current_tick)
 
     def on_elevator_stopped(self, elevator: ProxyElevator, floor: ProxyFloor) -> None:
         """
@@ -73,55 +131,58 @@ class LookV2Controller(ElevatorController):
 
         实时收集所有需求楼层，按LOOK算法选择下一个目标
         """
-        print(f"[STOP] E{elevator.id} 停靠在 F{floor.floor} | 载客:{len(elevator.passengers)} | 方向:{self.elevator_scan_direction.get(elevator.id, Direction.UP).value}")
+        log.debug(lambda: f"[STOP] E{elevator.id} 停靠在 F{floor.floor} | 载客:{len(elevator.passengers)} | 方向:{self.elevator_scan_direction.get(elevator.id, Direction.UP).value}")
 
         # 获取电梯当前扫描方向
         current_direction = self.elevator_scan_direction.get(elevator.id, Direction.UP)
         current_floor = elevator.current_floor
 
-        # === 第一步：收集所有有需求的楼层 ===
-        # 分别收集两个方向的需求楼层
-        up_targets: Set[int] = set()    # 需要向上的乘客所在楼层
-        down_targets: Set[int] = set()  # 需要向下的乘客所在楼层
+        if self.dispatcher is not None and not elevator.passengers:
+            # 空电梯由全局调度在本tick结束时统一指派
+            self._awaiting_dispatch[elevator.id] = elevator
+            return
 
+        # === 第一步：收集所有有需求的楼层 ===
         # 1. 电梯内乘客的目的地（没有方向限制，两个方向都算）
-        for passenger_id in elevator.passengers:
-            destination = self.passenger_destinations.get(passenger_id)
-            if destination is not None:
-                if destination > current_floor:
-                    up_targets.add(destination)
-                elif destination < current_floor:
-                    down_targets.add(destination)
+        car_targets = FloorSet(
+            destination
+            for destination in (self.passenger_destinations.get(p) for p in elevator.passengers)
+            if destination is not None
+        )
 
         if self.debug and elevator.passengers:
-            print(f"  [DEBUG] 电梯内有 {len(elevator.passengers)} 个乘客")
-            print(f"  [DEBUG] 电梯内乘客目的地: {[self.passenger_destinations.get(p) for p in elevator.passengers]}")
-
-        # 2. 等待上梯的乘客位置（分别收集）
-        waiting_floors = []  # 用于输出等待乘客的楼层信息
-        for f in self.floors:
-            if f.up_queue:  # 有向上的乘客
-                up_targets.add(f.floor)
-                waiting_floors.append(f"F{f.floor}↑({len(f.up_queue)})")
-                if self.debug:
-                    print(f"  [DEBUG] F{f.floor} up_queue: {f.up_queue}")
-            if f.down_queue:  # 有向下的乘客
-                down_targets.add(f.floor)
-                waiting_floors.append(f"F{f.floor}↓({len(f.down_queue)})")
-                if self.debug:
-                    print(f"  [DEBUG] F{f.floor} down_queue: {f.down_queue}")
-
-        if waiting_floors:
-            print(f"  等待乘客: {', '.join(waiting_floors)}")
+            log.debug(lambda: f"  [DEBUG] 电梯内有 {len(elevator.passengers)} 个乘客")
+            log.debug(lambda: f"  [DEBUG] 电梯内乘客目的地: {[self.passenger_destinations.get(p) for p in elevator.passengers]}")
+
+        # 2. 等待上梯的乘客位置由需求索引维护（按方向的有序楼层集合），无需遍历所有楼层
+        #    已指派给其他电梯的呼叫不在考虑范围内，但扫描方向前方、方向一致的呼叫顺路停靠代价很小，照常接
+        up_calls = self._available_calls(elevator.id, Direction.UP)
+        down_calls = self._available_calls(elevator.id, Direction.DOWN)
+        #    按已知目的地预计各停靠楼层的载客量，跳过电梯到达时已满载的接客楼层
+        if current_direction == Direction.UP:
+            up_calls = up_calls | self.demand.floors(Direction.UP).above(current_floor)
+            up_calls = self._skip_full_pickups(elevator, current_floor, current_direction, up_calls)
+        else:
+            down_calls = down_calls | self.demand.floors(Direction.DOWN).below(current_floor)
+            down_calls = self._skip_full_pickups(elevator, current_floor, current_direction, down_calls)
+        up_targets = up_calls | car_targets.above(current_floor)
+        down_targets = down_calls | car_targets.below(current_floor)
+
+        if self.demand and log.is_enabled_for(DEBUG):
+            waiting_floors = [f"F{f}↑({self.demand.count(f, Direction.UP)})" for f in self.demand.floors(Direction.UP)]
+            waiting_floors += [
+                f"F{f}↓({self.demand.count(f, Direction.DOWN)})" for f in self.demand.floors(Direction.DOWN)
+            ]
+            log.debug(lambda: f"  等待乘客: {', '.join(waiting_floors)}")
 
         if self.debug:
-            print(f"  当前方向: {current_direction.value}, UP目标: {sorted(up_targets)}, DOWN目标: {sorted(down_targets)}")
+            log.debug(lambda: f"  当前方向: {current_direction.value}, UP目标: {list(up_targets)}, DOWN目标: {list(down_targets)}")
 
         # 检查电梯是否为空（空闲状态）
         is_empty = len(elevator.passengers) == 0
 
         if self.debug and is_empty:
-            print(f"  [DEBUG] 电梯为空，采用空闲优先策略")
+            log.debug("  [DEBUG] 电梯为空，采用空闲优先策略")
 
         # === 第二步：按LOOK算法选择下一个目标楼层 ===
         next_floor = self._select_next_floor_look(
@@ -132,7 +193,12 @@ class LookV2Controller(ElevatorController):
             is_empty
         )
 
+        self._move_elevator(elevator, current_floor, next_floor)
+
+    def _move_elevator(self, elevator: ProxyElevator, current_floor: int, next_floor: Optional[int]) -> None:
+        """前往选定的楼层并更新扫描方向，没有目标时停放或待命"""
         if next_floor is not None:
+            self._parked.pop(elevator.id, None)
             # 更新扫描方向
             if next_floor > current_floor:
                 self.elevator_scan_direction[elevator.id] = Direction.UP
@@ -142,25 +208,171 @@ class LookV2Controller(ElevatorController):
 
             # 移动到下一个楼层
             elevator.go_to_floor(next_floor)
-            print(f"  -> E{elevator.id} 前往 F{next_floor} (方向: {self.elevator_scan_direction[elevator.id].value})")
+            log.debug(lambda: f"  -> E{elevator.id} 前往 F{next_floor} (方向: {self.elevator_scan_direction[elevator.id].value})")
+        elif self.parking is not None:
+            self._park([elevator])
         else:
             # 没有任何目标时，给电梯分配待命位置
             # 这对于流水线测试环境至关重要，避免服务器停滞在"no tick"状态
             if current_floor == 0:
                 # 在底层，向上移动
                 elevator.go_to_floor(1)
-                print(f"  -> E{elevator.id} 无目标，待命移动到F1")
+                log.debug(lambda: f"  -> E{elevator.id} 无目标，待命移动到F1")
             else:
                 # 在其他楼层，返回底层
                 elevator.go_to_floor(0)
-                print(f"  -> E{elevator.id} 无目标，待命返回F0")
+                log.debug(lambda: f"  -> E{elevator.id} 无目标，待命返回F0")
+
+    def _park(self, elevators: List[ProxyElevator]) -> None:
+        """
+        没有目标的电梯前往停放楼层
+
+        与已停放的电梯一起按需求预测划分停放楼层，已停放的电梯不移动。
+        已在停放楼层的电梯不下发指令，有新呼叫时由 _wake_parked 重新调度。
+        """
+        assert self.parking is not None
+        idle = dict(self._parked)
+        for elevator in elevators:
+            idle[elevator.id] = elevator.current_floor
+        targets = self.parking.assign(idle, self.current_tick)
+        for elevator in elevators:
+            current_floor = elevator.current_floor
+            target = targets[elevator.id]
+            self._parked[elevator.id] = target
+            if target == current_floor:
+                continue
+            self.elevator_scan_direction[elevator.id] = Direction.UP if target > current_floor else Direction.DOWN
+            elevator.go_to_floor(target)
+            log.debug(lambda: f"  -> E{elevator.id} 无目标，停放到F{target}")
+
+    def _wake_parked(self, elevators: List[ProxyElevator]) -> None:
+        """有等待的乘客时，已停在停放楼层的电梯重新参与调度（停放途中的电梯到站后自然会参与）"""
+        for elevator in elevators:
+            if elevator.id not in self._parked or elevator.target_floor_direction != Direction.STOPPED:
+                continue
+            if elevator.next_target_floor is not None:
+                continue
+            if self.dispatcher is not None:
+                self._awaiting_dispatch[elevator.id] = elevator
+            else:
+                self.on_elevator_stopped(elevator, self.floors[elevator.current_floor])
+
+    def _available_calls(self, elevator_id: int, direction: Direction) -> FloorSet:
+        """某方向上该电梯可以去接的呼叫楼层：未指派的呼叫和指派给它自己的呼叫（可能与其他电梯共同指派）"""
+        all_calls = self.demand.floors(direction)
+        calls = all_calls
+        for owner, floors in self._claimed_floors[direction].items():
+            if owner != elevator_id:
+                calls = calls - floors
+        own = self._claimed_floors[direction].get(elevator_id)
+        return calls | (own & all_calls) if own else calls
+
+    def _skip_full_pickups(
+        self, elevator: ProxyElevator, current_floor: int, direction: Direction, calls: FloorSet
+    ) -> FloorSet:
+        """
+        剔除扫描方向前方、电梯到达时预计已满载的呼叫楼层
+
+        电梯内乘客的目的地已知，沿扫描方向减去途中下梯的人数即为到达各楼层时的载客量。
+        满载电梯停下也接不到人，不如直接驶过。途中上梯的人数不计入：
+        等待的乘客可能被其他电梯接走，高估载客量会让电梯错过本可以接的乘客。
+        """
+        capacity = elevator.max_capacity
+        alighting: dict[int, int] = {}
+        for passenger_id in elevator.passengers:
+            destination = self.passenger_destinations.get(passenger_id)
+            if destination is not None:
+                alighting[destination] = alighting.get(destination, 0) + 1
+        load = len(elevator.passengers)
+        if direction == Direction.UP:
+            ahead = calls.above(current_floor)
+            stops = ahead | FloorSet(alighting).above(current_floor)
+        else:
+            ahead = calls.below(current_floor)
+            stops = ahead | FloorSet(alighting).below(current_floor)
+
+        skipped = FloorSet()
+        for floor in stops if direction == Direction.UP else reversed(list(stops)):
+            load -= alighting.get(floor, 0)
+            if floor in ahead and load >= capacity:
+                skipped.add(floor)
+        if skipped and self.debug:
+            log.debug(lambda: f"  [CAPACITY] E{elevator.id} 预计满载，跳过 {list(skipped)}")
+        return calls - skipped if skipped else calls
+
+    def _dispatch(self) -> None:
+        """
+        全局调度 - 每个tick结束时调用一次
+
+        为所有电梯和所有楼层呼叫求解指派，然后为本tick停靠的空电梯下发目标：
+        优先去指派给它的呼叫，其次是未指派的呼叫，都没有则待命。
+        """
+        assert self.dispatcher is not None
+        state = self.api_client.get_state()
+        calls: List[HallCall] = [(f, Direction.UP) for f in self.demand.floors(Direction.UP)]
+        calls += [(f, Direction.DOWN) for f in self.demand.floors(Direction.DOWN)]
+
+        committed_stops = []
+        sweep = []
+        for elevator_state in state.elevators:
+            stops = {
+                self.passenger_destinations[p] for p in elevator_state.passengers if p in self.passenger_destinations
+            }
+            if elevator_state.id in self._awaiting_dispatch:
+                direction = Direction.STOPPED
+            elif elevator_state.passengers:
+                direction = self.elevator_scan_direction.get(elevator_state.id, Direction.UP)
+            else:
+                direction = elevator_state.target_floor_direction
+            if elevator_state.target_floor_direction != Direction.STOPPED:
+                stops.add(elevator_state.target_floor)
+            committed_stops.append(stops)
+            sweep.append(direction)
+
+        # 等待人数超过电梯剩余容量的呼叫会拆分给多部电梯
+        waiting = [self.demand.count(floor, direction) for floor, direction in calls]
+        assignments = self.dispatcher.assign(state.elevators, calls, committed_stops, sweep, waiting)
+        claimed: dict[Direction, dict[int, FloorSet]] = {Direction.UP: {}, Direction.DOWN: {}}
+        for (floor, direction), elevator_ids in assignments.items():
+            for elevator_id in elevator_ids:
+                claimed[direction].setdefault(elevator_id, FloorSet()).add(floor)
+        self._claimed_floors = claimed
+        if self.debug:
+            log.debug(
+                lambda: f"  [DISPATCH] {len(calls)} 个呼叫, 指派 {len(assignments)} 个, "
+                f"耗时 {self.dispatcher.last_elapsed_ms:.2f}ms{'' if self.dispatcher.last_optimal else ' (贪心)'}"
+            )
+
+        idle: List[ProxyElevator] = []
+        for elevator_id, elevator in self._awaiting_dispatch.items():
+            current_floor = elevator.current_floor
+            direction = self.elevator_scan_direction.get(elevator_id, Direction.UP)
+            own_up = claimed[Direction.UP].get(elevator_id, FloorSet())
+            own_down = claimed[Direction.DOWN].get(elevator_id, FloorSet())
+            next_floor = self._select_next_floor_look(current_floor, direction, own_up, own_down, True)
+            if next_floor is None:
+                next_floor = self._select_next_floor_look(
+                    current_floor,
+                    direction,
+                    self._available_calls(elevator_id, Direction.UP),
+                    self._available_calls(elevator_id, Direction.DOWN),
+                    True,
+                )
+            if next_floor is None and self.parking is not None:
+                # 没有目标的电梯一起划分停放楼层
+                idle.append(elevator)
+                continue
+            self._move_elevator(elevator, current_floor, next_floor)
+        if idle:
+            self._park(idle)
+        self._awaiting_dispatch.clear()
 
     def _select_next_floor_look(
         self,
         current_floor: int,
         current_direction: Direction,
-        up_targets: Set[int],
-        down_targets: Set[int],
+        up_targets: FloorSet,
+        down_targets: FloorSet,
         is_empty: bool
     ) -> Optional[int]:
         """
@@ -190,84 +402,82 @@ class LookV2Controller(ElevatorController):
         关键约束：
         - 永远不返回当前楼层（current_floor），避免死循环
         - 让电梯自然移动，按LOOK算法循环服务所有乘客
+
+        目标集合是有序楼层集合，每一步都是后继/前驱/最值查询，不构造临时列表。
         """
         # === 策略1：空闲优先 - 直接去接最近的乘客 ===
         if is_empty:
-            # 合并所有目标
-            all_targets = up_targets | down_targets
+            # 合并所有目标，选择距离最近的楼层（距离相同时取较低楼层）
+            nearest = (up_targets | down_targets).nearest(current_floor)
 
-            if not all_targets:
+            if nearest is None:
                 return None
 
-            # 选择距离最近的楼层
-            nearest = min(all_targets, key=lambda f: abs(f - current_floor))
-
             # 特殊处理：如果最近的楼层是当前楼层，需要移动一层触发方向改变
             if nearest == current_floor:
                 # 检查当前楼层的需求方向
                 if current_floor in down_targets and current_floor > 0:
                     # 有向下需求，去下一层
                     if self.debug:
-                        print(f"  [IDLE策略] 当前楼层F{nearest}有down需求，先去F{current_floor-1}")
+                        log.debug(lambda: f"  [IDLE策略] 当前楼层F{nearest}有down需求，先去F{current_floor-1}")
                     return current_floor - 1
                 elif current_floor in up_targets and current_floor < self.max_floor:
                     # 有向上需求，去上一层
                     if self.debug:
-                        print(f"  [IDLE策略] 当前楼层F{nearest}有up需求，先去F{current_floor+1}")
+                        log.debug(lambda: f"  [IDLE策略] 当前楼层F{nearest}有up需求，先去F{current_floor+1}")
                     return current_floor + 1
 
             if self.debug:
-                print(f"  [IDLE策略] 选择最近楼层: F{nearest} (距离={abs(nearest - current_floor)})")
+                log.debug(lambda: f"  [IDLE策略] 选择最近楼层: F{nearest} (距离={abs(nearest - current_floor)})")
             return nearest
 
         # === 策略2：LOOK算法 - 电梯内有乘客时遵循扫描方向 ===
+        highest_down = down_targets.max()
+        lowest_up = up_targets.min()
+
         if current_direction == Direction.UP:
             # 当前向上扫描
             # 1. 优先选择上方的 up_targets（可以立即接到乘客）
-            upper_up = [f for f in up_targets if f > current_floor]
-            if upper_up:
-                return min(upper_up)  # 最近的上层楼层
+            upper_up = up_targets.successor(current_floor)
+            if upper_up is not None:
+                return upper_up  # 最近的上层楼层
 
             # 2. 如果上方没有 up_targets，选择上方的 down_targets
             #    虽然到达时不能接乘客，但可以准备转向
-            upper_down = [f for f in down_targets if f > current_floor]
-            if upper_down:
-                return max(upper_down)  # 去最高的，到达后转向向下
+            if highest_down is not None and highest_down > current_floor:
+                return highest_down  # 去最高的，到达后转向向下
 
             # 3. 上方都没有需求，转向向下
             #    选择下方的 down_targets（从高到低扫描），排除当前楼层
-            lower_down = [f for f in down_targets if f < current_floor]
-            if lower_down:
-                return max(lower_down)  # 最高的下层楼层
+            lower_down = down_targets.predecessor(current_floor)
+            if lower_down is not None:
+                return lower_down  # 最高的下层楼层
 
             # 4. 最后尝试下方的 up_targets，排除当前楼层
-            lower_up = [f for f in up_targets if f < current_floor]
-            if lower_up:
-                return min(lower_up)  # 最低的下层楼层
+            if lowest_up is not None and lowest_up < current_floor:
+                return lowest_up  # 最低的下层楼层
 
         else:  # current_direction == Direction.DOWN
             # 当前向下扫描
             # 1. 优先选择下方的 down_targets（可以立即接到乘客）
-            lower_down = [f for f in down_targets if f < current_floor]
-            if lower_down:
-                return max(lower_down)  # 最近的下层楼层
+            lower_down = down_targets.predecessor(current_floor)
+            if lower_down is not None:
+                return lower_down  # 最近的下层楼层
 
             # 2. 如果下方没有 down_targets，选择下方的 up_targets
             #    虽然到达时不能接乘客，但可以准备转向
-            lower_up = [f for f in up_targets if f < current_floor]
-            if lower_up:
-                return min(lower_up)  # 去最低的，到达后转向向上
+            if lowest_up is not None and lowest_up < current_floor:
+                return lowest_up  # 去最低的，到达后转向向上
 
             # 3. 下方都没有需求，转向向上
             #    选择上方的 up_targets（从低到高扫描），排除当前楼层
-            upper_up = [f for f in up_targets if f > current_floor]
-            if upper_up:
-                return min(upper_up)  # 最低的上层楼层
+            upper_up = up_targets.successor(current_floor)
+            if upper_up is not None:
+                return upper_up  # 最低的上层楼层
 
             # 4. 最后尝试上方的 down_targets，排除当前楼层
-            upper_down = [f for f in down_targets if f > current_floor]
-            if upper_down:
-                return max(upper_down)  # 最高的上层楼层
+            if highest_down is not None and highest_down > current_floor:
+                return highest_down  # 最高的上层楼层
 
         return None
 
@@ -279,15 +489,19 @@ class LookV2Controller(ElevatorController):
         这样可以触发方向改变，避免死循环
         """
         if self.debug:
-            print(f"[IDLE] E{elevator.id} 在 F{elevator.current_floor} 空闲")
+            log.debug(lambda: f"[IDLE] E{elevator.id} 在 F{elevator.current_floor} 空闲")
 
         current_floor = elevator.current_floor
-        current_floor_obj = self.floors[current_floor]
         current_direction = self.elevator_scan_direction.get(elevator.id, Direction.UP)
 
+        if self.dispatcher is not None and not elevator.passengers:
+            # 空电梯由全局调度在本tick结束时统一指派
+            self._awaiting_dispatch[elevator.id] = elevator
+            return
+
         # 检查当前楼层是否有方向不匹配的乘客
-        has_up_queue = len(current_floor_obj.up_queue) > 0
-        has_down_queue = len(current_floor_obj.down_queue) > 0
+        has_up_queue = self.demand.count(current_floor, Direction.UP) > 0
+        has_down_queue = self.demand.count(current_floor, Direction.DOWN) > 0
 
         # 如果当前楼层有乘客，但方向不匹配，移动一层后回来
         if has_up_queue and current_direction == Direction.DOWN and current_floor < self.max_floor:
@@ -295,14 +509,14 @@ class LookV2Controller(ElevatorController):
             target = current_floor + 1
             self.elevator_scan_direction[elevator.id] = Direction.UP
             elevator.go_to_floor(target)
-            print(f"  [方向修正] F{current_floor}有up_queue，去F{target}后回来 (切换为UP)")
+            log.debug(lambda: f"  [方向修正] F{current_floor}有up_queue，去F{target}后回来 (切换为UP)")
             return
         elif has_down_queue and current_direction == Direction.UP and current_floor > 0:
             # 需要向下，但当前方向向上，去下一层
             target = current_floor - 1
             self.elevator_scan_direction[elevator.id] = Direction.DOWN
             elevator.go_to_floor(target)
-            print(f"  [方向修正] F{current_floor}有down_queue，去F{target}后回来 (切换为DOWN)")
+            log.debug(lambda: f"  [方向修正] F{current_floor}有down_queue，去F{target}后回来 (切换为DOWN)")
             return
 
         # 复用停靠逻辑，重新扫描需求
@@ -312,12 +526,12 @@ class LookV2Controller(ElevatorController):
     def on_passenger_board(self, elevator: ProxyElevator, passenger: ProxyPassenger) -> None:
         """乘客上梯"""
         if self.debug:
-            print(f"  [BOARD] 乘客 {passenger.id} 上梯 E{elevator.id}")
+            log.debug(lambda: f"  [BOARD] 乘客 {passenger.id} 上梯 E{elevator.id}")
 
     def on_passenger_alight(self, elevator: ProxyElevator, passenger: ProxyPassenger, floor: ProxyFloor) -> None:
         """乘客下梯"""
         if self.debug:
-            print(f"  [ALIGHT] 乘客 {passenger.id} 下梯 E{elevator.id}")
+            log.debug(lambda: f"  [ALIGHT] 乘客 {passenger.id} 下梯 E{elevator.id}")
         # 清除乘客信息
         if passenger.id in self.passenger_destinations:
             del self.passenger_destinations[passenger.id]
@@ -327,22 +541,69 @@ class LookV2Controller(ElevatorController):
     ) -> None:
         """事件执行开始"""
         self.current_tick = tick
+        # 先按本tick的呼叫/上梯事件更新需求索引，使其与本tick结束时的状态一致
+        for event in events:
+            self.demand.apply_event(event)
         if self.debug:
-            print(f"\n=== TICK {tick} ===")
+            log.debug(lambda: f"\n=== TICK {tick} ===")
 
     def on_event_execute_end(
         self, tick: int, events: List[SimulationEvent], elevators: List[ProxyElevator], floors: List[ProxyFloor]
     ) -> None:
         """事件执行结束"""
-        pass
+        if self._parked and self.demand:
+            self._wake_parked(elevators)
+        if self.dispatcher is not None:
+            self._dispatch()
 
     def on_elevator_approaching(self, elevator: ProxyElevator, floor: ProxyFloor, direction: str) -> None:
-        """电梯即将到达"""
+        """电梯即将到达 - 只对当前目标楼层触发，电梯已在减速，不再改派"""
         pass
 
     def on_elevator_passing_floor(self, elevator: ProxyElevator, floor: ProxyFloor, direction: str) -> None:
-        """电梯经过楼层"""
-        pass
+        """电梯经过楼层 - 检查前方是否有顺路的呼叫"""
+        if self.en_route_pickup:
+            self._retarget_en_route(elevator, floor.floor, Direction(direction))
+
+    def _retarget_en_route(self, elevator: ProxyElevator, passing_floor: int, direction: Direction) -> None:
+        """
+        运行中的载客电梯顺路停靠：经过楼层和当前目标之间有同方向呼叫时，立即改派到最近的一个
+
+        防止改派引起抖动和卡死（见 chat/ 中的卡死修复记录）：
+        - 只改派运行中的电梯；停靠中的电梯使用 immediate 会跳过上客
+        - 新目标严格位于经过楼层和原目标之间，方向不变，不会原地改派或折返，每次改派都缩短本段行程
+        - 至少有一位乘客的目的地在新目标之后，停靠后电梯继续同方向行驶，等待的乘客一定能上梯
+        - 不停靠指派给其他电梯的呼叫、其他同方向电梯正要停靠的楼层，以及到达时预计满载的楼层
+        """
+        if elevator.target_floor_direction != direction or not elevator.passengers:
+            return
+        target = elevator.target_floor
+        if self.dispatcher is not None:
+            calls = self._available_calls(elevator.id, direction)
+        else:
+            calls = self.demand.floors(direction)
+        if direction == Direction.UP:
+            calls = calls.above(passing_floor).below(target)
+        else:
+            calls = calls.below(passing_floor).above(target)
+        if not calls:
+            return
+
+        for other in self.elevators:
+            if other.id != elevator.id and other.target_floor_direction == direction:
+                calls.discard(other.target_floor)
+        calls = self._skip_full_pickups(elevator, passing_floor, direction, calls)
+        stop = calls.min() if direction == Direction.UP else calls.max()
+        if stop is None:
+            return
+        destinations = FloorSet(self.passenger_destinations.get(pid, stop) for pid in elevator.passengers)
+        beyond = destinations.above(stop) if direction == Direction.UP else destinations.below(stop)
+        if not beyond:
+            return
+
+        self._parked.pop(elevator.id, None)
+        elevator.go_to_floor(stop, immediate=True)
+        log.debug(lambda: f"  -> E{elevator.id} 顺路停靠 F{stop}（原目标 F{target}）")
 
 
 if __name__ == "__main__":
@@ -4,6 +4,7 @@ Unified API Client for Elevator Saga
 使用统一数据模型的客户端API封装
 """
 import json
+import time
 import urllib.error
 import urllib.request
 from typing import Any, Dict, Optional, Union
@@ -31,6 +32,8 @@ class ElevatorAPIClient:
         self._cached_tick: int = -1
         self._tick_processed: bool = False  # 标记当前tick是否已处理完成
         self._client_id: Optional[str] = None  # 客户端ID，用于识别在模拟器中的身份
+        # 累计的响应解析耗时（JSON解析和模型构造），供耗时分析区分网络和解析
+        self.decode_seconds: float = 0.0
 
         # 设置无代理的urllib opener用于绕过代理
         self._setup_no_proxy_opener()
@@ -93,6 +96,7 @@ class ElevatorAPIClient:
 
         # debug_log(f"Fetching new state (force_reload={force_reload}, tick_processed={self._tick_processed})")
         response_data = self._send_get_request("/api/state")
+        decode_start = time.perf_counter()
         if "error" not in response_data:
             # 直接使用服务端返回的真实数据创建SimulationState
             elevators = [ElevatorState.from_dict(e) for e in response_data.get("elevators", [])]
@@ -144,6 +148,7 @@ class ElevatorAPIClient:
             self._cached_tick = simulation_state.tick
             self._tick_processed = False  # 重置处理标志，表示新tick开始
 
+            self.decode_seconds += time.perf_counter() - decode_start
             return simulation_state
         else:
             raise RuntimeError(f"Failed to get state: {response_data.get('error')}")
@@ -160,6 +165,7 @@ class ElevatorAPIClient:
             "current_tick": self._cached_tick if self._cached_tick >= 0 else 0
         })
 
+        decode_start = time.perf_counter()
         if "error" not in response_data:
             # 使用服务端返回的真实数据
             events_data = response_data.get("events", [])
@@ -185,6 +191,7 @@ class ElevatorAPIClient:
             )
 
             # debug_log(f"Step response: tick={step_response.tick}, events={len(events)}")
+            self.decode_seconds += time.perf_counter() - decode_start
             return step_response
         else:
             raise RuntimeError(f"Step failed: {response_data.get('error')}")
@@ -193,7 +200,7 @@ class ElevatorAPIClient:
         """发送电梯命令"""
         endpoint = self._get_elevator_endpoint(command)
         debug_log(
-            f"Sending elevator command: {command.command_type} to elevator {command.elevator_id} To:F{command.floor}"
+            "Sending elevator command: %s to elevator %s To:F%s", command.command_type, command.elevator_id, command.floor
         )
 
         response_data = self._send_post_request(endpoint, command.parameters)
@@ -228,9 +235,11 @@ class ElevatorAPIClient:
 
         try:
             with self.opener.open(url, timeout=60) as response:
-                data: Dict[str, Any] = json.loads(response.read().decode("utf-8"))
-                # debug_log(f"GET {url} -> {response.status}")
-                return data
+                body = response.read()
+            decode_start = time.perf_counter()
+            data: Dict[str, Any] = json.loads(body.decode("utf-8"))
+            self.decode_seconds += time.perf_counter() - decode_start
+            return data
         except urllib.error.URLError as e:
             raise RuntimeError(f"GET {url} failed: {e}")
 
@@ -294,8 +303,10 @@ class ElevatorAPIClient:
 
         try:
             with self.opener.open(req, timeout=600) as response:
-                response_data: Dict[str, Any] = json.loads(response.read().decode("utf-8"))
-                # debug_log(f"POST {url} -> {response.status}")
-                return response_data
+                body = response.read()
+            decode_start = time.perf_counter()
+            response_data: Dict[str, Any] = json.loads(body.decode("utf-8"))
+            self.decode_seconds += time.perf_counter() - decode_start
+            return response_data
         except urllib.error.URLError as e:
             raise RuntimeError(f"POST {url} failed: {e}")
@@ -6,16 +6,21 @@ Elevator Controller Base Class
 import os
 import time
 from abc import ABC, abstractmethod
+from pathlib import Path
 from pprint import pprint
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from elevator.client.api_client import ElevatorAPIClient
+from elevator.client.lookahead import LookaheadPlanner, LookaheadResult, Plan
+from elevator.client.profiling import CALLBACK_NAMES, DEFAULT_BUDGET_MS, CallbackProfiler
 from elevator.client.proxy_models import ProxyElevator, ProxyFloor, ProxyPassenger
 from elevator.core.models import EventType, SimulationEvent, SimulationState
-from elevator.visualization.recorder import SimulationRecorder
+from elevator.core.simulator import ElevatorSimulation
+from elevator.utils import log
 
 # 避免循环导入，使用运行时导入
 from elevator.utils.debug import debug_log
+from elevator.visualization.recorder import SimulationRecorder
 
 
 class ElevatorController(ABC):
@@ -41,13 +46,23 @@ class ElevatorController(ABC):
         self.current_tick = 0
         self.is_running = False
         self.current_traffic_max_tick: int = 0
+        # 注册的客户端类型，None 时读取环境变量 ELEVATOR_CLIENT_TYPE
+        self.client_type: Optional[str] = None
 
         # 初始化API客户端
         self.api_client = ElevatorAPIClient(server_url)
 
         # 初始化记录器
         self.enable_recording = enable_recording
-        self.recorder = SimulationRecorder() if enable_recording else None
+        self.recorder = SimulationRecorder(background=True) if enable_recording else None
+
+        # 前瞻规划：每次前瞻的默认时间预算（毫秒）
+        self.lookahead_budget_ms: float = 20.0
+        self._lookahead_planner: Optional[LookaheadPlanner] = None
+        self._lookahead_tick: int = -1
+
+        # 回调耗时分析（enable_profiling 开启）
+        self.profiler: Optional[CallbackProfiler] = None
 
     @abstractmethod
     def on_init(self, elevators: List[Any], floors: List[Any]) -> None:
@@ -198,6 +213,10 @@ class ElevatorController(ABC):
         """
         启动控制器
         """
+        # debug 模式在本次运行期间输出调度细节（默认只记录 WARNING 及以上），结束后恢复原级别
+        previous_level = log.get_level()
+        if self.debug:
+            log.configure(level=log.DEBUG)
         self.on_start()
         self.is_running = True
 
@@ -211,15 +230,39 @@ class ElevatorController(ABC):
         finally:
             self.is_running = False
             self.on_stop()
+            if self.profiler is not None and self.profiler.output is not None:
+                print(f"[PROFILE] 耗时报告: {self.profiler.save()}")
             # 保存运行记录
             if self.recorder:
                 self.recorder.save()
+            log.configure(level=previous_level)
 
     def stop(self) -> None:
         """停止控制器"""
         self.is_running = False
         print(f"停止 {self.__class__.__name__}")
 
+    def enable_profiling(
+        self, budget_ms: float = DEFAULT_BUDGET_MS, output: Optional[Path] = None, save: bool = True
+    ) -> CallbackProfiler:
+        """
+        开启回调耗时分析：每个回调的耗时分布、每个tick各阶段（network/decode/dispatch/record）的耗时和慢tick
+
+        Args:
+            budget_ms: 每个tick的耗时预算，超出的tick记入慢tick报告
+            output: 运行结束时写出报告的路径，默认 profiles/<控制器类名>_<时间>.json
+            save: 运行结束时是否写出报告；不写出时可通过 profiling_report() 获取
+        """
+        if output is None and save:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            output = Path("profiles") / f"{self.__class__.__name__}_{timestamp}.json"
+        self.profiler = CallbackProfiler(budget_ms, output if save else None)
+        return self.profiler
+
+    def profiling_report(self) -> Optional[Dict[str, Any]]:
+        """当前的耗时报告，未开启分析时返回 None"""
+        return self.profiler.report() if self.profiler is not None else None
+
     def on_simulation_complete(self, final_state: Dict[str, Any]) -> None:
         """
         模拟完成时的回调 - 可选实现
@@ -229,11 +272,46 @@ class ElevatorController(ABC):
         """
         pass
 
+    def simulate_ahead(self, assignments: Plan, ticks: int = 20, budget_ms: Optional[float] = None) -> LookaheadResult:
+        """
+        在当前状态的本地分支上按候选方案向前模拟
+
+        Args:
+            assignments: 电梯ID -> 目标楼层（或依次前往的楼层列表）
+            ticks: 前瞻的tick数
+            budget_ms: 时间预算（毫秒），默认使用 lookahead_budget_ms
+
+        Returns:
+            预测的等待时间和系统时间
+        """
+        budget = self.lookahead_budget_ms if budget_ms is None else budget_ms
+        return self._get_lookahead_planner().evaluate(assignments, ticks, budget_ms=budget)
+
+    def simulate_ahead_many(
+        self, candidates: Sequence[Plan], ticks: int = 20, budget_ms: Optional[float] = None
+    ) -> List[LookaheadResult]:
+        """
+        依次评估多个候选方案，所有方案共享同一个时间预算（超出后其余方案提前结束并标记 truncated）
+
+        Returns:
+            与 candidates 顺序一致的结果列表
+        """
+        budget = self.lookahead_budget_ms if budget_ms is None else budget_ms
+        return self._get_lookahead_planner().evaluate_many(candidates, ticks, budget_ms=budget)
+
+    def _get_lookahead_planner(self) -> LookaheadPlanner:
+        """获取当前tick的前瞻规划器（每个tick只构建一次基准模拟）"""
+        state = self.api_client.get_state()
+        if self._lookahead_planner is None or self._lookahead_tick != state.tick:
+            self._lookahead_planner = LookaheadPlanner(ElevatorSimulation.from_state(state))
+            self._lookahead_tick = state.tick
+        return self._lookahead_planner
+
     def _run_event_driven_simulation(self) -> None:
         """运行事件驱动的模拟"""
         try:
             # 从环境变量读取客户端类型（gui 或 algorithm）
-            client_type = os.environ.get("ELEVATOR_CLIENT_TYPE", "algorithm").lower()
+            client_type = (self.client_type or os.environ.get("ELEVATOR_CLIENT_TYPE", "algorithm")).lower()
 
             # 首先注册为指定的客户端类型
             if not self.api_client.register_client(client_type):
@@ -243,8 +321,8 @@ class ElevatorController(ABC):
             try:
                 state = self.api_client.get_state()
             except ConnectionResetError as ex:
-                print(f"模拟器可能并没有开启，请检查模拟器是否启动 {self.api_client.base_url}")
-                os._exit(1)
+                # 抛出而不是退出进程：控制器可能运行在可视化服务器进程中（见 runner.py）
+                raise ConnectionError(f"模拟器可能并没有开启，请检查模拟器是否启动 {self.api_client.base_url}") from ex
             if state.tick > 0:
                 print("模拟器可能已经开始了一次模拟，执行重置...")
                 self.api_client.reset()
@@ -269,6 +347,11 @@ class ElevatorController(ABC):
                 if self.current_tick >= self.current_traffic_max_tick:
                     break
 
+                # 耗时分析：每个阶段和回调结束时打点，未开启时只有一次 None 判断
+                profiler = self.profiler
+                if profiler is not None:
+                    profiler.begin_tick(getattr(self.api_client, "decode_seconds", 0.0))
+
                 # 执行一个tick的模拟，从1开始
                 step_response = self.api_client.step(1)
                 # 更新当前状态
@@ -279,25 +362,38 @@ class ElevatorController(ABC):
                 # 获取当前状态
                 state = self.api_client.get_state()
                 self._update_wrappers(state)
+                if profiler is not None:
+                    profiler.mark("network")
 
                 # 事件执行前回调
                 self.on_event_execute_start(self.current_tick, events, self.elevators, self.floors)
+                if profiler is not None:
+                    profiler.mark_callback("on_event_execute_start")
 
                 # 处理事件
                 if events:
                     for event in events:
                         self._handle_single_event(event)
+                        if profiler is not None:
+                            profiler.mark_callback(CALLBACK_NAMES.get(event.type, event.type.value))
 
                 # 获取更新后的状态
                 state = self.api_client.get_state()
                 self._update_wrappers(state)
+                if profiler is not None:
+                    profiler.mark("network")
 
                 # 事件执行后回调
                 self.on_event_execute_end(self.current_tick, events, self.elevators, self.floors)
+                if profiler is not None:
+                    profiler.mark_callback("on_event_execute_end")
 
                 # 记录当前状态快照
                 if self.recorder:
                     self.recorder.record_state(state, events)
+                if profiler is not None:
+                    profiler.mark("record")
+                    profiler.end_tick(self.current_tick, getattr(self.api_client, "decode_seconds", 0.0))
 
                 # 标记tick处理完成，使API客户端缓存失效
                 self.api_client.mark_tick_processed()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Demand Index
+楼层呼叫需求索引 - 由呼叫/上梯事件增量维护，按方向保存有序的呼叫楼层及等待人数
+"""
+from typing import Dict, Optional, Tuple
+
+from elevator.client.floor_set import FloorSet
+from elevator.core.models import Direction, EventType, SimulationEvent
+
+_CALL_DIRECTIONS = {
+    EventType.UP_BUTTON_PRESSED: Direction.UP,
+    EventType.DOWN_BUTTON_PRESSED: Direction.DOWN,
+}
+
+
+class DemandIndex:
+    """
+    楼层呼叫需求索引
+
+    替代每次决策时遍历所有楼层代理读取 up_queue/down_queue：
+    呼叫事件加入索引，上梯事件移出索引，呼叫楼层保存在有序楼层集合中。
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[int, Tuple[int, Direction]] = {}  # passenger_id -> (楼层, 方向)
+        self._counts: Dict[Direction, Dict[int, int]] = {Direction.UP: {}, Direction.DOWN: {}}
+        self._floors: Dict[Direction, FloorSet] = {Direction.UP: FloorSet(), Direction.DOWN: FloorSet()}
+
+    def clear(self) -> None:
+        """清空索引（切换流量时调用）"""
+        self._calls.clear()
+        for direction in (Direction.UP, Direction.DOWN):
+            self._counts[direction].clear()
+            self._floors[direction].clear()
+
+    def add_call(self, passenger_id: int, floor: int, direction: Direction) -> None:
+        """记录一个等待中的乘客"""
+        if passenger_id in self._calls:
+            return
+        self._calls[passenger_id] = (floor, direction)
+        counts = self._counts[direction]
+        if floor in counts:
+            counts[floor] += 1
+        else:
+            counts[floor] = 1
+            self._floors[direction].add(floor)
+
+    def remove_call(self, passenger_id: int) -> Optional[int]:
+        """乘客上梯后移出索引，返回其所在楼层"""
+        call = self._calls.pop(passenger_id, None)
+        if call is None:
+            return None
+        floor, direction = call
+        counts = self._counts[direction]
+        counts[floor] -= 1
+        if counts[floor] == 0:
+            del counts[floor]
+            self._floors[direction].discard(floor)
+        return floor
+
+    def apply_event(self, event: SimulationEvent) -> None:
+        """根据模拟事件更新索引，与需求无关的事件被忽略"""
+        direction = _CALL_DIRECTIONS.get(event.type)
+        if direction is not None:
+            self.add_call(event.data["passenger"], event.data["floor"], direction)
+        elif event.type == EventType.PASSENGER_BOARD:
+            self.remove_call(event.data["passenger"])
+
+    def count(self, floor: int, direction: Direction) -> int:
+        """某楼层某方向的等待人数"""
+        return self._counts[direction].get(floor, 0)
+
+    def floors(self, direction: Direction) -> FloorSet:
+        """某方向有呼叫的楼层（只读，需要修改时请先复制）"""
+        return self._floors[direction]
+
+    def all_floors(self) -> FloorSet:
+        """任一方向有呼叫的楼层"""
+        return self._floors[Direction.UP] | self._floors[Direction.DOWN]
+
+    def __len__(self) -> int:
+        """等待中的乘客数"""
+        return len(self._calls)
+
+    def __bool__(self) -> bool:
+        return bool(self._calls)
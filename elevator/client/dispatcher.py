@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Global Dispatcher
+全局调度器 - 每个tick构建 电梯×楼层呼叫 的代价矩阵（预计到达时间），求解指派，避免多部电梯追同一个呼叫；
+一部电梯装不下的呼叫按剩余容量拆分给多部电梯
+"""
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from elevator.core.models import Direction, ElevatorState
+
+# 楼层呼叫：(楼层, 方向)
+HallCall = Tuple[int, Direction]
+
+# 行程时间模型（与模拟器一致：每层10个位置单位，匀速每tick 2个单位）
+TICKS_PER_FLOOR = 5.0  # 匀速运行每层所需tick
+START_TICKS = 1.0  # 起步/减速的额外tick
+STOP_TICKS = 3.0  # 中途停靠一次的额外tick（减速、停靠、起步）
+FULL_PENALTY = 1.0e4  # 满载电梯接新呼叫的惩罚
+GREEDY_RESERVE = 0.2  # 时间预算中为贪心补全预留的比例
+
+
+def _direction_sign(direction: Direction) -> int:
+    if direction == Direction.UP:
+        return 1
+    if direction == Direction.DOWN:
+        return -1
+    return 0
+
+
+def _greedy_fill(cost: np.ndarray, rows: Sequence[int], col_taken: np.ndarray, assignment: np.ndarray) -> None:
+    """按各行最小代价从小到大，依次为剩余行指派最便宜的空闲列"""
+    rows = np.asarray(rows, dtype=int)
+    if len(rows) == 0:
+        return
+    masked = np.where(col_taken[None, :], np.inf, cost[rows])
+    for index in np.argsort(masked.min(axis=1), kind="stable"):
+        candidates = masked[index]
+        col = int(candidates.argmin())
+        if not np.isfinite(candidates[col]):
+            break
+        assignment[rows[index]] = col
+        masked[:, col] = np.inf
+
+
+def solve_assignment(cost: np.ndarray, deadline: Optional[float] = None) -> Tuple[np.ndarray, bool]:
+    """
+    求解矩形指派问题（最小化总代价），最短增广路匈牙利算法，内层循环按列向量化
+
+    Args:
+        cost: n×m 代价矩阵
+        deadline: time.perf_counter() 截止时间，超时后剩余的行改用贪心指派
+
+    Returns:
+        (assignment, optimal)：assignment[i] 为第 i 行指派的列（未指派为 -1）；
+        optimal 表示是否在截止时间内完成精确求解
+    """
+    cost = np.asarray(cost, dtype=float)
+    n, m = cost.shape
+    if n == 0 or m == 0:
+        return np.full(n, -1, dtype=int), True
+    if n > m:
+        # 算法要求行数不超过列数，转置求解后再映射回来
+        transposed, optimal = solve_assignment(cost.T, deadline)
+        assignment = np.full(n, -1, dtype=int)
+        for col, row in enumerate(transposed):
+            if row >= 0:
+                assignment[row] = col
+        return assignment, optimal
+
+    if m > n:
+        # 每行只可能用到自己最便宜的 n 列（其余行至多占用 n-1 列），其余列可剪掉
+        keep = np.unique(np.argpartition(cost, n - 1, axis=1)[:, :n])
+        if len(keep) < m:
+            reduced_assignment, optimal = solve_assignment(cost[:, keep], deadline)
+            assignment = np.full(n, -1, dtype=int)
+            assigned = reduced_assignment >= 0
+            assignment[assigned] = keep[reduced_assignment[assigned]]
+            return assignment, optimal
+
+    inf = np.inf
+    u = np.zeros(n)  # 行势
+    v = np.zeros(m)  # 列势
+    col_of_row = np.full(n, -1, dtype=int)
+    row_of_col = np.full(m, -1, dtype=int)
+    free_cols = np.arange(m)
+    # 内层循环复用的缓冲区
+    reduced = np.empty(m)
+    improve = np.empty(m, dtype=bool)
+
+    solved = 0
+    for current_row in range(n):
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        # 从 current_row 出发，在缩减代价图上找到空闲列的最短增广路（Dijkstra）
+        # frontier 为未确定列的当前最短距离，确定后置为 inf，距离转存到 settled
+        frontier = np.full(m, inf)
+        settled = np.zeros(m)
+        unsettled = np.ones(m, dtype=bool)
+        path = np.full(m, -1, dtype=int)
+        visited_rows = [current_row]
+        min_value = 0.0
+        row = current_row
+        while True:
+            if deadline is not None and time.perf_counter() > deadline:
+                # 超时：本行尚未修改任何匹配，直接放弃
+                sink = -1
+                break
+            np.subtract(cost[row], v, out=reduced)
+            reduced += min_value - u[row]
+            np.less(reduced, frontier, out=improve)
+            improve &= unsettled
+            np.copyto(frontier, reduced, where=improve)
+            np.copyto(path, row, where=improve)
+            col = int(frontier.argmin())
+            min_value = float(frontier[col])
+            if row_of_col[col] >= 0:
+                # 代价相同时优先选择空闲列，增广路更短
+                free_values = frontier[free_cols]
+                index = int(free_values.argmin())
+                if free_values[index] == min_value:
+                    col = int(free_cols[index])
+            settled[col] = min_value
+            frontier[col] = inf
+            unsettled[col] = False
+            if row_of_col[col] < 0:
+                sink = col
+                break
+            row = int(row_of_col[col])
+            visited_rows.append(row)
+
+        if sink < 0:
+            break
+
+        # 更新势
+        u[current_row] += min_value
+        rows = np.array(visited_rows[1:], dtype=int)
+        u[rows] += min_value - settled[col_of_row[rows]]
+        visited_cols = ~unsettled
+        v[visited_cols] -= min_value - settled[visited_cols]
+        # 沿增广路翻转
+        col = sink
+        while True:
+            row = int(path[col])
+            row_of_col[col] = row
+            col_of_row[row], col = col, col_of_row[row]
+            if row == current_row:
+                break
+        free_cols = free_cols[free_cols != sink]
+        solved += 1
+
+    assignment = col_of_row
+    if solved == n:
+        return assignment, True
+
+    col_taken = np.zeros(m, dtype=bool)
+    col_taken[assignment[assignment >= 0]] = True
+    _greedy_fill(cost, list(range(solved, n)), col_taken, assignment)
+    return assignment, False
+
+
+class GlobalDispatcher:
+    """
+    全局调度器
+
+    代价为电梯到达呼叫楼层的预计tick数：
+    - 空闲电梯直接前往
+    - 呼叫在电梯扫描方向前方且方向一致时，顺路接客，计入途中已承诺的停靠
+    - 否则需要先走完当前扫描（到最远的已承诺停靠）再折返
+    满载电梯接新呼叫的代价加上 FULL_PENALTY。
+    等待人数超过指派电梯的剩余容量时，同一个呼叫可以指派给多部电梯。
+    """
+
+    def __init__(self, num_floors: int, budget_ms: float = 5.0, sticky_ticks: float = 10.0):
+        """
+        Args:
+            num_floors: 楼层数
+            budget_ms: 每次指派的时间预算（毫秒），超时后改用贪心指派
+            sticky_ticks: 保持上一次指派的代价优惠，避免指派在电梯之间来回切换
+        """
+        self.num_floors = num_floors
+        self.budget_ms = budget_ms
+        self.sticky_ticks = sticky_ticks
+        self.assignments: Dict[HallCall, List[int]] = {}  # 呼叫 -> 电梯ID列表
+        # 最近一次指派的统计
+        self.last_elapsed_ms: float = 0.0
+        self.last_optimal: bool = True
+
+    def cost_matrix(
+        self,
+        elevators: Sequence[ElevatorState],
+        calls: Sequence[HallCall],
+        committed_stops: Sequence[Iterable[int]],
+        sweep: Sequence[Direction],
+    ) -> np.ndarray:
+        """
+        构建 电梯×呼叫 的预计到达时间矩阵
+
+        Args:
+            elevators: 电梯状态
+            calls: 楼层呼叫
+            committed_stops: 每部电梯已承诺的停靠楼层（电梯内乘客目的地、当前目标）
+            sweep: 每部电梯的扫描方向，STOPPED 表示空闲
+        """
+        num_elevators = len(elevators)
+        position = np.array([e.current_floor_float for e in elevators], dtype=float)
+        sweep_sign = np.array([_direction_sign(d) for d in sweep], dtype=int)
+        full = np.array([e.is_full for e in elevators], dtype=bool)
+
+        # 已承诺停靠的位图及其前缀和：prefix[e, k] 为电梯 e 在 k 层以下的停靠数
+        stops = np.zeros((num_elevators, self.num_floors), dtype=np.int32)
+        for index, floors in enumerate(committed_stops):
+            for floor in floors:
+                if 0 <= floor < self.num_floors:
+                    stops[index, floor] = 1
+        prefix = np.zeros((num_elevators, self.num_floors + 1), dtype=np.int32)
+        np.cumsum(stops, axis=1, out=prefix[:, 1:])
+        stop_count = prefix[:, -1]
+        has_stops = stop_count > 0
+        highest = np.where(has_stops, self.num_floors - 1 - np.argmax(stops[:, ::-1], axis=1), position)
+        lowest = np.where(has_stops, np.argmax(stops, axis=1), position)
+        extreme = np.where(sweep_sign > 0, np.maximum(highest, position), np.minimum(lowest, position))
+
+        call_floor = np.array([floor for floor, _ in calls], dtype=int)
+        call_sign = np.array([_direction_sign(direction) for _, direction in calls], dtype=int)
+
+        pos = position[:, None]
+        target = call_floor[None, :]
+        sign = sweep_sign[:, None]
+        idle = sign == 0
+        ahead = ((sign > 0) & (target >= pos) & (call_sign[None, :] > 0)) | (
+            (sign < 0) & (target <= pos) & (call_sign[None, :] < 0)
+        )
+        direct = idle | ahead
+
+        distance = np.where(
+            direct, np.abs(target - pos), np.abs(extreme[:, None] - pos) + np.abs(extreme[:, None] - target)
+        )
+
+        # 顺路时只计入途中的停靠，折返时计入所有已承诺的停靠
+        rows = np.arange(num_elevators)[:, None]
+        up_from = np.clip(np.floor(position).astype(int) + 1, 0, self.num_floors)[:, None]
+        down_from = np.clip(np.ceil(position).astype(int), 0, self.num_floors)[:, None]
+        between_up = prefix[rows, np.clip(target, 0, self.num_floors)] - prefix[rows, up_from]
+        between_down = prefix[rows, down_from] - prefix[rows, np.clip(target + 1, 0, self.num_floors)]
+        between = np.clip(np.where(sign > 0, between_up, between_down), 0, None)
+        stops_en_route = np.where(direct, between, stop_count[:, None])
+
+        eta = TICKS_PER_FLOOR * distance + STOP_TICKS * stops_en_route + np.where(distance > 0, START_TICKS, 0.0)
+        eta = eta + np.where(full[:, None], FULL_PENALTY, 0.0)
+        return eta
+
+    def assign(
+        self,
+        elevators: Sequence[ElevatorState],
+        calls: Sequence[HallCall],
+        committed_stops: Sequence[Iterable[int]],
+        sweep: Sequence[Direction],
+        waiting: Optional[Sequence[int]] = None,
+    ) -> Dict[HallCall, List[int]]:
+        """
+        将呼叫指派给电梯（每部电梯最多一个呼叫）
+
+        Args:
+            waiting: 每个呼叫的等待人数。给出时按电梯剩余容量拆分需求：
+                指派的电梯装不下时，剩余人数继续在未指派的电梯中求解指派
+
+        Returns:
+            呼叫 -> 电梯ID列表（按指派先后）
+        """
+        start = time.perf_counter()
+        if not elevators or not calls:
+            self.assignments = {}
+            self.last_elapsed_ms = (time.perf_counter() - start) * 1000.0
+            self.last_optimal = True
+            return self.assignments
+
+        cost = self.cost_matrix(elevators, calls, committed_stops, sweep)
+        if self.sticky_ticks:
+            row_of = {e.id: index for index, e in enumerate(elevators)}
+            for col, call in enumerate(calls):
+                for owner in self.assignments.get(call, ()):
+                    row = row_of.get(owner)
+                    if row is not None:
+                        cost[row, col] -= self.sticky_ticks
+
+        deadline = start + self.budget_ms * (1.0 - GREEDY_RESERVE) / 1000.0
+        free = np.array([e.max_capacity - len(e.passengers) for e in elevators])
+        remaining = np.array(waiting, dtype=int) if waiting is not None else None
+        rows = np.arange(len(elevators))
+        cols = np.arange(len(calls))
+        result: Dict[HallCall, List[int]] = {}
+        optimal = True
+        while len(rows) and len(cols):
+            sub_cost = cost[np.ix_(rows, cols)]
+            assignment, solved = solve_assignment(sub_cost, deadline)
+            optimal = optimal and solved
+            assigned_rows = []
+            split_cols = []
+            for index, col_index in enumerate(assignment):
+                if col_index < 0 or sub_cost[index, col_index] >= FULL_PENALTY / 2:
+                    continue
+                row, col = rows[index], cols[col_index]
+                result.setdefault(calls[col], []).append(elevators[row].id)
+                assigned_rows.append(row)
+                if remaining is not None:
+                    remaining[col] -= free[row]
+                    if remaining[col] > 0:
+                        split_cols.append(col)
+            if remaining is None or not assigned_rows:
+                break
+            # 装不下的呼叫继续在其余电梯中指派
+            rows = np.setdiff1d(rows, assigned_rows)
+            cols = np.array(split_cols, dtype=int)
+
+        self.assignments = result
+        self.last_optimal = optimal
+        self.last_elapsed_ms = (time.perf_counter() - start) * 1000.0
+        return result
+
+    def calls_of(self, elevator_id: int) -> List[HallCall]:
+        """指派给某部电梯的呼叫"""
+        return [call for call, owners in self.assignments.items() if elevator_id in owners]
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Floor Set
+有序楼层集合 - 以整数位图保存楼层，支持后继/前驱/最近楼层查询
+"""
+from typing import Iterable, Iterator, Optional
+
+
+class FloorSet:
+    """
+    有序楼层集合
+
+    第 n 位表示楼层 n 是否在集合中。后继、前驱、最值和集合运算都是整数位运算，
+    200 层楼只占 4 个机器字，查询开销与楼层数基本无关。
+    """
+
+    __slots__ = ("_bits",)
+
+    def __init__(self, floors: Iterable[int] = ()):
+        bits = 0
+        for floor in floors:
+            if floor < 0:
+                raise ValueError(f"Invalid floor: {floor}")
+            bits |= 1 << floor
+        self._bits = bits
+
+    @classmethod
+    def from_bits(cls, bits: int) -> "FloorSet":
+        floor_set = cls()
+        floor_set._bits = bits
+        return floor_set
+
+    @property
+    def bits(self) -> int:
+        return self._bits
+
+    # ==================== 修改 ====================
+
+    def add(self, floor: int) -> None:
+        if floor < 0:
+            raise ValueError(f"Invalid floor: {floor}")
+        self._bits |= 1 << floor
+
+    def discard(self, floor: int) -> None:
+        if floor >= 0:
+            self._bits &= ~(1 << floor)
+
+    def clear(self) -> None:
+        self._bits = 0
+
+    # ==================== 查询 ====================
+
+    def min(self) -> Optional[int]:
+        """最低楼层"""
+        bits = self._bits
+        return (bits & -bits).bit_length() - 1 if bits else None
+
+    def max(self) -> Optional[int]:
+        """最高楼层"""
+        return self._bits.bit_length() - 1 if self._bits else None
+
+    def successor(self, floor: int) -> Optional[int]:
+        """大于 floor 的最低楼层"""
+        shift = max(floor + 1, 0)
+        rest = self._bits >> shift
+        return shift + (rest & -rest).bit_length() - 1 if rest else None
+
+    def predecessor(self, floor: int) -> Optional[int]:
+        """小于 floor 的最高楼层"""
+        if floor <= 0:
+            return None
+        rest = self._bits & ((1 << floor) - 1)
+        return rest.bit_length() - 1 if rest else None
+
+    def nearest(self, floor: int) -> Optional[int]:
+        """距离 floor 最近的楼层（含 floor 本身），距离相同时取较低楼层"""
+        if floor in self:
+            return floor
+        lower = self.predecessor(floor)
+        upper = self.successor(floor)
+        if lower is None:
+            return upper
+        if upper is None or floor - lower <= upper - floor:
+            return lower
+        return upper
+
+    def above(self, floor: int) -> "FloorSet":
+        """高于 floor 的楼层子集"""
+        shift = max(floor + 1, 0)
+        return FloorSet.from_bits((self._bits >> shift) << shift)
+
+    def below(self, floor: int) -> "FloorSet":
+        """低于 floor 的楼层子集"""
+        return FloorSet.from_bits(self._bits & ((1 << floor) - 1) if floor > 0 else 0)
+
+    # ==================== 集合协议 ====================
+
+    def __contains__(self, floor: object) -> bool:
+        return isinstance(floor, int) and floor >= 0 and bool(self._bits >> floor & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        """按楼层升序遍历"""
+        bits = self._bits
+        while bits:
+            low = bits & -bits
+            yield low.bit_length() - 1
+            bits ^= low
+
+    def __len__(self) -> int:
+        return bin(self._bits).count("1")
+
+    def __bool__(self) -> bool:
+        return self._bits != 0
+
+    def __or__(self, other: "FloorSet") -> "FloorSet":
+        return FloorSet.from_bits(self._bits | other._bits)
+
+    def __and__(self, other: "FloorSet") -> "FloorSet":
+        return FloorSet.from_bits(self._bits & other._bits)
+
+    def __sub__(self, other: "FloorSet") -> "FloorSet":
+        return FloorSet.from_bits(self._bits & ~other._bits)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FloorSet) and self._bits == other._bits
+
+    # 集合可变（add/discard），与 set 一样不可哈希
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"FloorSet({list(self)})"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+In-process API Client
+进程内API客户端 - 直接调用本地模拟引擎，不经过HTTP
+"""
+import json
+from typing import Any, Dict, Optional
+
+from elevator.client.api_client import ElevatorAPIClient
+from elevator.core.simulator import ElevatorSimulation
+from elevator.server.local_server import SimulatorAPI
+from elevator.utils.debug import debug_log
+
+
+class LocalAPIClient(ElevatorAPIClient):
+    """
+    进程内API客户端
+
+    与 ElevatorAPIClient 的接口和解码逻辑完全相同，只替换传输层：
+    请求直接交给 SimulatorAPI 分发，任何控制器都可以不启动服务器运行在本地引擎上::
+
+        controller = LookV2Controller()
+        controller.api_client = LocalAPIClient(ElevatorSimulation(traffic))
+        controller.start()
+    """
+
+    def __init__(self, simulation: ElevatorSimulation):
+        self.simulation = simulation
+        self.api = SimulatorAPI(simulation)
+        super().__init__("local://simulation")
+
+    def _setup_no_proxy_opener(self) -> None:
+        """进程内调用不需要 urllib opener"""
+        self.opener = None
+
+    def register_client(self, client_type: str = "algorithm") -> bool:
+        """注册客户端为算法或GUI客户端"""
+        status, response = self.api.handle("POST", "/api/client/register", {}, {"x-client-type": client_type})
+        success = status == 200 and bool(response.get("success", False))
+        if success:
+            self._client_id = response.get("client_id")
+            debug_log(f"Client registered as {client_type}: {self._client_id}")
+        return success
+
+    def _send_get_request(self, endpoint: str) -> Dict[str, Any]:
+        """发送GET请求"""
+        return self._dispatch("GET", endpoint, {})
+
+    def _send_post_request(self, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """发送POST请求"""
+        return self._dispatch("POST", endpoint, data)
+
+    def _dispatch(self, method: str, endpoint: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        headers: Dict[str, str] = {}
+        if self._client_id:
+            headers["x-client-id"] = self._client_id
+        status, response = self.api.handle(method, endpoint, data, headers)
+        if status >= 400:
+            # 与HTTP客户端一致：错误状态码视为请求失败
+            raise RuntimeError(f"{method} {endpoint} failed: HTTP {status} {json.dumps(response)}")
+        return response
+
+    @property
+    def client_id(self) -> Optional[str]:
+        return self._client_id
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Lookahead Planner
+前瞻规划 - 在本地引擎的分支上按候选方案向前模拟，预测等待时间和系统时间
+"""
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Mapping, Optional, Sequence, Set, Union
+
+from elevator.core.models import EventType
+from elevator.core.simulator import ElevatorSimulation
+
+# 候选方案：电梯ID -> 目标楼层，或按顺序依次前往的楼层列表
+Plan = Mapping[int, Union[int, Sequence[int]]]
+
+
+@dataclass
+class LookaheadResult:
+    """前瞻模拟结果
+
+    未上梯/未到达的乘客按模拟结束时刻计入等待/系统时间（截尾估计）。
+    """
+
+    plan: Dict[int, List[int]]
+    ticks: int  # 实际模拟的tick数
+    average_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+    average_system_time: float = 0.0
+    completed_passengers: int = 0
+    waiting_passengers: int = 0
+    truncated: bool = False  # 是否因时间预算提前结束
+    elapsed_ms: float = 0.0
+    finished_plans: Set[int] = field(default_factory=set)  # 已走完所有目标的电梯
+
+    @property
+    def cost(self) -> float:
+        """用于比较方案的代价（越小越好）"""
+        return self.average_system_time
+
+
+def _normalize_plan(plan: Plan) -> Dict[int, List[int]]:
+    return {
+        int(elevator_id): [int(floors)] if isinstance(floors, int) else [int(f) for f in floors]
+        for elevator_id, floors in plan.items()
+    }
+
+
+class LookaheadPlanner:
+    """
+    前瞻规划器
+
+    持有一个基准模拟，每个候选方案在其写时复制分支上运行，互不影响。
+    """
+
+    def __init__(self, base: ElevatorSimulation):
+        """
+        Args:
+            base: 基准模拟（不会被修改）
+        """
+        self.base = base
+
+    def evaluate(
+        self,
+        plan: Plan,
+        ticks: int,
+        budget_ms: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> LookaheadResult:
+        """
+        在分支上按方案模拟 ticks 个tick
+
+        Args:
+            plan: 候选方案
+            ticks: 前瞻的tick数
+            budget_ms: 时间预算（毫秒），超出后提前结束
+            deadline: 绝对截止时间（time.perf_counter() 时钟），与 budget_ms 取较早者
+        """
+        start = time.perf_counter()
+        if budget_ms is not None:
+            budget_deadline = start + budget_ms / 1000.0
+            deadline = budget_deadline if deadline is None else min(deadline, budget_deadline)
+
+        normalized = _normalize_plan(plan)
+        sim = self.base.fork()
+        pending: Dict[int, Deque[int]] = {eid: deque(floors) for eid, floors in normalized.items() if floors}
+        elevator_count = len(sim.state.elevators)
+        for elevator_id in list(pending):
+            if not 0 <= elevator_id < elevator_count:
+                raise ValueError(f"Elevator {elevator_id} not found")
+            self._dispatch_next(sim, elevator_id, pending)
+
+        # 关注的乘客：开始时未完成的乘客 + 模拟期间到达的乘客
+        tracked: Set[int] = set()
+        for floor in sim.state.floors:
+            tracked.update(floor.up_queue)
+            tracked.update(floor.down_queue)
+        for elevator in sim.state.elevators:
+            tracked.update(elevator.passengers)
+
+        simulated = 0
+        truncated = False
+        for _ in range(ticks):
+            if deadline is not None and time.perf_counter() > deadline:
+                truncated = True
+                break
+            for event in sim.step(1):
+                if event.type in (EventType.STOPPED_AT_FLOOR, EventType.IDLE):
+                    elevator_id = event.data["elevator"]
+                    if elevator_id in pending:
+                        self._dispatch_next(sim, elevator_id, pending)
+                elif event.type in (EventType.UP_BUTTON_PRESSED, EventType.DOWN_BUTTON_PRESSED):
+                    tracked.add(event.data["passenger"])
+            simulated += 1
+
+        result = self._summarize(sim, tracked, normalized, simulated, truncated)
+        result.finished_plans = {eid for eid in normalized if eid not in pending}
+        result.elapsed_ms = (time.perf_counter() - start) * 1000.0
+        return result
+
+    def evaluate_many(
+        self, plans: Sequence[Plan], ticks: int, budget_ms: Optional[float] = None
+    ) -> List[LookaheadResult]:
+        """
+        依次评估多个候选方案，所有方案共享同一个时间预算，结果顺序与输入一致
+
+        模拟是纯Python计算，线程池受GIL限制没有加速；分支持有引擎锁不能序列化到子进程，因此顺序评估。
+        """
+        deadline = time.perf_counter() + budget_ms / 1000.0 if budget_ms is not None else None
+        return [self.evaluate(plan, ticks, deadline=deadline) for plan in plans]
+
+    @staticmethod
+    def _dispatch_next(sim: ElevatorSimulation, elevator_id: int, pending: Dict[int, Deque[int]]) -> None:
+        """电梯没有排队目标时，下发方案中的下一个楼层"""
+        if sim.state.elevators[elevator_id].next_target_floor is not None:
+            return
+        queue = pending[elevator_id]
+        sim.elevator_go_to_floor(elevator_id, queue.popleft())
+        if not queue:
+            del pending[elevator_id]
+
+    @staticmethod
+    def _summarize(
+        sim: ElevatorSimulation,
+        tracked: Set[int],
+        plan: Dict[int, List[int]],
+        simulated: int,
+        truncated: bool,
+    ) -> LookaheadResult:
+        now = sim.tick
+        passengers = sim.passengers
+        wait_times: List[int] = []
+        system_times: List[int] = []
+        completed = 0
+        waiting = 0
+        for passenger_id in tracked:
+            passenger = passengers[passenger_id]
+            if passenger.pickup_tick > 0:
+                wait_times.append(passenger.pickup_tick - passenger.arrive_tick)
+            else:
+                wait_times.append(now - passenger.arrive_tick)
+                waiting += 1
+            if passenger.arrived:
+                system_times.append(passenger.dropoff_tick - passenger.arrive_tick)
+                completed += 1
+            else:
+                system_times.append(now - passenger.arrive_tick)
+
+        count = len(tracked)
+        return LookaheadResult(
+            plan=plan,
+            ticks=simulated,
+            average_wait_time=sum(wait_times) / count if count else 0.0,
+            max_wait_time=float(max(wait_times)) if wait_times else 0.0,
+            average_system_time=sum(system_times) / count if count else 0.0,
+            completed_passengers=completed,
+            waiting_passengers=waiting,
+            truncated=truncated,
+        )
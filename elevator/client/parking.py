@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Idle Parking
+空闲电梯停放策略 - 按时间衰减的呼叫楼层直方图预测需求，把空闲电梯停在预计响应时间最小的楼层
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+HALF_LIFE_TICKS = 300.0  # 呼叫记录的半衰期
+PRIOR_WEIGHT = 0.05  # 每层的先验权重（相对一次呼叫），没有历史时电梯均匀分布
+REFRESH_TICKS = 10  # 停放楼层的缓存时长，需求分布变化很慢
+
+
+class DemandForecast:
+    """
+    呼叫楼层需求预测
+
+    每次呼叫在出发楼层记 1，所有记录按半衰期指数衰减，最近的流量模式权重更高。
+    """
+
+    def __init__(self, num_floors: int, half_life: float = HALF_LIFE_TICKS):
+        self.num_floors = num_floors
+        self.decay = 0.5 ** (1.0 / half_life)
+        self._weights = np.zeros(num_floors)
+        self._tick = 0
+
+    def clear(self) -> None:
+        self._weights[:] = 0.0
+        self._tick = 0
+
+    def _advance(self, tick: int) -> None:
+        if tick > self._tick:
+            self._weights *= self.decay ** (tick - self._tick)
+            self._tick = tick
+
+    def record_call(self, floor: int, tick: int, weight: float = 1.0) -> None:
+        """记录一次呼叫"""
+        if 0 <= floor < self.num_floors:
+            self._advance(tick)
+            self._weights[floor] += weight
+
+    def histogram(self, tick: int) -> np.ndarray:
+        """当前各楼层的衰减后呼叫权重"""
+        self._advance(tick)
+        return self._weights.copy()
+
+
+def parking_floors(weights: np.ndarray, count: int) -> List[int]:
+    """
+    选择 count 个停放楼层，使 Σ 权重 × 到最近停放楼层的距离 最小（一维加权 k-中位数）
+
+    最优解把楼层划分为 count 个连续区间，每个区间的停放楼层是区间的加权中位数。
+    先用前缀和算出所有区间的代价，再按区间数动态规划，每一步按列向量化。
+
+    Returns:
+        升序排列的停放楼层
+    """
+    weights = np.asarray(weights, dtype=float)
+    num_floors = len(weights)
+    count = min(count, num_floors)
+    if count <= 0:
+        return []
+    floors = np.arange(num_floors, dtype=float)
+    prefix_w = np.concatenate(([0.0], np.cumsum(weights)))
+    prefix_wf = np.concatenate(([0.0], np.cumsum(weights * floors)))
+
+    # 区间 [i, j] 的加权中位数：前缀权重首次达到区间权重一半的楼层
+    start = np.arange(num_floors)[:, None]
+    end = np.arange(num_floors)[None, :]
+    half = (prefix_w[start] + prefix_w[end + 1]) / 2.0
+    median = np.clip(np.searchsorted(prefix_w, half, side="left") - 1, start, end)
+    below_w = prefix_w[median + 1] - prefix_w[start]
+    below_wf = prefix_wf[median + 1] - prefix_wf[start]
+    above_w = prefix_w[end + 1] - prefix_w[median + 1]
+    above_wf = prefix_wf[end + 1] - prefix_wf[median + 1]
+    cost = median * below_w - below_wf + above_wf - median * above_w
+    cost = np.where(start <= end, cost, np.inf)
+
+    # best[j]：楼层 0..j-1 用当前区间数的最小代价；split[c][j] 为最后一个区间的起点
+    best = np.full(num_floors + 1, np.inf)
+    best[0] = 0.0
+    splits: List[np.ndarray] = []
+    for _ in range(count):
+        total = best[:-1, None] + cost
+        split = total.argmin(axis=0)
+        best = np.concatenate(([np.inf], total[split, np.arange(num_floors)]))
+        splits.append(split)
+
+    result: List[int] = []
+    end_floor = num_floors - 1
+    for split in reversed(splits):
+        start_floor = int(split[end_floor])
+        result.append(int(median[start_floor, end_floor]))
+        end_floor = start_floor - 1
+    return sorted(result)
+
+
+class ParkingPlanner:
+    """
+    空闲电梯停放规划
+
+    按需求预测计算停放楼层，每部空闲电梯负责一个区间；停放楼层和电梯都按楼层排序后依次对应，
+    一维上这样的匹配总移动距离最小。
+    """
+
+    def __init__(self, num_floors: int, half_life: float = HALF_LIFE_TICKS, prior_weight: float = PRIOR_WEIGHT):
+        self.forecast = DemandForecast(num_floors, half_life)
+        self.prior_weight = prior_weight
+        self._cache: Optional[Tuple[int, int, List[int]]] = None  # (刷新周期, 电梯数, 停放楼层)
+
+    def clear(self) -> None:
+        self.forecast.clear()
+        self._cache = None
+
+    def record_call(self, floor: int, tick: int) -> None:
+        self.forecast.record_call(floor, tick)
+
+    def targets(self, count: int, tick: int) -> List[int]:
+        """count 部空闲电梯的停放楼层（升序）"""
+        period = tick // REFRESH_TICKS
+        if self._cache is not None and self._cache[:2] == (period, count):
+            return self._cache[2]
+        floors = parking_floors(self.forecast.histogram(tick) + self.prior_weight, count)
+        self._cache = (period, count, floors)
+        return floors
+
+    def assign(self, idle: Dict[int, int], tick: int) -> Dict[int, int]:
+        """
+        为空闲电梯分配停放楼层
+
+        Args:
+            idle: 电梯ID -> 当前楼层
+            tick: 当前tick
+
+        Returns:
+            电梯ID -> 停放楼层
+        """
+        if not idle:
+            return {}
+        floors = self.targets(len(idle), tick)
+        cars = sorted(idle, key=lambda elevator_id: (idle[elevator_id], elevator_id))
+        if len(floors) < len(cars):
+            # 电梯比楼层多，多出的电梯原地待命
+            floors = floors + [idle[elevator_id] for elevator_id in cars[len(floors) :]]
+        return dict(zip(cars, floors))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Callback Profiling
+回调耗时分析 - 统计每个回调的耗时分布、每个tick各阶段的耗时和超出预算的慢tick
+
+tick 阶段：
+- network: 与模拟器通信（step/get_state），本地客户端即为模拟引擎推进的时间
+- decode: JSON解析和状态/事件对象构造（客户端提供 decode_seconds 时才单独统计）
+- dispatch: 算法回调（on_event_execute_start、各事件回调、on_event_execute_end），含回调中下发的命令
+- record: 运行记录快照
+"""
+import heapq
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from elevator.core.models import EventType
+
+PHASES = ("network", "decode", "dispatch", "record")
+DEFAULT_BUDGET_MS = 10.0  # 慢tick阈值
+MAX_SLOW_TICKS = 50  # 保留耗时最长的慢tick数
+
+# 事件类型 -> 处理它的回调
+CALLBACK_NAMES: Dict[EventType, str] = {
+    EventType.UP_BUTTON_PRESSED: "on_passenger_call",
+    EventType.DOWN_BUTTON_PRESSED: "on_passenger_call",
+    EventType.STOPPED_AT_FLOOR: "on_elevator_stopped",
+    EventType.IDLE: "on_elevator_idle",
+    EventType.PASSING_FLOOR: "on_elevator_passing_floor",
+    EventType.ELEVATOR_APPROACHING: "on_elevator_approaching",
+    EventType.PASSENGER_BOARD: "on_passenger_board",
+    EventType.PASSENGER_ALIGHT: "on_passenger_alight",
+    EventType.ELEVATOR_MOVE: "on_elevator_move",
+}
+
+
+class LatencyHistogram:
+    """按2的幂划分的耗时直方图（微秒），第 i 个桶统计 [2^(i-1), 2^i) 微秒"""
+
+    BUCKETS = 32
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        microseconds = seconds * 1e6
+        index = min(self.BUCKETS - 1, int(microseconds).bit_length())
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """百分位数的上界（秒）"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.max, (1 << index) / 1e6)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1e3, 3),
+            "mean_ms": round(self.total * 1e3 / self.count, 4) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50) * 1e3, 4),
+            "p95_ms": round(self.percentile(95) * 1e3, 4),
+            "p99_ms": round(self.percentile(99) * 1e3, 4),
+            "max_ms": round(self.max * 1e3, 4),
+            "buckets_us": {f"<{1 << index}": count for index, count in enumerate(self.counts) if count},
+        }
+
+
+@dataclass
+class TickProfile:
+    """一个tick的耗时明细"""
+
+    tick: int
+    total: float = 0.0
+    phases: Dict[str, float] = field(default_factory=dict)
+    callbacks: Dict[str, List[float]] = field(default_factory=dict)  # 回调 -> [调用次数, 耗时]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tick": self.tick,
+            "total_ms": round(self.total * 1e3, 3),
+            "phases_ms": {name: round(seconds * 1e3, 3) for name, seconds in self.phases.items()},
+            "callbacks": {
+                name: {"calls": int(calls), "ms": round(seconds * 1e3, 3)}
+                for name, (calls, seconds) in sorted(self.callbacks.items(), key=lambda item: -item[1][1])
+            },
+        }
+
+
+class CallbackProfiler:
+    """
+    回调耗时分析器
+
+    由 ElevatorController.enable_profiling() 创建。控制器主循环在每个阶段和每个回调结束时调用
+    mark / mark_callback，把距上一次标记的时间计入对应阶段；运行结束时写出 report()。
+    """
+
+    def __init__(
+        self,
+        budget_ms: float = DEFAULT_BUDGET_MS,
+        output: Optional[Path] = None,
+        max_slow_ticks: int = MAX_SLOW_TICKS,
+    ):
+        """
+        Args:
+            budget_ms: 每个tick的耗时预算，超出的tick记为慢tick
+            output: 运行结束时写出报告的路径，None 表示不写文件
+            max_slow_ticks: 保留耗时最长的慢tick数
+        """
+        self.budget = budget_ms / 1e3
+        self.output = Path(output) if output is not None else None
+        self.max_slow_ticks = max_slow_ticks
+        self.callbacks: Dict[str, LatencyHistogram] = {}
+        self.phases: Dict[str, LatencyHistogram] = {name: LatencyHistogram() for name in PHASES}
+        self.ticks = LatencyHistogram()
+        self.slow_tick_count = 0
+        self._slow_ticks: List[Tuple[float, int, TickProfile]] = []  # (耗时, 序号, 明细) 最小堆
+        self._current = TickProfile(0)
+        self._last = time.perf_counter()
+        self._decode_start = 0.0
+
+    def begin_tick(self, decode_seconds: float = 0.0) -> None:
+        """
+        开始一个tick
+
+        Args:
+            decode_seconds: API客户端累计的解析耗时，tick结束时取差值
+        """
+        self._current = TickProfile(0)
+        self._decode_start = decode_seconds
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """距上一次标记的时间计入 phase 阶段"""
+        now = time.perf_counter()
+        phases = self._current.phases
+        phases[phase] = phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def mark_callback(self, name: str) -> None:
+        """距上一次标记的时间计为回调 name 的一次调用，并计入 dispatch 阶段"""
+        now = time.perf_counter()
+        seconds = now - self._last
+        self._last = now
+        current = self._current
+        current.phases["dispatch"] = current.phases.get("dispatch", 0.0) + seconds
+        histogram = self.callbacks.get(name)
+        if histogram is None:
+            histogram = self.callbacks[name] = LatencyHistogram()
+        histogram.add(seconds)
+        entry = current.callbacks.get(name)
+        if entry is None:
+            current.callbacks[name] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def end_tick(self, tick: int, decode_seconds: float = 0.0) -> None:
+        """
+        结束一个tick
+
+        Args:
+            tick: 本tick的编号
+            decode_seconds: API客户端累计的解析耗时，与 begin_tick 的差值从 network 移到 decode
+        """
+        current = self._current
+        current.tick = tick
+        decode = decode_seconds - self._decode_start
+        if decode > 0:
+            network = current.phases.get("network", 0.0)
+            decode = min(decode, network)
+            current.phases["network"] = network - decode
+            current.phases["decode"] = decode
+        for name in PHASES:
+            self.phases[name].add(current.phases.get(name, 0.0))
+        current.total = sum(current.phases.values())
+        self.ticks.add(current.total)
+        if current.total > self.budget:
+            self.slow_tick_count += 1
+            item = (current.total, self.ticks.count, current)
+            if len(self._slow_ticks) < self.max_slow_ticks:
+                heapq.heappush(self._slow_ticks, item)
+            elif current.total > self._slow_ticks[0][0]:
+                heapq.heapreplace(self._slow_ticks, item)
+
+    @property
+    def slow_ticks(self) -> List[TickProfile]:
+        """耗时最长的慢tick，按耗时降序"""
+        return [profile for _, _, profile in sorted(self._slow_ticks, key=lambda item: (-item[0], item[1]))]
+
+    def report(self) -> Dict[str, Any]:
+        """可JSON序列化的报告"""
+        return {
+            "budget_ms": self.budget * 1e3,
+            "ticks": self.ticks.to_dict(),
+            "phases": {name: histogram.to_dict() for name, histogram in self.phases.items()},
+            "callbacks": {
+                name: histogram.to_dict()
+                for name, histogram in sorted(self.callbacks.items(), key=lambda item: -item[1].total)
+            },
+            "slow_tick_count": self.slow_tick_count,
+            "slow_ticks": [profile.to_dict() for profile in self.slow_ticks],
+        }
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """写出报告，默认写到 output"""
+        path = Path(path) if path is not None else self.output
+        if path is None:
+            path = Path("profiles") / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Recording Replay
+记录回放 - 将运行记录还原为流量，在本地引擎上用任意控制器重新运行同样的负载
+
+在仓库根目录运行::
+
+    python -m elevator.client.replay elevator/visualization/recordings/xxx.json controller:LookV2Controller
+"""
+import argparse
+import importlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Type, Union
+
+from elevator.client.base_controller import ElevatorController
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.models import EventType, TrafficEntry, TrafficPattern
+from elevator.core.simulator import DEFAULT_CAPACITY, ElevatorSimulation
+from elevator.visualization.recording_io import load_recording
+
+_CALL_EVENTS = (EventType.UP_BUTTON_PRESSED.value, EventType.DOWN_BUTTON_PRESSED.value)
+
+
+def split_rounds(history: Sequence[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """按tick回退将历史切分为多轮流量（控制器切换流量后tick从头开始）"""
+    rounds: List[List[Dict[str, Any]]] = []
+    last_tick = None
+    for snapshot in history:
+        tick = snapshot.get("tick", 0)
+        if last_tick is None or tick <= last_tick:
+            rounds.append([])
+        rounds[-1].append(snapshot)
+        last_tick = tick
+    return rounds
+
+
+def recording_to_traffic(recording: Dict[str, Any], name: Optional[str] = None) -> List[TrafficPattern]:
+    """
+    将运行记录还原为流量模式（每轮一个）
+
+    乘客目的地取自呼叫事件中记录的 destination；旧格式的记录没有该字段，
+    此时用乘客的下梯楼层代替，到记录结束仍未送达的乘客无法还原，计入 metadata["dropped_passengers"]。
+
+    Args:
+        recording: load_recording 返回的数据
+        name: 流量名称前缀，默认使用算法名和开始时间
+    """
+    metadata = recording.get("metadata", {})
+    prefix = name or f"{metadata.get('algorithm', 'recording')}_{metadata.get('start_time', '')}".rstrip("_")
+    patterns = []
+    for index, history in enumerate(split_rounds(recording.get("history", []))):
+        calls: Dict[int, Dict[str, int]] = {}
+        alighted: Dict[int, int] = {}
+        max_floor = int(metadata.get("floors", 0)) - 1
+        max_elevator = int(metadata.get("elevators", 0)) - 1
+        for snapshot in history:
+            for event in snapshot.get("events", []):
+                data = event.get("data", {})
+                if event.get("type") in _CALL_EVENTS:
+                    calls[data["passenger"]] = {
+                        "origin": data.get("origin", data["floor"]),
+                        "destination": data.get("destination", -1),
+                        "tick": snapshot["tick"],
+                    }
+                elif event.get("type") == EventType.PASSENGER_ALIGHT.value:
+                    alighted[data["passenger"]] = data["floor"]
+            max_floor = max([max_floor] + [f["floor"] for f in snapshot.get("floors", [])])
+            max_elevator = max([max_elevator] + [e["id"] for e in snapshot.get("elevators", [])])
+
+        entries = []
+        dropped = 0
+        for passenger_id, call in calls.items():
+            destination = call["destination"] if call["destination"] >= 0 else alighted.get(passenger_id, -1)
+            if destination < 0:
+                dropped += 1
+                continue
+            entries.append(
+                TrafficEntry(id=passenger_id, origin=call["origin"], destination=destination, tick=call["tick"])
+            )
+        entries.sort(key=lambda e: (e.tick, e.id))
+
+        patterns.append(
+            TrafficPattern(
+                name=f"{prefix}_round{index}",
+                description=f"Replay of {metadata.get('algorithm', 'recording')}, {len(entries)} passengers",
+                entries=entries,
+                metadata={
+                    "elevators": max_elevator + 1,
+                    "floors": max_floor + 1,
+                    "duration": history[-1]["tick"] if history else 0,
+                    "elevator_capacity": int(metadata.get("elevator_capacity", DEFAULT_CAPACITY)),
+                    "dropped_passengers": dropped,
+                },
+            )
+        )
+    return patterns
+
+
+def replay_recording(
+    recording: Union[str, Path, Dict[str, Any]],
+    controller: Union[ElevatorController, Type[ElevatorController]],
+    record: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    在本地引擎上用指定控制器回放运行记录中的负载
+
+    Args:
+        recording: 记录文件路径或 load_recording 返回的数据
+        controller: 控制器实例或控制器类（无参构造）
+        record: 是否保存本次回放的运行记录
+
+    Returns:
+        每轮流量的结果 {"name", "tick", "metrics"}
+    """
+    data = recording if isinstance(recording, dict) else load_recording(recording)
+    simulation = ElevatorSimulation(recording_to_traffic(data))
+    if isinstance(controller, type):
+        controller = controller()
+    controller.api_client = LocalAPIClient(simulation)
+    if not record:
+        controller.recorder = None
+    controller.start()
+    return simulation.round_results
+
+
+def _load_controller_class(spec: str) -> Type[ElevatorController]:
+    """解析 "module:ClassName" 形式的控制器"""
+    module_name, _, class_name = spec.partition(":")
+    controller_class = getattr(importlib.import_module(module_name), class_name or "Controller")
+    if not (isinstance(controller_class, type) and issubclass(controller_class, ElevatorController)):
+        raise ValueError(f"{spec} is not an ElevatorController subclass")
+    return controller_class
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded run against a controller")
+    parser.add_argument("recording", type=Path, help="运行记录文件（.json/.jsonl）")
+    parser.add_argument("controller", help="控制器，如 controller:LookV2Controller")
+    parser.add_argument("--record", action="store_true", help="保存回放的运行记录")
+    args = parser.parse_args(argv)
+
+    results = replay_recording(args.recording, _load_controller_class(args.controller), record=args.record)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Route Planner
+目的地感知的路径规划 - 乘客请求管理、电梯任务队列和基于代价的任务插入
+
+数据结构与 docs/optimal_look_algorithm_design.md 一致：
+PassengerRequest、ElevatorTask、ElevatorPlan、RequestManager。
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from elevator.client.dispatcher import START_TICKS, TICKS_PER_FLOOR
+from elevator.core.models import Direction
+
+PICKUP = "pickup"
+DROPOFF = "dropoff"
+
+# 代价权重：计划的代价为各任务预计完成时间的加权和
+WAIT_WEIGHT = 1.0  # 接到乘客（等待时间）的权重，送达（系统时间）的权重为 1
+AGE_TICKS = 100.0  # 等待超过该tick数的乘客权重翻倍，避免被后来的请求反复推迟
+# 乘车时间上限：不超过直达时间的 RIDE_STRETCH 倍再加 RIDE_SLACK 个tick，
+# 避免车上乘客被后来插入的请求反复绕路（只看代价增量的插入在高负载下会来回折返）
+RIDE_STRETCH = 1.5
+RIDE_SLACK = 10.0
+MAX_FEASIBILITY_CHECKS = 8  # 每次插入最多检查的候选方案数
+
+
+@dataclass
+class PassengerRequest:
+    """乘客请求"""
+
+    passenger_id: int
+    origin: int
+    destination: int
+    direction: Direction
+    arrive_tick: int
+    priority: float = 0.0
+    assigned_elevator: Optional[int] = None  # 已分配的电梯ID
+    boarded_elevator: Optional[int] = None  # 实际乘坐的电梯ID
+
+
+@dataclass
+class ElevatorTask:
+    """电梯任务：在某楼层接（pickup）或送（dropoff）一组乘客"""
+
+    floor: int
+    task_type: str
+    passenger_ids: List[int]
+    direction: Direction = Direction.STOPPED  # pickup 为乘客方向
+    priority: float = 1.0  # 乘客的平均优先级
+
+    @property
+    def weight(self) -> float:
+        """任务完成时间在计划代价中的权重"""
+        factor = WAIT_WEIGHT if self.task_type == PICKUP else 1.0
+        return factor * self.priority * len(self.passenger_ids)
+
+
+@dataclass
+class Insertion:
+    """一次任务插入方案"""
+
+    cost: float  # 代价增量
+    tasks: List[ElevatorTask]  # 插入后的任务队列
+
+
+def leg_ticks(start: float, end: float) -> float:
+    """从停靠楼层出发到另一楼层停靠的预计tick数"""
+    if start == end:
+        return 0.0
+    return TICKS_PER_FLOOR * abs(end - start) + START_TICKS
+
+
+@dataclass
+class ElevatorPlan:
+    """
+    电梯计划
+
+    task_queue 按执行顺序排列。电梯停靠时，当前楼层的 pickup 任务移入 boarding，
+    乘客在电梯出发时上梯；新请求通过 best_insertion 插入到代价增量最小且可行的位置。
+    """
+
+    elevator_id: int
+    current_direction: Direction = Direction.STOPPED  # 运行方向，停靠时为 STOPPED
+    task_queue: List[ElevatorTask] = field(default_factory=list)
+    estimated_load: List[int] = field(default_factory=list)  # 每个任务完成后的预计载客量
+    total_cost: float = 0.0
+    position: float = 0.0  # 当前位置（楼层，可为小数）
+    load: int = 0  # 当前载客量（含等待出发时上梯的乘客）
+    capacity: int = 10
+    boarding: Dict[int, Direction] = field(default_factory=dict)  # 停靠楼层等待上梯的乘客 -> 方向
+    boarding_floor: Optional[int] = None
+
+    # ==================== 状态 ====================
+
+    def update_state(self, position: float, direction: Direction, passengers: int, capacity: int) -> None:
+        """每个tick根据电梯状态更新计划起点"""
+        self.position = position
+        self.current_direction = direction
+        self.load = passengers + len(self.boarding)
+        self.capacity = capacity
+
+    def pop_arrived(self, floor: int) -> List[ElevatorTask]:
+        """电梯停靠在 floor 时移出队首在该楼层的任务，pickup 乘客进入 boarding"""
+        done: List[ElevatorTask] = []
+        while self.task_queue and self.task_queue[0].floor == floor:
+            task = self.task_queue.pop(0)
+            if task.task_type == PICKUP:
+                for passenger_id in task.passenger_ids:
+                    self.boarding[passenger_id] = task.direction
+                self.boarding_floor = floor
+                self.load += len(task.passenger_ids)
+            done.append(task)
+        return done
+
+    def remove_passenger(self, passenger_id: int) -> None:
+        """从所有任务中移除乘客，移除后为空的任务一并删除"""
+        self.boarding.pop(passenger_id, None)
+        queue = []
+        for task in self.task_queue:
+            if passenger_id in task.passenger_ids:
+                task.passenger_ids = [p for p in task.passenger_ids if p != passenger_id]
+            if task.passenger_ids:
+                queue.append(task)
+        self.task_queue = queue
+
+    def without_passenger(self, passenger_id: int) -> List[ElevatorTask]:
+        """移除某位乘客后的任务队列（不修改当前计划）"""
+        queue = []
+        for task in self.task_queue:
+            if passenger_id in task.passenger_ids:
+                others = [p for p in task.passenger_ids if p != passenger_id]
+                if not others:
+                    continue
+                task = ElevatorTask(task.floor, task.task_type, others, task.direction, task.priority)
+            queue.append(task)
+        return queue
+
+    def removal_saving(self, passenger_id: int) -> float:
+        """移除某位乘客的任务后计划代价的减少量"""
+        return self.cost() - self.cost(self.without_passenger(passenger_id))
+
+    def refresh_priorities(self, priorities: Dict[int, float]) -> None:
+        """用乘客的当前优先级更新任务权重"""
+        for task in self.task_queue:
+            if task.passenger_ids:
+                task.priority = sum(priorities.get(p, 1.0) for p in task.passenger_ids) / len(task.passenger_ids)
+
+    @property
+    def next_floor(self) -> Optional[int]:
+        return self.task_queue[0].floor if self.task_queue else None
+
+    # ==================== 代价 ====================
+
+    def arrival_times(self, tasks: Optional[Sequence[ElevatorTask]] = None) -> List[float]:
+        """各任务的预计完成时间（相对当前tick）"""
+        times: List[float] = []
+        floor = self.position
+        elapsed = 0.0
+        moving = self.current_direction != Direction.STOPPED
+        for task in self.task_queue if tasks is None else tasks:
+            if moving:
+                # 运行中的电梯无需起步
+                elapsed += TICKS_PER_FLOOR * abs(task.floor - floor)
+                moving = False
+            else:
+                elapsed += leg_ticks(floor, task.floor)
+            floor = task.floor
+            times.append(elapsed)
+        return times
+
+    def cost(self, tasks: Optional[Sequence[ElevatorTask]] = None) -> float:
+        """计划代价：各任务预计完成时间的加权和"""
+        queue = self.task_queue if tasks is None else tasks
+        return sum(task.weight * time for task, time in zip(queue, self.arrival_times(queue)))
+
+    def is_feasible(self, tasks: Sequence[ElevatorTask]) -> bool:
+        """
+        检查任务队列是否可执行：
+        - 运行中的电梯，第一站必须在运行方向前方
+        - 同一楼层连续的任务视为一次停靠，停靠中的 pickup 乘客方向必须与离开方向一致
+        - 任何时刻载客量不超过容量
+        - 每位乘客的乘车时间不超过上限（RIDE_STRETCH、RIDE_SLACK）
+        """
+        if not tasks:
+            return True
+        if self.current_direction == Direction.UP and tasks[0].floor <= self.position:
+            return False
+        if self.current_direction == Direction.DOWN and tasks[0].floor >= self.position:
+            return False
+
+        load = self.load
+        floor: Optional[int] = None
+        required: Optional[Direction] = None
+        if self.boarding and self.current_direction == Direction.STOPPED:
+            floor = self.boarding_floor
+            required = next(iter(self.boarding.values()))
+        for task in tasks:
+            if task.floor != floor:
+                if required is not None and floor is not None:
+                    departure = Direction.UP if task.floor > floor else Direction.DOWN
+                    if departure != required:
+                        return False
+                floor = task.floor
+                required = None
+            if task.task_type == PICKUP:
+                if required is not None and required != task.direction:
+                    return False
+                required = task.direction
+                load += len(task.passenger_ids)
+                if load > self.capacity:
+                    return False
+            else:
+                load -= len(task.passenger_ids)
+
+        # 乘车时间：计划中上梯的乘客从 pickup 算起，车上的乘客从当前位置算起
+        pickups: Dict[int, Tuple[float, float]] = {}
+        for task, time in zip(tasks, self.arrival_times(tasks)):
+            for passenger_id in task.passenger_ids:
+                if task.task_type == PICKUP:
+                    pickups[passenger_id] = (time, task.floor)
+                    continue
+                start_time, start_floor = pickups.get(passenger_id, (0.0, self.position))
+                if time - start_time > RIDE_STRETCH * leg_ticks(start_floor, task.floor) + RIDE_SLACK:
+                    return False
+        return True
+
+    def _suffix_weights(self) -> List[float]:
+        weights = [0.0] * (len(self.task_queue) + 1)
+        for index in range(len(self.task_queue) - 1, -1, -1):
+            weights[index] = weights[index + 1] + self.task_queue[index].weight
+        return weights
+
+    def _detour(self, times: List[float], gap: int, floor: int) -> Tuple[float, float]:
+        """
+        在第 gap 个任务之前插入一站的 (到达时间, 后续任务的延迟)
+        """
+        queue = self.task_queue
+        if gap == 0:
+            start_time = self.arrival_times([ElevatorTask(floor, DROPOFF, [])])[0]
+        else:
+            start_time = times[gap - 1] + leg_ticks(queue[gap - 1].floor, floor)
+        if gap == len(queue):
+            return start_time, 0.0
+        next_floor = queue[gap].floor
+        return start_time, start_time + leg_ticks(floor, next_floor) - times[gap]
+
+    def best_insertion(self, request: PassengerRequest, priority: float = 1.0) -> Optional[Insertion]:
+        """
+        为请求寻找代价增量最小的可行插入位置（pickup 在 dropoff 之前）
+
+        先用 O(1) 的增量公式估计所有满足容量约束的 (pickup, dropoff) 位置组合的代价，
+        再按代价从小到大构造队列检查方向约束，最多检查 MAX_FEASIBILITY_CHECKS 个；
+        都不可行时退回追加到队尾（队尾没有未完成的 pickup，总是可行）。
+        """
+        queue = self.task_queue
+        size = len(queue)
+        times = self.arrival_times()
+        suffix = self._suffix_weights()
+        # loads[g]：第 g 个任务之前的载客量
+        loads = [self.load]
+        for task in queue:
+            loads.append(
+                loads[-1] + (len(task.passenger_ids) if task.task_type == PICKUP else -len(task.passenger_ids))
+            )
+        wait_weight = WAIT_WEIGHT * priority
+        candidates: List[Tuple[float, int, int]] = []
+        for i in range(size + 1):
+            if loads[i] + 1 > self.capacity:
+                continue
+            pickup_time, pickup_delay = self._detour(times, i, request.origin)
+            pickup_cost = wait_weight * pickup_time + pickup_delay * suffix[i]
+            # pickup 和 dropoff 插在同一个间隙中
+            dropoff_time = pickup_time + leg_ticks(request.origin, request.destination)
+            delay = 0.0
+            if i < size:
+                delay = dropoff_time + leg_ticks(request.destination, queue[i].floor) - times[i]
+            candidates.append((wait_weight * pickup_time + priority * dropoff_time + delay * suffix[i], i, i))
+            # dropoff 插在之后的间隙中，之前的任务已被 pickup 推迟；乘客在车上期间不能超载
+            for j in range(i + 1, size + 1):
+                if loads[j] + 1 > self.capacity:
+                    break
+                dropoff_time = times[j - 1] + pickup_delay + leg_ticks(queue[j - 1].floor, request.destination)
+                dropoff_delay = 0.0
+                if j < size:
+                    dropoff_delay = (
+                        dropoff_time + leg_ticks(request.destination, queue[j].floor) - times[j] - pickup_delay
+                    )
+                cost = pickup_cost + priority * dropoff_time + dropoff_delay * suffix[j]
+                candidates.append((cost, i, j))
+
+        candidates.sort()
+        pickup = ElevatorTask(request.origin, PICKUP, [request.passenger_id], request.direction, priority)
+        dropoff = ElevatorTask(request.destination, DROPOFF, [request.passenger_id], Direction.STOPPED, priority)
+        for cost, i, j in candidates[:MAX_FEASIBILITY_CHECKS]:
+            tasks = queue[:i] + [pickup] + queue[i:j] + [dropoff] + queue[j:]
+            if self.is_feasible(tasks):
+                return Insertion(cost, tasks)
+        for cost, i, j in candidates:
+            if i == j == size:
+                tasks = queue + [pickup, dropoff]
+                return Insertion(cost, tasks) if self.is_feasible(tasks) else None
+        return None
+
+    def best_dropoff_insertion(self, passenger_id: int, floor: int, priority: float = 1.0) -> Insertion:
+        """为已上梯的乘客插入 dropoff 任务，找不到可行位置时追加到队尾"""
+        queue = self.task_queue
+        times = self.arrival_times()
+        suffix = self._suffix_weights()
+        candidates = []
+        for j in range(len(queue) + 1):
+            arrival, delay = self._detour(times, j, floor)
+            candidates.append((priority * arrival + delay * suffix[j], j))
+        candidates.sort()
+        dropoff = ElevatorTask(floor, DROPOFF, [passenger_id], Direction.STOPPED, priority)
+        for cost, j in candidates:
+            tasks = queue[:j] + [dropoff] + queue[j:]
+            if self.is_feasible(tasks):
+                return Insertion(cost, tasks)
+        return Insertion(candidates[-1][0], queue + [dropoff])
+
+    def apply(self, insertion: Insertion) -> None:
+        """采用插入方案，合并相邻的同类任务并更新预计载客量"""
+        merged: List[ElevatorTask] = []
+        for task in insertion.tasks:
+            last = merged[-1] if merged else None
+            if (
+                last is not None
+                and last.floor == task.floor
+                and last.task_type == task.task_type
+                and last.direction == task.direction
+            ):
+                total = last.priority * len(last.passenger_ids) + task.priority * len(task.passenger_ids)
+                last.passenger_ids = last.passenger_ids + task.passenger_ids
+                last.priority = total / len(last.passenger_ids)
+            else:
+                merged.append(task)
+        self.task_queue = merged
+        load = self.load
+        self.estimated_load = []
+        for task in merged:
+            load += len(task.passenger_ids) if task.task_type == PICKUP else -len(task.passenger_ids)
+            self.estimated_load.append(load)
+        self.total_cost = self.cost()
+
+
+class RequestManager:
+    """
+    请求管理器
+
+    记录所有乘客请求及其分配情况。乘客上梯后请求转为在途，下梯后删除。
+    """
+
+    def __init__(self) -> None:
+        self.requests: Dict[int, PassengerRequest] = {}
+
+    def clear(self) -> None:
+        self.requests.clear()
+
+    def add_request(self, passenger_id: int, origin: int, destination: int, arrive_tick: int) -> PassengerRequest:
+        """添加新乘客请求"""
+        direction = Direction.UP if destination > origin else Direction.DOWN
+        request = PassengerRequest(passenger_id, origin, destination, direction, arrive_tick)
+        self.requests[passenger_id] = request
+        return request
+
+    def get(self, passenger_id: int) -> Optional[PassengerRequest]:
+        return self.requests.get(passenger_id)
+
+    def get_pending_requests(self) -> List[PassengerRequest]:
+        """未分配且未上梯的请求，按到达先后排序"""
+        pending = [r for r in self.requests.values() if r.assigned_elevator is None and r.boarded_elevator is None]
+        pending.sort(key=lambda r: (r.arrive_tick, r.passenger_id))
+        return pending
+
+    def assign_request(self, passenger_id: int, elevator_id: Optional[int]) -> None:
+        """分配请求到电梯（None 表示取消分配）"""
+        self.requests[passenger_id].assigned_elevator = elevator_id
+
+    def mark_boarded(self, passenger_id: int, elevator_id: int) -> Optional[PassengerRequest]:
+        """乘客上梯"""
+        request = self.requests.get(passenger_id)
+        if request is not None:
+            request.boarded_elevator = elevator_id
+        return request
+
+    def remove(self, passenger_id: int) -> Optional[PassengerRequest]:
+        """乘客到达目的地"""
+        return self.requests.pop(passenger_id, None)
+
+    def calculate_priority(self, request: PassengerRequest, tick: int) -> float:
+        """请求优先级：随等待时间线性增长，每等待 AGE_TICKS 个tick权重增加 1"""
+        request.priority = 1.0 + max(tick - request.arrive_tick, 0) / AGE_TICKS
+        return request.priority
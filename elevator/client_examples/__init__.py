@@ -0,0 +1,3 @@
+"""
+Shipped elevator dispatch algorithms, listed and run by the visualization server
+"""
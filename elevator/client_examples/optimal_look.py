@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Optimal LOOK - 利用提前已知的乘客目的地，为每部电梯维护任务队列并按代价插入新请求
+
+设计见 docs/optimal_look_algorithm_design.md：
+1. 乘客呼叫时即知道目的地，请求作为 (pickup, dropoff) 任务对插入某部电梯的任务队列
+2. 插入位置和电梯按代价增量（各任务预计完成时间的加权和）选择，同时满足方向和容量约束
+3. 任务队列增量维护：停靠时移出已完成的任务，上梯/下梯事件更新请求状态，不做全量重算
+4. 乘客上了别的电梯或因满载没上梯时，调整对应电梯的计划或重新分配
+5. 每个tick重新考虑尚未接到的乘客：其他电梯的插入代价小于原电梯移除该乘客节省的代价时转移
+
+在仓库根目录运行::
+
+    python -m elevator.client_examples.optimal_look
+"""
+from typing import Dict, List, Optional, Tuple
+
+from elevator.client.base_controller import ElevatorController
+from elevator.client.dispatcher import TICKS_PER_FLOOR
+from elevator.client.proxy_models import ProxyElevator, ProxyFloor, ProxyPassenger
+from elevator.client.route_planner import ElevatorPlan, Insertion, RequestManager, leg_ticks
+from elevator.core.models import Direction, ElevatorStatus, SimulationEvent
+from elevator.utils.log import get_logger
+
+log = get_logger("optimal_look")
+
+MAX_REBALANCE_CHECKS = 16  # 每个tick重新分配时最多尝试的插入次数，其余乘客在之后的tick轮流考虑
+
+
+class OptimalLookController(ElevatorController):
+    """Optimal LOOK 控制器 - 目的地感知的任务队列规划"""
+
+    def __init__(self, server_url: str = "http://127.0.0.1:8000", debug: bool = False):
+        super().__init__(server_url, debug)
+        self.requests = RequestManager()
+        self.plans: Dict[int, ElevatorPlan] = {}
+        # 本tick上了未分配给它的电梯的乘客：(乘客ID, 电梯ID)
+        self._unplanned_boardings: List[Tuple[int, int]] = []
+        # 重新分配从该乘客ID开始，超出检查次数的乘客留到下个tick
+        self._rebalance_cursor = 0
+
+    def on_init(self, elevators: List[ProxyElevator], floors: List[ProxyFloor]) -> None:
+        """初始化"""
+        log.info("[OPTIMAL LOOK] 算法初始化")
+        log.info("  电梯数量: %d, 楼层数量: %d", len(elevators), len(floors))
+        self.requests.clear()
+        self.plans = {elevator.id: ElevatorPlan(elevator.id) for elevator in elevators}
+        self._unplanned_boardings = []
+        self._rebalance_cursor = 0
+
+        # 切换流量时楼层上可能已有等待的乘客
+        self._track_waiting(floors)
+
+    def _track_waiting(self, floors: List[ProxyFloor]) -> None:
+        """登记楼层上等待但还没有请求记录的乘客，在本tick结束时分配"""
+        for floor in floors:
+            for passenger_id in floor.up_queue + floor.down_queue:
+                if self.requests.get(passenger_id) is not None:
+                    continue
+                passenger = ProxyPassenger(passenger_id, self.api_client)
+                self.requests.add_request(passenger_id, passenger.origin, passenger.destination, passenger.arrive_tick)
+
+    def on_passenger_call(self, passenger: ProxyPassenger, floor: ProxyFloor, direction: str) -> None:
+        """乘客呼叫 - 记录请求，在本tick结束时统一分配"""
+        log.debug("[CALL] 乘客 %d: F%d -> F%d", passenger.id, passenger.origin, passenger.destination)
+        self.requests.add_request(passenger.id, passenger.origin, passenger.destination, self.current_tick)
+
+    def on_passenger_board(self, elevator: ProxyElevator, passenger: ProxyPassenger) -> None:
+        """乘客上梯"""
+        request = self.requests.mark_boarded(passenger.id, elevator.id)
+        if request is None:
+            return
+        plan = self.plans[elevator.id]
+        if request.assigned_elevator == elevator.id and passenger.id in plan.boarding:
+            del plan.boarding[passenger.id]
+            return
+        # 同方向的等待乘客都会上梯，包括分配给其他电梯或尚未分配的乘客
+        if request.assigned_elevator is not None:
+            self.plans[request.assigned_elevator].remove_passenger(passenger.id)
+        self.requests.assign_request(passenger.id, elevator.id)
+        self._unplanned_boardings.append((passenger.id, elevator.id))
+
+    def on_passenger_alight(self, elevator: ProxyElevator, passenger: ProxyPassenger, floor: ProxyFloor) -> None:
+        """乘客到达目的地"""
+        self.requests.remove(passenger.id)
+        self.plans[elevator.id].remove_passenger(passenger.id)
+
+    def on_event_execute_start(
+        self, tick: int, events: List[SimulationEvent], elevators: List[ProxyElevator], floors: List[ProxyFloor]
+    ) -> None:
+        """事件执行前"""
+        pass
+
+    def on_event_execute_end(
+        self, tick: int, events: List[SimulationEvent], elevators: List[ProxyElevator], floors: List[ProxyFloor]
+    ) -> None:
+        """
+        事件执行结束 - 更新计划起点、分配待处理请求、下发目标楼层
+        """
+        state = self.api_client.get_state()
+
+        # 1. 更新计划起点，处理停靠楼层的任务
+        for elevator_state in state.elevators:
+            plan = self.plans[elevator_state.id]
+            stopped = elevator_state.run_status == ElevatorStatus.STOPPED
+            if plan.boarding and not (stopped and elevator_state.current_floor == plan.boarding_floor):
+                # 电梯已出发，没上梯的乘客（满载）重新分配
+                for passenger_id in list(plan.boarding):
+                    plan.remove_passenger(passenger_id)
+                    self.requests.assign_request(passenger_id, None)
+                plan.boarding_floor = None
+            direction = Direction.STOPPED if stopped else elevator_state.target_floor_direction
+            plan.update_state(
+                elevator_state.current_floor_float,
+                direction,
+                len(elevator_state.passengers),
+                elevator_state.max_capacity,
+            )
+            if stopped:
+                plan.pop_arrived(elevator_state.current_floor)
+
+        # 2. 更新优先级（等待越久权重越高）
+        priorities = {
+            passenger_id: self.requests.calculate_priority(request, tick)
+            for passenger_id, request in self.requests.requests.items()
+        }
+        for plan in self.plans.values():
+            plan.refresh_priorities(priorities)
+
+        # 3. 上了未分配电梯的乘客：插入 dropoff 任务
+        for passenger_id, elevator_id in self._unplanned_boardings:
+            request = self.requests.get(passenger_id)
+            if request is None or request.boarded_elevator != elevator_id:
+                continue
+            plan = self.plans[elevator_id]
+            plan.remove_passenger(passenger_id)
+            plan.apply(plan.best_dropoff_insertion(passenger_id, request.destination, request.priority))
+        self._unplanned_boardings = []
+
+        # 4. 分配待处理请求：选择代价增量最小的电梯和插入位置
+        for request in self.requests.get_pending_requests():
+            best: Optional[Tuple[float, int, Insertion]] = None
+            for elevator_id, plan in self.plans.items():
+                insertion = plan.best_insertion(request, request.priority)
+                if insertion is not None and (best is None or insertion.cost < best[0]):
+                    best = (insertion.cost, elevator_id, insertion)
+            if best is None:
+                # 所有电梯都无法容纳，下个tick重试
+                continue
+            _, elevator_id, insertion = best
+            self.plans[elevator_id].apply(insertion)
+            self.requests.assign_request(request.passenger_id, elevator_id)
+            log.debug("  [ASSIGN] 乘客 %d -> E%d, 代价 %.1f", request.passenger_id, elevator_id, insertion.cost)
+
+        # 5. 尚未接到的乘客转给代价更小的电梯
+        self._rebalance()
+
+        # 6. 下发目标楼层
+        for elevator_state in state.elevators:
+            plan = self.plans[elevator_state.id]
+            elevator = self.elevators[elevator_state.id]
+            if plan.current_direction == Direction.STOPPED:
+                plan.pop_arrived(elevator_state.current_floor)
+                target = plan.next_floor
+                if target is not None and target != elevator_state.next_target_floor:
+                    # 停靠中的电梯在下个tick出发，出发时同方向的乘客上梯
+                    elevator.go_to_floor(target)
+            else:
+                target = plan.next_floor
+                if target is not None and target != elevator_state.target_floor:
+                    # 运行中的电梯立即改派到前方的新停靠点
+                    elevator.go_to_floor(target, immediate=True)
+
+    def _rebalance(self) -> None:
+        """
+        尚未接到的乘客转给代价更小的电梯：
+        原电梯移除该乘客节省的代价大于另一部电梯的插入代价时转移
+
+        分配在乘客呼叫时就确定，之后其他电梯可能顺路或空闲下来。按乘客ID轮流考虑，
+        每个tick最多尝试 MAX_REBALANCE_CHECKS 次插入；插入代价的下界（直线前往起始楼层再直达目的地）
+        已不小于节省的代价的电梯直接跳过。
+        """
+        waiting = sorted(
+            (
+                request
+                for request in self.requests.requests.values()
+                if request.assigned_elevator is not None
+                and request.boarded_elevator is None
+                and request.passenger_id not in self.plans[request.assigned_elevator].boarding
+            ),
+            key=lambda r: r.passenger_id,
+        )
+        start = next((i for i, r in enumerate(waiting) if r.passenger_id >= self._rebalance_cursor), 0)
+        checks = 0
+        for request in waiting[start:] + waiting[:start]:
+            if checks >= MAX_REBALANCE_CHECKS:
+                self._rebalance_cursor = request.passenger_id
+                return
+            owner_plan = self.plans[request.assigned_elevator]
+            saving = owner_plan.removal_saving(request.passenger_id)
+            direct = leg_ticks(request.origin, request.destination)
+            best: Optional[Tuple[float, ElevatorPlan, Insertion]] = None
+            for plan in self.plans.values():
+                if plan is owner_plan:
+                    continue
+                bound = request.priority * (TICKS_PER_FLOOR * abs(plan.position - request.origin) + direct)
+                if saving <= bound:
+                    continue
+                checks += 1
+                insertion = plan.best_insertion(request, request.priority)
+                if insertion is None:
+                    continue
+                gain = saving - insertion.cost
+                if gain > 0 and (best is None or gain > best[0]):
+                    best = (gain, plan, insertion)
+            if best is None:
+                continue
+            _, plan, insertion = best
+            owner_plan.remove_passenger(request.passenger_id)
+            plan.apply(insertion)
+            self.requests.assign_request(request.passenger_id, plan.elevator_id)
+            log.debug("  [REBALANCE] 乘客 %d -> E%d", request.passenger_id, plan.elevator_id)
+        self._rebalance_cursor = 0
+
+    def on_elevator_stopped(self, elevator: ProxyElevator, floor: ProxyFloor) -> None:
+        """电梯停靠 - 任务在本tick结束时统一处理"""
+        log.debug("[STOP] E%d 停靠在 F%d | 载客:%d", elevator.id, floor.floor, len(elevator.passengers))
+
+    def on_elevator_idle(self, elevator: ProxyElevator) -> None:
+        """
+        电梯空闲 - 登记楼层上尚未记录的等待乘客，本tick结束时分配（可能分配给这部电梯）；
+        计划中仍有任务时重新下发下一站
+        """
+        self._track_waiting(self.floors)
+        target = self.plans[elevator.id].next_floor
+        if target is not None and target != elevator.current_floor:
+            elevator.go_to_floor(target)
+
+    def on_elevator_approaching(self, elevator: ProxyElevator, floor: ProxyFloor, direction: str) -> None:
+        """电梯即将到达"""
+        pass
+
+    def on_elevator_passing_floor(self, elevator: ProxyElevator, floor: ProxyFloor, direction: str) -> None:
+        """电梯经过楼层"""
+        pass
+
+
+if __name__ == "__main__":
+    print("[MAIN] 启动 Optimal LOOK 调度控制器...")
+    controller = OptimalLookController(debug=False)
+    controller.start()
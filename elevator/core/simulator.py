@@ -0,0 +1,883 @@
+#!/usr/bin/env python3
+"""
+Local Elevator Simulation Engine
+本地电梯模拟引擎 - 与外部模拟器保持一致的tick语义，可在进程内或本地HTTP服务中运行
+"""
+import json
+import math
+import random
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple, Union, cast
+
+from elevator.core.models import (
+    Direction,
+    ElevatorIndicators,
+    ElevatorState,
+    ElevatorStatus,
+    EventType,
+    FloorState,
+    PassengerInfo,
+    Position,
+    SimulationEvent,
+    SimulationState,
+    TrafficEntry,
+    TrafficPattern,
+    create_empty_simulation_state,
+)
+
+# 各运行状态下每tick移动的位置单位（10个单位为一层）
+_MOVEMENT_SPEED: Dict[ElevatorStatus, int] = {
+    ElevatorStatus.START_UP: 1,
+    ElevatorStatus.START_DOWN: 1,
+    ElevatorStatus.CONSTANT_SPEED: 2,
+}
+
+DEFAULT_ELEVATORS = 2
+DEFAULT_FLOORS = 6
+DEFAULT_CAPACITY = 10
+
+
+def load_traffic_file(path: Union[str, Path]) -> TrafficPattern:
+    """读取流量文件
+
+    文件格式::
+
+        {
+          "building": {"elevators": 2, "floors": 6, "duration": 200, "elevator_capacity": 10},
+          "traffic": [{"id": 1, "origin": 0, "destination": 5, "tick": 3}, ...]
+        }
+    """
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    building = data.get("building", {})
+    entries = [
+        TrafficEntry(id=int(e["id"]), origin=int(e["origin"]), destination=int(e["destination"]), tick=int(e["tick"]))
+        for e in data.get("traffic", [])
+    ]
+    return TrafficPattern(
+        name=path.stem,
+        description=data.get("description", ""),
+        entries=entries,
+        metadata=dict(building),
+    )
+
+
+def create_random_traffic_pattern(
+    elevators: int,
+    floors: int,
+    duration: int,
+    density: float,
+    seed: int = 0,
+    max_capacity: int = DEFAULT_CAPACITY,
+) -> TrafficPattern:
+    """生成随机层间流量
+
+    Args:
+        elevators: 电梯数量
+        floors: 楼层数量
+        duration: 流量持续的tick数
+        density: 每tick平均到达的乘客数
+        seed: 随机种子，保证结果可复现
+        max_capacity: 电梯载客量
+    """
+    rng = random.Random(seed)
+    entries: List[TrafficEntry] = []
+    passenger_id = 1
+    for tick in range(1, duration + 1):
+        # 泊松到达的简单近似：整数部分必到，小数部分按概率到达
+        arrivals = int(density) + (1 if rng.random() < density - int(density) else 0)
+        for _ in range(arrivals):
+            origin = rng.randrange(floors)
+            destination = rng.randrange(floors - 1)
+            if destination >= origin:
+                destination += 1
+            entries.append(TrafficEntry(id=passenger_id, origin=origin, destination=destination, tick=tick))
+            passenger_id += 1
+
+    return TrafficPattern(
+        name=f"random_{elevators}x{floors}_{density:g}_{seed}",
+        description=f"Random interfloor traffic, {len(entries)} passengers",
+        entries=entries,
+        metadata={
+            "elevators": elevators,
+            "floors": floors,
+            "duration": duration,
+            "elevator_capacity": max_capacity,
+        },
+    )
+
+
+def create_down_peak_traffic_pattern(
+    elevators: int,
+    floors: int,
+    duration: int,
+    density: float,
+    seed: int = 0,
+    lobby: int = 0,
+    lobby_share: float = 0.8,
+    max_capacity: int = DEFAULT_CAPACITY,
+) -> TrafficPattern:
+    """生成下班高峰流量：大部分乘客从各楼层前往大堂，其余为随机层间流量
+
+    Args:
+        elevators: 电梯数量
+        floors: 楼层数量
+        duration: 流量持续的tick数
+        density: 每tick平均到达的乘客数
+        seed: 随机种子，保证结果可复现
+        lobby: 大堂楼层
+        lobby_share: 前往大堂的乘客比例
+        max_capacity: 电梯载客量
+    """
+    rng = random.Random(seed)
+    entries: List[TrafficEntry] = []
+    passenger_id = 1
+    for tick in range(1, duration + 1):
+        arrivals = int(density) + (1 if rng.random() < density - int(density) else 0)
+        for _ in range(arrivals):
+            origin = rng.randrange(floors - 1)
+            if origin >= lobby:
+                origin += 1
+            if rng.random() < lobby_share:
+                destination = lobby
+            else:
+                origin = rng.randrange(floors)
+                destination = rng.randrange(floors - 1)
+                if destination >= origin:
+                    destination += 1
+            entries.append(TrafficEntry(id=passenger_id, origin=origin, destination=destination, tick=tick))
+            passenger_id += 1
+
+    return TrafficPattern(
+        name=f"down_peak_{elevators}x{floors}_{density:g}_{seed}",
+        description=f"Down-peak traffic to F{lobby}, {len(entries)} passengers",
+        entries=entries,
+        metadata={
+            "elevators": elevators,
+            "floors": floors,
+            "duration": duration,
+            "elevator_capacity": max_capacity,
+        },
+    )
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """最近秩法计算百分位数（输入需已排序）"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(math.ceil(percent / 100.0 * len(sorted_values))) - 1))
+    return float(sorted_values[index])
+
+
+def _clone_elevator(elevator: ElevatorState) -> ElevatorState:
+    position = elevator.position
+    return ElevatorState(
+        id=elevator.id,
+        position=Position(position.current_floor, position.target_floor, position.floor_up_position),
+        next_target_floor=elevator.next_target_floor,
+        passengers=list(elevator.passengers),
+        max_capacity=elevator.max_capacity,
+        speed_pre_tick=elevator.speed_pre_tick,
+        run_status=elevator.run_status,
+        last_tick_direction=elevator.last_tick_direction,
+        indicators=ElevatorIndicators(elevator.indicators.up, elevator.indicators.down),
+        passenger_destinations=dict(elevator.passenger_destinations),
+        energy_consumed=elevator.energy_consumed,
+        last_update_tick=elevator.last_update_tick,
+    )
+
+
+def _clone_floor(floor: FloorState) -> FloorState:
+    return FloorState(floor=floor.floor, up_queue=list(floor.up_queue), down_queue=list(floor.down_queue))
+
+
+def _clone_passenger(passenger: PassengerInfo) -> PassengerInfo:
+    return PassengerInfo(
+        id=passenger.id,
+        origin=passenger.origin,
+        destination=passenger.destination,
+        arrive_tick=passenger.arrive_tick,
+        pickup_tick=passenger.pickup_tick,
+        dropoff_tick=passenger.dropoff_tick,
+        arrived=passenger.arrived,
+        elevator_id=passenger.elevator_id,
+    )
+
+
+class PassengerTable(Mapping[int, PassengerInfo]):
+    """
+    分层乘客表 - 支持写时复制的分支
+
+    fork() 时冻结当前顶层并与分支共享，双方各自写入新的顶层；
+    只有被修改的乘客记录才会复制到顶层，已完成的乘客始终共享。
+    """
+
+    # 冻结层数超过该值时合并，避免查找链过长
+    MAX_LAYERS = 8
+
+    def __init__(self, layers: Tuple[Dict[int, PassengerInfo], ...] = (), size: int = 0):
+        self._layers = layers
+        self._top: Dict[int, PassengerInfo] = {}
+        self._size = size
+
+    def __getitem__(self, passenger_id: int) -> PassengerInfo:
+        passenger = self._top.get(passenger_id)
+        if passenger is not None:
+            return passenger
+        for layer in reversed(self._layers):
+            passenger = layer.get(passenger_id)
+            if passenger is not None:
+                return passenger
+        raise KeyError(passenger_id)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._merged())
+
+    def _merged(self) -> Dict[int, PassengerInfo]:
+        if not self._layers:
+            return self._top
+        merged: Dict[int, PassengerInfo] = {}
+        for layer in self._layers:
+            merged.update(layer)
+        merged.update(self._top)
+        return merged
+
+    def items(self):  # type: ignore[override]
+        return self._merged().items()
+
+    def values(self):  # type: ignore[override]
+        return self._merged().values()
+
+    def add(self, passenger: PassengerInfo) -> None:
+        """添加新乘客"""
+        if passenger.id not in self:
+            self._size += 1
+        self._top[passenger.id] = passenger
+
+    def mutable(self, passenger_id: int) -> PassengerInfo:
+        """获取可修改的乘客记录，共享记录会先复制到顶层"""
+        passenger = self._top.get(passenger_id)
+        if passenger is None:
+            passenger = _clone_passenger(self[passenger_id])
+            self._top[passenger_id] = passenger
+        return passenger
+
+    def fork(self) -> "PassengerTable":
+        """冻结当前内容并返回共享这些内容的新表"""
+        if self._top:
+            self._layers = self._layers + (self._top,)
+            self._top = {}
+            if len(self._layers) > self.MAX_LAYERS:
+                self._layers = (self._merged(),)
+        return PassengerTable(self._layers, self._size)
+
+
+class _AppendLog:
+    """只追加的数值日志 - 分支共享已有前缀，不复制"""
+
+    def __init__(self, prefix: Tuple[Tuple[List[float], int], ...] = ()):
+        self._prefix = prefix
+        self._items: List[float] = []
+
+    def append(self, value: float) -> None:
+        self._items.append(value)
+
+    def __len__(self) -> int:
+        return sum(n for _, n in self._prefix) + len(self._items)
+
+    def values(self) -> List[float]:
+        if not self._prefix:
+            return list(self._items)
+        values: List[float] = []
+        for items, n in self._prefix:
+            values.extend(items[:n])
+        values.extend(self._items)
+        return values
+
+    def fork(self) -> "_AppendLog":
+        return _AppendLog(self._prefix + ((self._items, len(self._items)),))
+
+
+class ElevatorSimulation:
+    """
+    本地电梯模拟引擎
+
+    每个tick按四个阶段推进：更新电梯状态 -> 处理乘客到达 -> 移动电梯 -> 处理停靠（下客）。
+    乘客上梯发生在电梯从停靠楼层出发时，只有与目标方向一致的乘客才会上梯。
+
+    fork() 以写时复制的方式派生分支模拟：电梯、楼层和乘客记录在分支间共享，
+    任一方修改某条记录前才复制该记录，用于候选方案的 what-if 评估。
+    """
+
+    def __init__(
+        self,
+        traffic: Optional[Union[TrafficPattern, List[TrafficPattern]]] = None,
+        traffic_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        初始化模拟引擎
+
+        Args:
+            traffic: 流量模式或流量模式列表，按顺序轮换
+            traffic_dir: 流量文件目录，按文件名排序加载所有 *.json
+        """
+        self.lock = threading.RLock()
+        self.traffic_patterns: List[TrafficPattern] = []
+        if traffic_dir is not None:
+            self.traffic_patterns.extend(load_traffic_file(p) for p in sorted(Path(traffic_dir).glob("*.json")))
+        if isinstance(traffic, TrafficPattern):
+            self.traffic_patterns.append(traffic)
+        elif traffic is not None:
+            self.traffic_patterns.extend(traffic)
+
+        self.current_index = 0
+        self.clients: Dict[str, str] = {}  # client_id -> client_type
+        self.last_events: List[SimulationEvent] = []
+        # 每轮流量结束时的指标（切换流量时记录）
+        self.round_results: List[Dict[str, Any]] = []
+        self.reset()
+
+    # ==================== 流量与生命周期 ====================
+
+    @property
+    def tick(self) -> int:
+        return self.state.tick
+
+    @property
+    def current_traffic(self) -> Optional[TrafficPattern]:
+        """当前流量模式，流量已用完时为None"""
+        if 0 <= self.current_index < len(self.traffic_patterns):
+            return self.traffic_patterns[self.current_index]
+        return None
+
+    @property
+    def max_tick(self) -> int:
+        """当前流量的最大tick数"""
+        traffic = self.current_traffic
+        if traffic is None:
+            return 0
+        return int(traffic.metadata.get("duration") or traffic.duration)
+
+    def reset(self) -> None:
+        """按当前流量重置模拟状态"""
+        with self.lock:
+            traffic = self.current_traffic
+            building = traffic.metadata if traffic is not None else {}
+            state = create_empty_simulation_state(
+                int(building.get("elevators", DEFAULT_ELEVATORS)),
+                int(building.get("floors", DEFAULT_FLOORS)),
+                int(building.get("elevator_capacity", DEFAULT_CAPACITY)),
+            )
+            state.passengers = cast(Dict[int, PassengerInfo], PassengerTable())
+            self.state = state
+            # 本分支独占（可直接修改）的电梯和楼层下标
+            self._owned_elevators: Set[int] = set(range(len(state.elevators)))
+            self._owned_floors: Set[int] = set(range(len(state.floors)))
+            self.traffic_queue: List[TrafficEntry] = (
+                sorted(traffic.entries, key=lambda e: (e.tick, e.id)) if traffic else []
+            )
+            self._traffic_cursor = 0
+            self._idle_notified: Set[int] = set()
+            self._wait_times = _AppendLog()
+            self._system_times = _AppendLog()
+            self._metrics_cache: Optional[Dict[str, Any]] = None
+            self.last_events = []
+
+    def next_traffic_round(self, full_reset: bool = False) -> bool:
+        """切换到下一个流量
+
+        Args:
+            full_reset: 流量用完后是否从头开始循环
+
+        Returns:
+            是否切换成功
+        """
+        with self.lock:
+            total = len(self.traffic_patterns)
+            if total == 0:
+                return False
+            if self.state.tick > 0 and self.current_traffic is not None:
+                self.round_results.append(
+                    {"name": self.current_traffic.name, "tick": self.state.tick, "metrics": self.get_metrics()}
+                )
+            if self.current_index + 1 < total:
+                self.current_index += 1
+            elif full_reset:
+                self.current_index = 0
+            else:
+                # 标记流量已用完，max_tick变为0
+                self.current_index = total
+                self.reset()
+                return False
+            self.reset()
+            return True
+
+    def get_traffic_info(self) -> Dict[str, Any]:
+        """获取当前流量信息"""
+        traffic = self.current_traffic
+        return {
+            "current_index": self.current_index,
+            "total_files": len(self.traffic_patterns),
+            "max_tick": self.max_tick,
+            "name": traffic.name if traffic is not None else None,
+        }
+
+    def register_client(self, client_type: str) -> str:
+        """注册客户端，返回客户端ID"""
+        client_id = str(uuid.uuid4())
+        with self.lock:
+            self.clients[client_id] = client_type
+        return client_id
+
+    # ==================== 快照与分支 ====================
+
+    @property
+    def passengers(self) -> PassengerTable:
+        return cast(PassengerTable, self.state.passengers)
+
+    def fork(self) -> "ElevatorSimulation":
+        """
+        派生分支模拟（写时复制）
+
+        分支与当前模拟共享所有记录，开销与电梯数和楼层数的列表复制相当；
+        此后双方各自修改时才复制被修改的记录，互不影响。
+        """
+        with self.lock:
+            child = ElevatorSimulation.__new__(ElevatorSimulation)
+            child.lock = threading.RLock()
+            child.traffic_patterns = self.traffic_patterns
+            child.current_index = self.current_index
+            child.clients = dict(self.clients)
+            child.last_events = []
+            child.round_results = []
+            child.state = SimulationState(
+                tick=self.state.tick,
+                elevators=list(self.state.elevators),
+                floors=list(self.state.floors),
+                passengers=cast(Dict[int, PassengerInfo], self.passengers.fork()),
+            )
+            child.traffic_queue = self.traffic_queue
+            child._traffic_cursor = self._traffic_cursor
+            child._idle_notified = set(self._idle_notified)
+            child._wait_times = self._wait_times.fork()
+            child._system_times = self._system_times.fork()
+            child._metrics_cache = self._metrics_cache
+            child._owned_elevators = set()
+            child._owned_floors = set()
+            # 已有记录此后由双方共享，当前模拟修改前也需要复制
+            self._owned_elevators = set()
+            self._owned_floors = set()
+            return child
+
+    @classmethod
+    def from_state(cls, state: SimulationState, traffic: Optional[TrafficPattern] = None) -> "ElevatorSimulation":
+        """
+        从客户端获取的模拟状态构建本地引擎（用于前瞻评估）
+
+        只复制未完成的乘客；状态中缺少信息的等待乘客以其呼叫方向的端层作为目的地。
+
+        Args:
+            state: 客户端状态（如 ElevatorAPIClient.get_state() 的结果）
+            traffic: 已知的后续流量，只有晚于 state.tick 的条目会到达
+        """
+        sim = cls(traffic)
+        elevators = [_elevator_from_client(e) for e in state.elevators]
+        floors = [_clone_floor(f) for f in state.floors]
+        top_floor = len(floors) - 1
+
+        passengers = PassengerTable()
+        for passenger in state.passengers.values():
+            if not passenger.arrived:
+                passengers.add(_clone_passenger(passenger))
+        for floor in floors:
+            for passenger_id in floor.up_queue:
+                if passenger_id not in passengers:
+                    passengers.add(PassengerInfo(passenger_id, floor.floor, top_floor, state.tick))
+            for passenger_id in floor.down_queue:
+                if passenger_id not in passengers:
+                    passengers.add(PassengerInfo(passenger_id, floor.floor, 0, state.tick))
+        for elevator in elevators:
+            for passenger_id in elevator.passengers:
+                if passenger_id not in passengers:
+                    destination = elevator.passenger_destinations.get(passenger_id, elevator.current_floor)
+                    passengers.add(
+                        PassengerInfo(passenger_id, elevator.current_floor, destination, state.tick, state.tick)
+                    )
+
+        with sim.lock:
+            sim.state = SimulationState(
+                tick=state.tick,
+                elevators=elevators,
+                floors=floors,
+                passengers=cast(Dict[int, PassengerInfo], passengers),
+            )
+            sim._owned_elevators = set(range(len(elevators)))
+            sim._owned_floors = set(range(len(floors)))
+            sim._idle_notified = {e.id for e in elevators if e.is_idle and e.next_target_floor is None}
+            while (
+                sim._traffic_cursor < len(sim.traffic_queue)
+                and sim.traffic_queue[sim._traffic_cursor].tick <= state.tick
+            ):
+                sim._traffic_cursor += 1
+        return sim
+
+    def snapshot(self) -> "SimulationSnapshot":
+        """保存当前状态的快照"""
+        return SimulationSnapshot(self.fork())
+
+    def restore(self, snapshot: "SimulationSnapshot") -> None:
+        """恢复到快照时的状态"""
+        with self.lock:
+            restored = snapshot.fork()
+            lock, clients = self.lock, self.clients
+            self.__dict__.update(restored.__dict__)
+            self.lock, self.clients = lock, clients
+
+    def _mutable_elevator(self, index: int) -> ElevatorState:
+        elevator = self.state.elevators[index]
+        if index not in self._owned_elevators:
+            elevator = _clone_elevator(elevator)
+            self.state.elevators[index] = elevator
+            self._owned_elevators.add(index)
+        return elevator
+
+    def _mutable_floor(self, index: int) -> FloorState:
+        floor = self.state.floors[index]
+        if index not in self._owned_floors:
+            floor = _clone_floor(floor)
+            self.state.floors[index] = floor
+            self._owned_floors.add(index)
+        return floor
+
+    # ==================== 命令 ====================
+
+    def elevator_go_to_floor(self, elevator_id: int, floor: int, immediate: bool = False) -> None:
+        """电梯前往指定楼层
+
+        Args:
+            elevator_id: 电梯ID
+            floor: 目标楼层
+            immediate: True 立即修改目标；False 作为下一个目标，在到达当前目标后生效
+        """
+        with self.lock:
+            if not 0 <= elevator_id < len(self.state.elevators):
+                raise ValueError(f"Elevator {elevator_id} not found")
+            if not 0 <= floor < len(self.state.floors):
+                raise ValueError(f"Floor {floor} out of range")
+            elevator = self._mutable_elevator(elevator_id)
+            if immediate:
+                self._set_elevator_target_floor(elevator, floor)
+            else:
+                elevator.next_target_floor = floor
+
+    # ==================== tick 推进 ====================
+
+    def step(self, num_ticks: int = 1) -> List[SimulationEvent]:
+        """推进一个或多个tick，返回产生的事件"""
+        with self.lock:
+            new_events: List[SimulationEvent] = []
+            for _ in range(num_ticks):
+                self.state.tick += 1
+                self._tick_events: List[SimulationEvent] = []
+                self._tick_timestamp = datetime.now().isoformat()
+                self._process_tick()
+                new_events.extend(self._tick_events)
+            self.last_events = new_events
+            return new_events
+
+    def _emit_event(self, event_type: EventType, data: Dict[str, Any]) -> None:
+        self._tick_events.append(
+            SimulationEvent(tick=self.state.tick, type=event_type, data=data, timestamp=self._tick_timestamp)
+        )
+
+    def _process_tick(self) -> None:
+        self._update_elevator_status()
+        self._process_arrivals()
+        stopped = self._move_elevators()
+        self._process_elevator_stops(stopped)
+
+    def _set_elevator_target_floor(self, elevator: ElevatorState, floor: int) -> None:
+        elevator.position.target_floor = floor
+        elevator.indicators.set_direction(elevator.target_floor_direction)
+        self._idle_notified.discard(elevator.id)
+
+    def _update_elevator_status(self) -> None:
+        """阶段1：更新电梯运行状态，出发时处理上客"""
+        for index, elevator in enumerate(self.state.elevators):
+            if elevator.target_floor_direction == Direction.STOPPED:
+                if elevator.next_target_floor is not None:
+                    elevator = self._mutable_elevator(index)
+                    self._set_elevator_target_floor(elevator, elevator.next_target_floor)
+                    elevator.next_target_floor = None
+                    if elevator.target_floor_direction == Direction.STOPPED:
+                        # 目标就是当前楼层，保持停靠
+                        continue
+                    self._process_passenger_in(elevator)
+                else:
+                    if elevator.run_status == ElevatorStatus.STOPPED and elevator.id not in self._idle_notified:
+                        elevator = self._mutable_elevator(index)
+                        self._idle_notified.add(elevator.id)
+                        elevator.last_tick_direction = Direction.STOPPED
+                        self._emit_event(EventType.IDLE, {"elevator": elevator.id, "floor": elevator.current_floor})
+                    continue
+
+            if elevator.run_status == ElevatorStatus.STOPPED:
+                self._mutable_elevator(index).run_status = ElevatorStatus.START_UP
+            elif elevator.run_status == ElevatorStatus.START_UP:
+                self._mutable_elevator(index).run_status = ElevatorStatus.CONSTANT_SPEED
+
+    def _process_passenger_in(self, elevator: ElevatorState) -> None:
+        """电梯出发时，方向一致的等待乘客上梯"""
+        floor = self.state.floors[elevator.current_floor]
+        direction = elevator.target_floor_direction
+        queue = floor.up_queue if direction == Direction.UP else floor.down_queue
+        available_capacity = elevator.max_capacity - len(elevator.passengers)
+        if available_capacity <= 0 or not queue:
+            return
+
+        floor = self._mutable_floor(floor.floor)
+        queue = floor.up_queue if direction == Direction.UP else floor.down_queue
+        boarding = queue[:available_capacity]
+        del queue[:available_capacity]
+        passengers = self.passengers
+        for passenger_id in boarding:
+            passenger = passengers.mutable(passenger_id)
+            passenger.pickup_tick = self.state.tick
+            passenger.elevator_id = elevator.id
+            elevator.passengers.append(passenger_id)
+            elevator.passenger_destinations[passenger_id] = passenger.destination
+            self._emit_event(
+                EventType.PASSENGER_BOARD,
+                {"elevator": elevator.id, "floor": floor.floor, "passenger": passenger_id},
+            )
+
+    def _process_arrivals(self) -> None:
+        """阶段2：新乘客到达并按下呼叫按钮"""
+        queue = self.traffic_queue
+        tick = self.state.tick
+        floors = self.state.floors
+        while self._traffic_cursor < len(queue) and queue[self._traffic_cursor].tick <= tick:
+            entry = queue[self._traffic_cursor]
+            self._traffic_cursor += 1
+            if entry.origin == entry.destination or not (0 <= entry.origin < len(floors)):
+                continue
+            if not 0 <= entry.destination < len(floors):
+                continue
+
+            passenger = PassengerInfo(id=entry.id, origin=entry.origin, destination=entry.destination, arrive_tick=tick)
+            self.passengers.add(passenger)
+            self._metrics_cache = None
+            floor = self._mutable_floor(passenger.origin)
+            if passenger.destination > passenger.origin:
+                floor.up_queue.append(passenger.id)
+                self._emit_event(EventType.UP_BUTTON_PRESSED, {"floor": passenger.origin, "passenger": passenger.id})
+            else:
+                floor.down_queue.append(passenger.id)
+                self._emit_event(EventType.DOWN_BUTTON_PRESSED, {"floor": passenger.origin, "passenger": passenger.id})
+
+    def _move_elevators(self) -> List[ElevatorState]:
+        """阶段3：移动电梯，返回本tick停靠的电梯"""
+        stopped: List[ElevatorState] = []
+        for index, elevator in enumerate(self.state.elevators):
+            speed = _MOVEMENT_SPEED.get(elevator.run_status, 0)
+            if speed == 0:
+                continue
+
+            elevator = self._mutable_elevator(index)
+            position = elevator.position
+            direction = elevator.target_floor_direction
+            target_units = position.target_floor * 10
+            if direction == Direction.STOPPED:
+                # 立即改派到了当前所在位置，直接停靠
+                self._stop_elevator(elevator)
+                stopped.append(elevator)
+                continue
+
+            old_floor = position.current_floor
+            old_position = position.current_floor_float
+            remaining = abs(target_units - (position.current_floor * 10 + position.floor_up_position))
+            movement = min(speed, remaining)
+            new_floor = position.floor_up_position_add(movement if direction == Direction.UP else -movement)
+            elevator.last_tick_direction = direction
+            elevator.last_update_tick = self.state.tick
+            self._emit_event(
+                EventType.ELEVATOR_MOVE,
+                {
+                    "elevator": elevator.id,
+                    "from_position": round(old_position, 1),
+                    "to_position": round(position.current_floor_float, 1),
+                    "direction": direction.value,
+                    "status": elevator.run_status.value,
+                },
+            )
+
+            remaining = abs(target_units - (position.current_floor * 10 + position.floor_up_position))
+            if remaining == 0:
+                self._stop_elevator(elevator)
+                stopped.append(elevator)
+                continue
+
+            if old_floor != new_floor:
+                self._emit_event(
+                    EventType.PASSING_FLOOR,
+                    {"elevator": elevator.id, "floor": new_floor, "direction": direction.value},
+                )
+            if elevator.run_status == ElevatorStatus.CONSTANT_SPEED and remaining <= 1:
+                elevator.run_status = ElevatorStatus.START_DOWN
+                self._emit_event(
+                    EventType.ELEVATOR_APPROACHING,
+                    {"elevator": elevator.id, "floor": position.target_floor, "direction": direction.value},
+                )
+        return stopped
+
+    def _stop_elevator(self, elevator: ElevatorState) -> None:
+        position = elevator.position
+        position.current_floor = position.target_floor
+        position.floor_up_position = 0
+        elevator.run_status = ElevatorStatus.STOPPED
+        self._emit_event(
+            EventType.STOPPED_AT_FLOOR,
+            {"elevator": elevator.id, "floor": position.current_floor, "reason": "move_reached"},
+        )
+
+    def _process_elevator_stops(self, stopped: List[ElevatorState]) -> None:
+        """阶段4：停靠电梯的乘客下梯"""
+        tick = self.state.tick
+        for elevator in stopped:
+            current_floor = elevator.current_floor
+            alighting = [
+                pid for pid in elevator.passengers if elevator.passenger_destinations.get(pid) == current_floor
+            ]
+            for passenger_id in alighting:
+                passenger = self.passengers.mutable(passenger_id)
+                passenger.dropoff_tick = tick
+                passenger.arrived = True
+                elevator.passengers.remove(passenger_id)
+                elevator.passenger_destinations.pop(passenger_id, None)
+                self._wait_times.append(float(passenger.wait_time))
+                self._system_times.append(float(passenger.system_time))
+                self._metrics_cache = None
+                self._emit_event(
+                    EventType.PASSENGER_ALIGHT,
+                    {"elevator": elevator.id, "floor": current_floor, "passenger": passenger_id},
+                )
+
+    # ==================== 状态输出 ====================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """计算性能指标（字段名与外部模拟器一致）"""
+        if self._metrics_cache is None:
+            wait_times = sorted(self._wait_times.values())
+            system_times = sorted(self._system_times.values())
+            self._metrics_cache = {
+                "completed_passengers": len(system_times),
+                "total_passengers": len(self.state.passengers),
+                "average_floor_wait_time": sum(wait_times) / len(wait_times) if wait_times else 0.0,
+                "p95_floor_wait_time": _percentile(wait_times, 95),
+                "average_arrival_wait_time": sum(system_times) / len(system_times) if system_times else 0.0,
+                "p95_arrival_wait_time": _percentile(system_times, 95),
+            }
+        return dict(self._metrics_cache)
+
+    def get_state(self) -> Dict[str, Any]:
+        """获取完整状态（与 GET /api/state 响应格式一致）"""
+        with self.lock:
+            return {
+                "tick": self.state.tick,
+                "elevators": [_elevator_to_dict(e) for e in self.state.elevators],
+                "floors": [
+                    {"floor": f.floor, "up_queue": list(f.up_queue), "down_queue": list(f.down_queue)}
+                    for f in self.state.floors
+                ],
+                "passengers": {str(pid): _passenger_to_dict(p) for pid, p in self.state.passengers.items()},
+                "metrics": self.get_metrics(),
+            }
+
+
+class SimulationSnapshot:
+    """模拟快照 - 冻结的分支，可反复派生新的模拟"""
+
+    def __init__(self, simulation: ElevatorSimulation):
+        self._simulation = simulation
+
+    @property
+    def tick(self) -> int:
+        return self._simulation.tick
+
+    def fork(self) -> ElevatorSimulation:
+        """从快照派生一个可推进的模拟"""
+        return self._simulation.fork()
+
+
+def _elevator_from_client(elevator: ElevatorState) -> ElevatorState:
+    """复制客户端的电梯状态（嵌套字段可能仍是反序列化前的字典）"""
+    position = elevator.position
+    if isinstance(position, dict):
+        position = Position.from_dict(position)
+    indicators = elevator.indicators
+    if isinstance(indicators, dict):
+        indicators = ElevatorIndicators.from_dict(indicators)
+    return _clone_elevator(
+        ElevatorState(
+            id=elevator.id,
+            position=position,
+            next_target_floor=elevator.next_target_floor,
+            passengers=elevator.passengers,
+            max_capacity=elevator.max_capacity,
+            speed_pre_tick=elevator.speed_pre_tick,
+            run_status=ElevatorStatus(elevator.run_status),
+            last_tick_direction=Direction(elevator.last_tick_direction),
+            indicators=indicators,
+            passenger_destinations={int(k): int(v) for k, v in elevator.passenger_destinations.items()},
+            energy_consumed=elevator.energy_consumed,
+            last_update_tick=elevator.last_update_tick,
+        )
+    )
+
+
+def _elevator_to_dict(elevator: ElevatorState) -> Dict[str, Any]:
+    position = elevator.position
+    return {
+        "id": elevator.id,
+        "position": {
+            "current_floor": position.current_floor,
+            "target_floor": position.target_floor,
+            "floor_up_position": position.floor_up_position,
+        },
+        "next_target_floor": elevator.next_target_floor,
+        "passengers": list(elevator.passengers),
+        "max_capacity": elevator.max_capacity,
+        "speed_pre_tick": elevator.speed_pre_tick,
+        "run_status": elevator.run_status.value,
+        "last_tick_direction": elevator.last_tick_direction.value,
+        "indicators": {"up": elevator.indicators.up, "down": elevator.indicators.down},
+        "passenger_destinations": {str(k): v for k, v in elevator.passenger_destinations.items()},
+        "energy_consumed": elevator.energy_consumed,
+        "last_update_tick": elevator.last_update_tick,
+    }
+
+
+def _passenger_to_dict(passenger: PassengerInfo) -> Dict[str, Any]:
+    return {
+        "id": passenger.id,
+        "origin": passenger.origin,
+        "destination": passenger.destination,
+        "arrive_tick": passenger.arrive_tick,
+        "pickup_tick": passenger.pickup_tick,
+        "dropoff_tick": passenger.dropoff_tick,
+        "arrived": passenger.arrived,
+        "elevator_id": passenger.elevator_id,
+    }
+
+
+def event_to_dict(event: SimulationEvent) -> Dict[str, Any]:
+    """事件转换为JSON友好的字典"""
+    return {"tick": event.tick, "type": event.type.value, "data": event.data, "timestamp": event.timestamp}
@@ -0,0 +1,4 @@
+"""
+Local simulator server for Elevator Saga
+本地模拟器服务模块
+"""
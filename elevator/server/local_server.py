@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Local Simulator HTTP Server
+基于 asyncio 的本地模拟器服务 - 实现与外部模拟器一致的HTTP接口，用于测试和端到端基准
+"""
+import asyncio
+import json
+import re
+import threading
+from typing import Any, Dict, Optional, Set, Tuple
+
+from elevator.core.simulator import ElevatorSimulation, event_to_dict
+from elevator.utils.debug import debug_log
+
+_GO_TO_FLOOR_PATTERN = re.compile(r"^/api/elevators/(\d+)/go_to_floor$")
+
+_STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+_REQUIRED: Any = object()
+
+
+def _field(payload: Dict[str, Any], name: str, convert: Any, default: Any = _REQUIRED) -> Any:
+    """读取并转换请求体字段，缺失或无法转换时抛出 ValueError（返回 400）"""
+    if name not in payload:
+        if default is _REQUIRED:
+            raise ValueError(f"Missing field: {name}")
+        return default
+    try:
+        return convert(payload[name])
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid field {name}: {payload[name]!r}") from None
+
+
+class SimulatorAPI:
+    """HTTP路由分发 - 将请求映射到模拟引擎，与传输层无关"""
+
+    def __init__(self, simulation: ElevatorSimulation):
+        self.simulation = simulation
+
+    def handle(
+        self, method: str, path: str, payload: Dict[str, Any], headers: Dict[str, str]
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        处理一个API请求
+
+        Args:
+            method: HTTP方法
+            path: 请求路径（不含查询参数）
+            payload: 已解析的JSON请求体
+            headers: 请求头（键为小写）
+
+        Returns:
+            (HTTP状态码, 响应数据)
+        """
+        sim = self.simulation
+        try:
+            if method == "GET":
+                if path == "/api/state":
+                    return 200, sim.get_state()
+                if path == "/api/traffic/info":
+                    return 200, sim.get_traffic_info()
+                return 404, {"error": f"Not found: {path}"}
+
+            if path == "/api/step":
+                events = sim.step(_field(payload, "ticks", int, 1))
+                return 200, {"tick": sim.tick, "events": [event_to_dict(e) for e in events]}
+
+            match = _GO_TO_FLOOR_PATTERN.match(path)
+            if match:
+                floor = _field(payload, "floor", int)
+                immediate = _field(payload, "immediate", bool, False)
+                sim.elevator_go_to_floor(int(match.group(1)), floor, immediate)
+                return 200, {"success": True}
+
+            if path == "/api/reset":
+                sim.reset()
+                return 200, {"success": True}
+
+            if path == "/api/traffic/next":
+                if sim.next_traffic_round(_field(payload, "full_reset", bool, False)):
+                    return 200, {"success": True}
+                return 400, {"success": False, "error": "No more scenarios"}
+
+            if path == "/api/client/register":
+                client_type = headers.get("x-client-type", "algorithm")
+                client_id = sim.register_client(client_type)
+                return 200, {"success": True, "client_id": client_id, "client_type": client_type}
+
+            return 404, {"error": f"Not found: {path}"}
+        except ValueError as e:
+            # 请求参数错误，包括引擎拒绝的电梯编号/楼层
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+
+class LocalSimulatorServer:
+    """
+    本地模拟器服务
+
+    使用 asyncio 实现的最小 HTTP/1.1 服务（支持 keep-alive），在后台线程中运行。
+    可以作为上下文管理器在测试中启动::
+
+        with LocalSimulatorServer(ElevatorSimulation(traffic)) as server:
+            client = ElevatorAPIClient(server.url)
+    """
+
+    def __init__(self, simulation: Optional[ElevatorSimulation] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        初始化服务
+
+        Args:
+            simulation: 模拟引擎，默认使用空流量的引擎
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+        """
+        self.simulation = simulation if simulation is not None else ElevatorSimulation()
+        self.api = SimulatorAPI(self.simulation)
+        self.host = host
+        self.port = port
+        self.request_count = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connections: Set["asyncio.Task[None]"] = set()
+        self._ready = threading.Event()
+        self._startup_error: Optional[BaseException] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def serve(self) -> asyncio.AbstractServer:
+        """在当前事件循环中开始监听（不阻塞）"""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        debug_log(f"Local simulator listening on {self.url}")
+        return self._server
+
+    def start(self) -> str:
+        """在后台线程中启动服务，返回服务URL"""
+        if self._thread is not None:
+            return self.url
+
+        def _run() -> None:
+            loop = asyncio.new_event_loop()
+            self._loop = loop
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(self.serve())
+            except BaseException as e:
+                self._startup_error = e
+                self._ready.set()
+                loop.close()
+                return
+            self._ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=_run, name="local-simulator", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._startup_error is not None:
+            self._thread = None
+            raise RuntimeError(f"Local simulator failed to start: {self._startup_error}")
+        return self.url
+
+    def stop(self) -> None:
+        """停止服务"""
+        loop, thread = self._loop, self._thread
+        if loop is None or thread is None:
+            return
+
+        async def _shutdown() -> None:
+            if self._server is not None:
+                self._server.close()
+            # 关闭仍保持keep-alive的连接
+            for task in list(self._connections):
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            loop.stop()
+
+        asyncio.run_coroutine_threadsafe(_shutdown(), loop)
+        thread.join(timeout=5)
+        self._loop = None
+        self._thread = None
+        self._ready.clear()
+
+    def __enter__(self) -> "LocalSimulatorServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理一个TCP连接上的所有请求"""
+        task = asyncio.current_task()
+        if task is not None:
+            self._connections.add(task)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+                    # 客户端断开或服务关闭
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers: Dict[str, str] = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        key, value = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", "0") or 0)
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    payload = json.loads(body) if body else {}
+                except ValueError:
+                    payload = None
+
+                if isinstance(payload, dict):
+                    status, response = self.api.handle(method, target.split("?", 1)[0], payload, headers)
+                else:
+                    status, response = 400, {"error": "Invalid JSON body"}
+                self.request_count += 1
+
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                data = json.dumps(response).encode("utf-8")
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, 'OK')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            if task is not None:
+                self._connections.discard(task)
+            writer.close()
@@ -1,25 +1,25 @@
 #!/usr/bin/env python3
 """
 Debug utilities for Elevator Saga
-调试工具模块
+调试工具模块 - 基于 elevator.utils.log 的 "elevator" 日志器，默认不输出
 """
+from typing import Any
 
-# Global debug flag
-_debug_enabled: bool = True
+from elevator.utils.log import DEBUG, WARNING, Message, configure, get_level, get_logger
+
+_log = get_logger("elevator")
 
 
 def set_debug_mode(enabled: bool) -> None:
     """启用或禁用调试模式"""
-    global _debug_enabled
-    _debug_enabled = enabled
+    configure(level=DEBUG if enabled else WARNING)
 
 
-def debug_log(message: str) -> None:
-    """输出调试信息（如果启用了调试模式）"""
-    if _debug_enabled:
-        print(f"[DEBUG] {message}", flush=True)
+def debug_log(message: Message, *args: Any) -> None:
+    """输出调试信息（如果启用了调试模式），参数在启用时才格式化"""
+    _log.debug(message, *args)
 
 
 def is_debug_enabled() -> bool:
     """检查是否启用了调试模式"""
-    return _debug_enabled
+    return get_level() <= DEBUG
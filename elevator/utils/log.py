@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Leveled logging for Elevator Saga
+分级日志 - 低于阈值的日志只做一次整数比较，不构造消息；
+记录保存在内存环形缓冲区中，由后台线程批量写出
+
+用法::
+
+    log = get_logger("look_v2")
+    log.debug("E%d 前往 F%d", elevator_id, floor)
+    log.debug(lambda: f"载客: {len(elevator.passengers)}")  # 参数本身开销大时传入函数
+
+默认级别为 WARNING（算法运行时不输出调度细节），可用环境变量 ELEVATOR_LOG_LEVEL 或 configure() 修改。
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, TextIO, Tuple, Union
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES: Dict[int, str] = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR", OFF: "OFF"}
+_LEVELS_BY_NAME: Dict[str, int] = {name: level for level, name in LEVEL_NAMES.items()}
+
+DEFAULT_BUFFER_SIZE = 10000  # 环形缓冲区保留的记录数
+DEFAULT_FLUSH_INTERVAL = 0.2  # 后台线程写出间隔（秒）
+FLUSH_BATCH = 1000  # 待写出记录达到该数量时立即唤醒后台线程
+
+Message = Union[str, Callable[[], str]]
+
+_UNSET: Any = object()
+_STDERR: Any = object()  # 写出时的 sys.stderr（可能已被替换）
+
+
+def parse_level(level: Union[int, str]) -> int:
+    """级别名称（不区分大小写）或数值 -> 级别数值"""
+    if isinstance(level, int):
+        return level
+    try:
+        return _LEVELS_BY_NAME[level.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Unknown log level: {level}") from None
+
+
+def _build_message(msg: Message, args: Tuple[Any, ...]) -> str:
+    if callable(msg):
+        return msg()
+    if args:
+        try:
+            return msg % args
+        except (TypeError, ValueError):
+            return f"{msg} {args}"
+    return msg
+
+
+@dataclass
+class LogRecord:
+    """一条日志记录"""
+
+    created: float
+    level: int
+    name: str
+    message: str
+
+    def format(self) -> str:
+        return f"[{LEVEL_NAMES.get(self.level, self.level)}] {self.name}: {self.message}"
+
+
+class LogManager:
+    """日志的全局状态：级别、环形缓冲区、待写出队列和后台写出线程"""
+
+    def __init__(self) -> None:
+        self.level = parse_level(os.environ.get("ELEVATOR_LOG_LEVEL", "WARNING"))
+        self.stream: Optional[TextIO] = _STDERR
+        self.flush_interval = DEFAULT_FLUSH_INTERVAL
+        self.buffer: Deque[LogRecord] = deque(maxlen=DEFAULT_BUFFER_SIZE)
+        self._pending: Deque[LogRecord] = deque()
+        self._wakeup = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def configure(
+        self,
+        level: Union[int, str, None] = None,
+        stream: Optional[TextIO] = _UNSET,
+        buffer_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+    ) -> None:
+        """
+        修改日志配置
+
+        Args:
+            level: 记录阈值，低于该级别的日志直接丢弃
+            stream: 输出流（默认 sys.stderr），None 表示只记录到环形缓冲区不输出
+            buffer_size: 环形缓冲区大小
+            flush_interval: 后台线程写出间隔（秒）
+        """
+        if level is not None:
+            self.level = parse_level(level)
+        if stream is not _UNSET:
+            self.flush()
+            self.stream = stream
+        if buffer_size is not None:
+            self.buffer = deque(self.buffer, maxlen=buffer_size)
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+
+    def emit(self, record: LogRecord) -> None:
+        self.buffer.append(record)
+        if self.stream is None:
+            return
+        self._pending.append(record)
+        if self._thread is None:
+            self._start_thread()
+        if len(self._pending) >= FLUSH_BATCH or record.level >= ERROR:
+            self._wakeup.set()
+
+    def _start_thread(self) -> None:
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_loop, name="log-flush", daemon=True)
+                self._thread.start()
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """把待写出的记录一次性写到输出流"""
+        with self._write_lock:
+            pending = self._pending
+            lines: List[str] = []
+            while pending:
+                lines.append(pending.popleft().format())
+            stream = sys.stderr if self.stream is _STDERR else self.stream
+            if lines and stream is not None:
+                try:
+                    stream.write("\n".join(lines) + "\n")
+                    stream.flush()
+                except (OSError, ValueError):
+                    # 输出流已关闭（例如解释器退出时）
+                    pass
+
+    def recent(self, count: Optional[int] = None, level: int = DEBUG) -> List[LogRecord]:
+        """环形缓冲区中最近的记录（不低于 level），按时间顺序"""
+        records = [record for record in list(self.buffer) if record.level >= level]
+        return records[-count:] if count else records
+
+
+_manager = LogManager()
+atexit.register(_manager.flush)
+
+
+class Logger:
+    """命名日志器"""
+
+    def __init__(self, name: str, manager: LogManager = _manager):
+        self.name = name
+        self.manager = manager
+
+    def is_enabled_for(self, level: int) -> bool:
+        return level >= self.manager.level
+
+    def log(self, level: int, msg: Message, *args: Any) -> None:
+        # 消息在通过级别检查后立即构造：引用的电梯、乘客状态之后会变化
+        if level >= self.manager.level:
+            self.manager.emit(LogRecord(time.time(), level, self.name, _build_message(msg, args)))
+
+    def debug(self, msg: Message, *args: Any) -> None:
+        if DEBUG >= self.manager.level:
+            self.manager.emit(LogRecord(time.time(), DEBUG, self.name, _build_message(msg, args)))
+
+    def info(self, msg: Message, *args: Any) -> None:
+        if INFO >= self.manager.level:
+            self.manager.emit(LogRecord(time.time(), INFO, self.name, _build_message(msg, args)))
+
+    def warning(self, msg: Message, *args: Any) -> None:
+        self.log(WARNING, msg, *args)
+
+    def error(self, msg: Message, *args: Any) -> None:
+        self.log(ERROR, msg, *args)
+
+
+_loggers: Dict[str, Logger] = {}
+
+
+def get_logger(name: str) -> Logger:
+    """获取命名日志器（同名返回同一个对象）"""
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, Logger(name))
+    return logger
+
+
+def configure(
+    level: Union[int, str, None] = None,
+    stream: Optional[TextIO] = _UNSET,
+    buffer_size: Optional[int] = None,
+    flush_interval: Optional[float] = None,
+) -> None:
+    """修改全局日志配置，参数见 LogManager.configure"""
+    _manager.configure(level, stream, buffer_size, flush_interval)
+
+
+def get_level() -> int:
+    return _manager.level
+
+
+def flush() -> None:
+    """立即写出所有待写出的记录"""
+    _manager.flush()
+
+
+def recent(count: Optional[int] = None, level: int = DEBUG) -> List[LogRecord]:
+    """环形缓冲区中最近的记录"""
+    return _manager.recent(count, level)
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Recording Analytics
+记录分析 - 把任意格式的运行记录转成列（见 columnar.py），用向量化运算计算运行指标
+
+- 乘客: 等待时间（呼叫 -> 上梯）、乘梯时间（上梯 -> 下梯）、系统时间（呼叫 -> 下梯），单位tick
+- 电梯: 利用率（非停止状态的tick比例）、平均载客率、停靠次数、行驶楼层数
+
+在仓库根目录运行::
+
+    python -m elevator.visualization.analytics elevator/visualization/recordings --workers 8
+    python -m elevator.visualization.analytics run.jsonl other.recz --output summary.json
+
+多个记录在进程池中并行分析。多轮记录（tick回退处切分）中乘客编号按轮区分。
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from elevator.core.models import ElevatorStatus, EventType
+from elevator.visualization.columnar import COLUMNAR_SUFFIX, ColumnarRecording, load_columns
+from elevator.visualization.recording_io import iter_recording, list_recording_files
+
+PathLike = Union[str, Path]
+
+
+def load_any(path: PathLike) -> ColumnarRecording:
+    """以列的形式打开任意格式的记录（.columns 目录直接内存映射，其他格式在内存中转换）"""
+    path = Path(path)
+    if path.suffix == COLUMNAR_SUFFIX:
+        return load_columns(path)
+    metadata, snapshots = iter_recording(path)
+    return ColumnarRecording.from_snapshots(snapshots, metadata)
+
+
+def round_ids(rec: ColumnarRecording) -> np.ndarray:
+    """每帧所属的轮次（tick不增加处开始新的一轮）"""
+    ticks = np.asarray(rec["tick"])
+    if not len(ticks):
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(([0], np.cumsum(np.diff(ticks) <= 0)))
+
+
+def _first_by_key(keys: np.ndarray, values: np.ndarray, last: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """每个键第一次（last=True 时最后一次）出现时的值，返回 (升序的键, 值)"""
+    if last:
+        keys, values = keys[::-1], values[::-1]
+    order = np.argsort(keys, kind="stable")
+    unique, index = np.unique(keys[order], return_index=True)
+    return unique, values[order][index]
+
+
+def _lookup(keys: np.ndarray, values: np.ndarray, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """在升序的 keys 中查找 query，返回 (是否找到, 对应的值)"""
+    if not len(keys):
+        return np.zeros(len(query), dtype=bool), np.zeros(len(query), dtype=values.dtype)
+    position = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+    found = keys[position] == query
+    return found, values[position]
+
+
+def passenger_times(rec: ColumnarRecording) -> Dict[str, np.ndarray]:
+    """
+    每位乘客的等待、乘梯和系统时间（tick）
+
+    Returns:
+        {"passenger", "round", "wait", "ride", "system"}：按 (轮次, 乘客) 排序，
+        尚未上梯/送达的乘客对应时间为 -1
+    """
+    events = rec.events
+    ticks = np.asarray(rec["tick"], dtype=np.int64)
+    rounds = round_ids(rec)
+    types = events["type"]
+    frames = events["frame"].astype(np.int64)
+    keys = (rounds[frames] << 32) | events["passenger"].astype(np.int64)
+
+    call_codes = [
+        rec.event_code(EventType.UP_BUTTON_PRESSED.value),
+        rec.event_code(EventType.DOWN_BUTTON_PRESSED.value),
+    ]
+    calls = np.isin(types, call_codes)
+    boards = types == rec.event_code(EventType.PASSENGER_BOARD.value)
+    alights = types == rec.event_code(EventType.PASSENGER_ALIGHT.value)
+
+    passengers, call_tick = _first_by_key(keys[calls], ticks[frames[calls]])
+    board_keys, board_tick = _first_by_key(keys[boards], ticks[frames[boards]])
+    alight_keys, alight_tick = _first_by_key(keys[alights], ticks[frames[alights]], last=True)
+    boarded, board_at = _lookup(board_keys, board_tick, passengers)
+    arrived, alight_at = _lookup(alight_keys, alight_tick, passengers)
+
+    return {
+        "passenger": passengers & 0xFFFFFFFF,
+        "round": passengers >> 32,
+        "wait": np.where(boarded, board_at - call_tick, -1),
+        "ride": np.where(boarded & arrived, alight_at - board_at, -1),
+        "system": np.where(arrived, alight_at - call_tick, -1),
+    }
+
+
+def car_stats(rec: ColumnarRecording) -> Dict[str, np.ndarray]:
+    """
+    每部电梯的运行指标
+
+    Returns:
+        {"utilization", "load_factor", "stops", "distance"}，长度为电梯数
+    """
+    num_elevators = rec.num_elevators
+    status = np.asarray(rec["elevator_status"])
+    moving = (status != rec.status_code(ElevatorStatus.STOPPED.value)) & (status >= 0)
+    load = np.asarray(rec["elevator_load"], dtype=np.float64)
+    capacity = float(rec.metadata.get("elevator_capacity") or 0) or np.nan
+
+    floors = np.asarray(rec["elevator_floor"], dtype=np.int32)
+    moved = np.abs(np.diff(floors, axis=0))
+    same_round = np.diff(round_ids(rec)) == 0
+    distance = (moved * same_round[:, None]).sum(axis=0) if len(moved) else np.zeros(num_elevators, dtype=np.int64)
+
+    events = rec.events
+    stopped = events["elevator"][events["type"] == rec.event_code(EventType.STOPPED_AT_FLOOR.value)]
+    stops = np.bincount(stopped[(stopped >= 0) & (stopped < num_elevators)], minlength=num_elevators)
+
+    empty = not len(status)
+    return {
+        "utilization": np.zeros(num_elevators) if empty else moving.mean(axis=0),
+        "load_factor": np.zeros(num_elevators) if empty else load.mean(axis=0) / capacity,
+        "stops": stops,
+        "distance": distance,
+    }
+
+
+def _number(value: float, digits: int = 4) -> Optional[float]:
+    """保留 digits 位小数，NaN（如记录中没有电梯容量）转为 None"""
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+def _stats(values: np.ndarray) -> Dict[str, Optional[float]]:
+    if not len(values):
+        return {"mean": None, "p95": None, "max": None}
+    return {
+        "mean": round(float(values.mean()), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "max": float(values.max()),
+    }
+
+
+def summarize(rec: ColumnarRecording) -> Dict[str, Any]:
+    """记录的指标汇总（可JSON序列化）"""
+    times = passenger_times(rec)
+    cars = car_stats(rec)
+    wait, ride, system = times["wait"], times["ride"], times["system"]
+    return {
+        "algorithm": rec.metadata.get("algorithm"),
+        "ticks": len(rec),
+        "rounds": int(round_ids(rec)[-1]) + 1 if len(rec) else 0,
+        "elevators": rec.num_elevators,
+        "floors": rec.num_floors,
+        "passengers": int(len(wait)),
+        "delivered": int((system >= 0).sum()),
+        "wait": _stats(wait[wait >= 0]),
+        "ride": _stats(ride[ride >= 0]),
+        "system": _stats(system[system >= 0]),
+        "cars": [
+            {
+                "id": index,
+                "utilization": _number(cars["utilization"][index]),
+                "load_factor": _number(cars["load_factor"][index]),
+                "stops": int(cars["stops"][index]),
+                "distance": int(cars["distance"][index]),
+            }
+            for index in range(rec.num_elevators)
+        ],
+    }
+
+
+def summarize_file(path: PathLike) -> Dict[str, Any]:
+    """分析一个记录文件（进程池的任务，出错时返回 error 而不是抛出）"""
+    try:
+        return {"file": str(path), **summarize(load_any(path))}
+    except Exception as e:
+        return {"file": str(path), "error": f"{type(e).__name__}: {e}"}
+
+
+def find_recordings(paths: Sequence[PathLike]) -> List[Path]:
+    """展开参数中的目录：目录中的所有记录文件和 .columns 目录"""
+    found: List[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir() and path.suffix != COLUMNAR_SUFFIX:
+            found.extend(sorted(list_recording_files(path)))
+            found.extend(sorted(p for p in path.iterdir() if p.is_dir() and p.suffix == COLUMNAR_SUFFIX))
+        else:
+            found.append(path)
+    return found
+
+
+def summarize_many(paths: Sequence[PathLike], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """并行分析多个记录，按输入顺序产生结果"""
+    files = find_recordings(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(files) <= 1:
+        yield from map(summarize_file, files)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as executor:
+        yield from executor.map(summarize_file, files, chunksize=max(1, len(files) // (workers * 4)))
+
+
+def _format_row(summary: Dict[str, Any]) -> str:
+    name = Path(summary["file"]).name
+    if "error" in summary:
+        return f"{name:<48} ERROR {summary['error']}"
+    cars = summary["cars"]
+    utilization = sum(c["utilization"] for c in cars) / len(cars) if cars else 0.0
+    wait = summary["wait"]["mean"]
+    p95 = summary["wait"]["p95"]
+    return (
+        f"{name:<48} {summary['ticks']:>7} {summary['delivered']:>5}/{summary['passengers']:<5} "
+        f"{wait if wait is not None else '-':>8} {p95 if p95 is not None else '-':>8} {utilization:>6.1%} "
+        f"{sum(c['stops'] for c in cars):>6} {sum(c['distance'] for c in cars):>7}"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize KPIs of recorded runs")
+    parser.add_argument("paths", nargs="+", type=Path, help="记录文件或记录目录")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，默认为CPU核数")
+    parser.add_argument("--output", type=Path, help="把完整结果写为JSON")
+    args = parser.parse_args(argv)
+
+    header = (
+        f"{'recording':<48} {'ticks':>7} {'delivered':>11} {'wait':>8} {'p95':>8} {'util':>6} {'stops':>6} {'dist':>7}"
+    )
+    print(header)
+    results = []
+    for summary in summarize_many(args.paths, args.workers):
+        print(_format_row(summary), flush=True)
+        results.append(summary)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 1 if any("error" in summary for summary in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
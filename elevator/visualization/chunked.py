@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Chunked Recordings
+分块压缩记录（.recz）- 每 N 个tick压缩成一块，文件末尾的索引记录每块的tick范围和字节偏移，
+读取某个tick窗口时只解压覆盖它的块
+
+文件布局::
+
+    MAGIC [头长度 uint32][zlib(JSON 初始元数据)]
+    [块长度 uint32][zlib(JSON 帧列表)]  ...  每块第一帧为完整快照，其余为相对前一帧的增量（见 delta.py）
+    [索引长度 uint32][zlib(JSON 索引)]          {"metadata": ..., "chunk_ticks": N, "chunks": [...]}
+    [索引偏移 uint64] FOOTER_MAGIC
+
+运行中断时没有索引，读取器使用初始元数据，并顺序扫描块长度前缀恢复已写出的块。
+"""
+import bisect
+import json
+import struct
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from elevator.visualization.delta import apply_delta, check_range, diff_snapshot
+
+CHUNKED_SUFFIX = ".recz"
+MAGIC = b"ELEVREC1"
+FOOTER_MAGIC = b"ELEVIDX1"
+DEFAULT_CHUNK_TICKS = 256
+COMPRESSION_LEVEL = 6
+CACHED_CHUNKS = 4  # 读取器缓存最近解压的块数
+
+_LENGTH = struct.Struct("<I")
+_FOOTER = struct.Struct("<Q8s")
+
+
+def _compress(value: Any) -> bytes:
+    return zlib.compress(
+        json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL
+    )
+
+
+def _decompress(data: bytes) -> Any:
+    return json.loads(zlib.decompress(data))
+
+
+class ChunkedRecordingWriter:
+    """分块压缩记录写入器，接口与 JsonlRecordingWriter 相同"""
+
+    def __init__(self, path: Union[str, Path], metadata: Dict[str, Any], chunk_ticks: int = DEFAULT_CHUNK_TICKS):
+        """
+        Args:
+            path: 输出文件
+            metadata: 初始元数据（运行中断时读取器使用）
+            chunk_ticks: 每块的tick数
+        """
+        self.path = Path(path)
+        self.ticks = 0
+        self.chunk_ticks = chunk_ticks
+        self._chunks: List[Dict[str, Any]] = []
+        self._frames: List[Dict[str, Any]] = []
+        self._previous: Optional[Dict[str, Any]] = None
+        self._file: Optional[IO[bytes]] = open(self.path, "wb")
+        header = _compress(metadata)
+        self._file.write(MAGIC + _LENGTH.pack(len(header)) + header)
+
+    def write_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        delta = diff_snapshot(self._previous, snapshot) if self._frames and self._previous is not None else None
+        self._frames.append({"type": "keyframe", **snapshot} if delta is None else {"type": "delta", **delta})
+        self._previous = snapshot
+        self.ticks += 1
+        if len(self._frames) >= self.chunk_ticks:
+            self._flush_chunk()
+
+    def _flush_chunk(self) -> None:
+        if not self._frames:
+            return
+        assert self._file is not None, "recording already closed"
+        data = _compress(self._frames)
+        offset = self._file.tell()
+        self._file.write(_LENGTH.pack(len(data)) + data)
+        self._file.flush()
+        self._chunks.append(
+            {
+                "offset": offset,
+                "length": len(data),
+                "first": self.ticks - len(self._frames),
+                "count": len(self._frames),
+                "tick_start": self._frames[0]["tick"],
+                "tick_end": self._frames[-1]["tick"],
+            }
+        )
+        self._frames = []
+
+    def close(self, metadata: Dict[str, Any]) -> Path:
+        """写出最后一块和索引并关闭文件"""
+        if self._file is not None:
+            self._flush_chunk()
+            offset = self._file.tell()
+            data = _compress({"metadata": metadata, "chunk_ticks": self.chunk_ticks, "chunks": self._chunks})
+            self._file.write(_LENGTH.pack(len(data)) + data + _FOOTER.pack(offset, FOOTER_MAGIC))
+            self._file.close()
+            self._file = None
+        return self.path
+
+
+class ChunkedRecordingReader:
+    """
+    分块压缩记录读取器
+
+    用法::
+
+        reader = ChunkedRecordingReader(path)
+        window = list(reader.iter_range(1000, 1100))  # 只解压覆盖这100帧的块
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.complete = True
+        self._cache: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self.metadata: Dict[str, Any] = {}
+        self.chunks: List[Dict[str, Any]] = []
+        with open(self.path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a chunked recording: {self.path}")
+            (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+            self.metadata = _decompress(f.read(length))
+            self._data_start = f.tell()
+            index = self._read_index(f)
+            if index is None:
+                self.complete = False
+                self.chunks = self._scan_chunks(f)
+            else:
+                self.metadata = index["metadata"]
+                self.chunks = index["chunks"]
+        self._firsts = [chunk["first"] for chunk in self.chunks]
+        if not self.complete:
+            self.metadata = {**self.metadata, "total_ticks": len(self), "incomplete": True}
+
+    def _read_index(self, f: IO[bytes]) -> Optional[Dict[str, Any]]:
+        f.seek(0, 2)
+        end = f.tell()
+        if end < self._data_start + _FOOTER.size:
+            return None
+        f.seek(end - _FOOTER.size)
+        offset, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+        if magic != FOOTER_MAGIC:
+            return None
+        f.seek(offset)
+        (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+        index: Dict[str, Any] = _decompress(f.read(length))
+        return index
+
+    def _scan_chunks(self, f: IO[bytes]) -> List[Dict[str, Any]]:
+        """没有索引时顺序扫描完整写出的块（需要解压每块以得到帧数）"""
+        chunks: List[Dict[str, Any]] = []
+        f.seek(self._data_start)
+        first = 0
+        while True:
+            offset = f.tell()
+            prefix = f.read(_LENGTH.size)
+            if len(prefix) < _LENGTH.size:
+                break
+            (length,) = _LENGTH.unpack(prefix)
+            data = f.read(length)
+            try:
+                frames = _decompress(data)
+            except (zlib.error, ValueError):
+                break  # 中断时写了一半的块
+            chunks.append(
+                {
+                    "offset": offset,
+                    "length": length,
+                    "first": first,
+                    "count": len(frames),
+                    "tick_start": frames[0]["tick"],
+                    "tick_end": frames[-1]["tick"],
+                }
+            )
+            first += len(frames)
+        return chunks
+
+    def __len__(self) -> int:
+        if not self.chunks:
+            return 0
+        last = self.chunks[-1]
+        return int(last["first"] + last["count"])
+
+    def _frames(self, position: int) -> List[Dict[str, Any]]:
+        """第 position 块解码后的完整快照列表"""
+        cached = self._cache.get(position)
+        if cached is not None:
+            self._cache.move_to_end(position)
+            return cached
+        chunk = self.chunks[position]
+        with open(self.path, "rb") as f:
+            f.seek(chunk["offset"] + _LENGTH.size)
+            frames = _decompress(f.read(chunk["length"]))
+        snapshots: List[Dict[str, Any]] = []
+        for frame in frames:
+            kind = frame.pop("type")
+            snapshots.append(apply_delta(snapshots[-1], frame) if kind == "delta" else frame)
+        self._cache[position] = snapshots
+        if len(self._cache) > CACHED_CHUNKS:
+            self._cache.popitem(last=False)
+        return snapshots
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+        position = bisect.bisect_right(self._firsts, index) - 1
+        return position, index - self._firsts[position]
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        position, offset = self._locate(index)
+        return self._frames(position)[offset]
+
+    def iter_range(self, start: int, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """依次产生第 start 到 stop-1 帧的快照"""
+        check_range(start, stop)
+        return self._iter_range(start, len(self) if stop is None else min(stop, len(self)))
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        if start >= stop:
+            return
+        position, offset = self._locate(start)
+        index = start
+        while index < stop:
+            frames = self._frames(position)
+            for snapshot in frames[offset : offset + stop - index]:
+                yield snapshot
+            index += len(frames) - offset
+            position, offset = position + 1, 0
+
+    def load(self) -> Dict[str, Any]:
+        """读取整个记录为 {"metadata", "history"}"""
+        return {"metadata": self.metadata, "history": list(self.iter_range(0))}
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Columnar Recordings
+列式记录 - 把每个tick的电梯/楼层状态写成固定类型的 NumPy 列，供离线分析
+
+记录是一个目录（<名称>.columns/）::
+
+    metadata.json             元数据、电梯数/楼层数、列的类型和编码表
+    tick.npy                  (N,)    int32
+    elevator_floor.npy        (N, E)  int16   当前楼层
+    elevator_target.npy       (N, E)  int16   目标楼层
+    elevator_direction.npy    (N, E)  int8    DIRECTION_CODES
+    elevator_status.npy       (N, E)  int8    STATUS_NAMES 中的下标
+    elevator_load.npy         (N, E)  int16   载客数
+    floor_up_waiting.npy      (N, F)  int32
+    floor_down_waiting.npy    (N, F)  int32
+    metric_<名称>.npy          (N,)    float64 METRIC_NAMES
+    events.npy                (M,)    EVENT_DTYPE 事件表，frame 为所在快照的下标
+
+写入时每列追加到 .bin 原始文件，结束时加上 .npy 头；运行中断时读取器直接映射 .bin 文件。
+load_columns 以只读内存映射打开所有列，百万tick的记录也几乎不占内存。
+"""
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from elevator.core.models import Direction, ElevatorStatus, EventType
+
+COLUMNAR_SUFFIX = ".columns"
+FLUSH_TICKS = 1024  # 每列缓存的行数，达到后追加写出
+
+DIRECTION_CODES: Dict[str, int] = {Direction.UP.value: 1, Direction.DOWN.value: -1, Direction.STOPPED.value: 0}
+STATUS_NAMES: List[str] = [status.value for status in ElevatorStatus]
+EVENT_NAMES: List[str] = [event_type.value for event_type in EventType]
+METRIC_NAMES: List[str] = [
+    "completed_passengers",
+    "total_passengers",
+    "average_wait_time",
+    "p95_wait_time",
+    "average_system_time",
+    "p95_system_time",
+]
+
+EVENT_DTYPE = np.dtype(
+    [
+        ("frame", np.int32),
+        ("type", np.int8),
+        ("elevator", np.int16),
+        ("floor", np.int16),
+        ("passenger", np.int32),
+        ("destination", np.int16),
+        ("direction", np.int8),
+    ]
+)
+
+# 列名 -> (类型, 宽度："elevators"/"floors"/None)
+COLUMNS: Dict[str, Tuple[str, Optional[str]]] = {
+    "tick": ("<i4", None),
+    "elevator_floor": ("<i2", "elevators"),
+    "elevator_target": ("<i2", "elevators"),
+    "elevator_direction": ("<i1", "elevators"),
+    "elevator_status": ("<i1", "elevators"),
+    "elevator_load": ("<i2", "elevators"),
+    "floor_up_waiting": ("<i4", "floors"),
+    "floor_down_waiting": ("<i4", "floors"),
+    **{f"metric_{name}": ("<f8", None) for name in METRIC_NAMES},
+}
+
+_STATUS_CODES = {name: index for index, name in enumerate(STATUS_NAMES)}
+_EVENT_CODES = {name: index for index, name in enumerate(EVENT_NAMES)}
+
+
+def _fit(values: List[int], width: int) -> List[int]:
+    """电梯/楼层数与第一帧不同时截断或用 -1 补齐"""
+    return values[:width] + [-1] * (width - len(values))
+
+
+def _info(metadata: Dict[str, Any], complete: bool, ticks: int, widths: Dict[str, int]) -> Dict[str, Any]:
+    """metadata.json 的内容"""
+    return {
+        "metadata": metadata,
+        "complete": complete,
+        "ticks": ticks,
+        "elevators": widths.get("elevators", 0),
+        "floors": widths.get("floors", 0),
+        "columns": {name: dtype for name, (dtype, _) in COLUMNS.items()},
+        "direction_codes": DIRECTION_CODES,
+        "status_names": STATUS_NAMES,
+        "event_names": EVENT_NAMES,
+    }
+
+
+class ColumnBuilder:
+    """把快照拆成各列的行，take() 取出已缓存的行（列式写入器和内存中的转换共用）"""
+
+    def __init__(self) -> None:
+        self.ticks = 0
+        self.widths: Dict[str, int] = {}
+        self._rows: Dict[str, List[Any]] = {name: [] for name in COLUMNS}
+        self._events: List[Tuple[int, ...]] = []
+
+    @property
+    def pending(self) -> int:
+        """尚未取出的行数"""
+        return len(self._rows["tick"])
+
+    def add(self, snapshot: Dict[str, Any]) -> None:
+        elevators = snapshot.get("elevators", [])
+        floors = snapshot.get("floors", [])
+        if not self.widths:
+            self.widths = {"elevators": len(elevators), "floors": len(floors)}
+        num_elevators, num_floors = self.widths["elevators"], self.widths["floors"]
+        rows = self._rows
+        rows["tick"].append(snapshot["tick"])
+        rows["elevator_floor"].append(_fit([e["current_floor"] for e in elevators], num_elevators))
+        rows["elevator_target"].append(_fit([e["target_floor"] for e in elevators], num_elevators))
+        rows["elevator_direction"].append(
+            _fit([DIRECTION_CODES.get(e["direction"], 0) for e in elevators], num_elevators)
+        )
+        rows["elevator_status"].append(_fit([_STATUS_CODES.get(e["status"], -1) for e in elevators], num_elevators))
+        rows["elevator_load"].append(_fit([e["load"] for e in elevators], num_elevators))
+        rows["floor_up_waiting"].append(_fit([f["up_waiting"] for f in floors], num_floors))
+        rows["floor_down_waiting"].append(_fit([f["down_waiting"] for f in floors], num_floors))
+        metrics = snapshot.get("metrics", {})
+        for name in METRIC_NAMES:
+            value = metrics.get(name)
+            rows[f"metric_{name}"].append(np.nan if value is None else value)
+        for event in snapshot.get("events", []):
+            data = event.get("data", {})
+            self._events.append(
+                (
+                    self.ticks,
+                    _EVENT_CODES.get(event.get("type"), -1),
+                    data.get("elevator", -1),
+                    data.get("floor", -1),
+                    data.get("passenger", -1),
+                    data.get("destination", -1),
+                    DIRECTION_CODES.get(data.get("direction"), 0),
+                )
+            )
+        self.ticks += 1
+
+    def take(self) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """取出缓存的行：(列名 -> 数组, 事件表)"""
+        columns = {}
+        for name, (dtype, width) in COLUMNS.items():
+            rows = self._rows[name]
+            size = self.widths.get(width or "", 0)
+            shape: Tuple[int, ...] = (len(rows),) if width is None else (len(rows), size)
+            columns[name] = np.asarray(rows, dtype=dtype).reshape(shape)
+            rows.clear()
+        events = np.array(self._events, dtype=EVENT_DTYPE)
+        self._events.clear()
+        return columns, events
+
+
+class ColumnarRecordingWriter:
+    """列式记录写入器，接口与 JsonlRecordingWriter 相同（path 为记录目录）"""
+
+    def __init__(self, path: Union[str, Path], metadata: Dict[str, Any]):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.metadata = metadata
+        self._builder = ColumnBuilder()
+        self._files = {name: open(self.path / f"{name}.bin", "wb") for name in [*COLUMNS, "events"]}
+        self._closed = False
+
+    @property
+    def ticks(self) -> int:
+        return self._builder.ticks
+
+    @property
+    def widths(self) -> Dict[str, int]:
+        return self._builder.widths
+
+    def _write_metadata(self, metadata: Dict[str, Any], complete: bool) -> None:
+        with open(self.path / "metadata.json", "w", encoding="utf-8") as f:
+            json.dump(_info(metadata, complete, self.ticks, self.widths), f, ensure_ascii=False, indent=2)
+
+    def write_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        first = not self.widths
+        self._builder.add(snapshot)
+        if first:
+            self._write_metadata(self.metadata, complete=False)
+        if self._builder.pending >= FLUSH_TICKS:
+            self._flush()
+
+    def _flush(self) -> None:
+        columns, events = self._builder.take()
+        for name, column in columns.items():
+            self._files[name].write(column.tobytes())
+        self._files["events"].write(events.tobytes())
+        for file in self._files.values():
+            file.flush()
+
+    def close(self, metadata: Dict[str, Any]) -> Path:
+        """写出剩余的行，把 .bin 转成 .npy 并写入最终元数据"""
+        if self._closed:
+            return self.path
+        self._flush()
+        for file in self._files.values():
+            file.close()
+        for name, (dtype, width) in COLUMNS.items():
+            shape = (self.ticks,) if width is None else (self.ticks, self.widths.get(width, 0))
+            self._finish_column(name, np.dtype(dtype), shape)
+        events = (self.path / "events.bin").stat().st_size // EVENT_DTYPE.itemsize
+        self._finish_column("events", EVENT_DTYPE, (events,))
+        self._write_metadata(metadata, complete=True)
+        self._closed = True
+        return self.path
+
+    def _finish_column(self, name: str, dtype: np.dtype, shape: Tuple[int, ...]) -> None:
+        raw = self.path / f"{name}.bin"
+        with open(self.path / f"{name}.npy", "wb") as out, open(raw, "rb") as data:
+            header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape}
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(data, out)
+        raw.unlink()
+
+
+class ColumnarRecording:
+    """
+    以内存映射打开的列式记录
+
+    用法::
+
+        rec = load_columns(path)
+        moving = rec["elevator_status"] != rec.status_code("stopped")
+        boarded = rec.events[rec.events["type"] == rec.event_code("passenger_board")]
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]],
+        info: Optional[Dict[str, Any]] = None,
+        columns: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        """
+        Args:
+            path: 记录目录
+            info/columns: 直接使用内存中的列（path 为 None 时，见 from_snapshots）
+        """
+        self.path = Path(path) if path is not None else None
+        if info is None:
+            assert self.path is not None, "path or info is required"
+            with open(self.path / "metadata.json", "r", encoding="utf-8") as f:
+                info = json.load(f)
+        self.info = info
+        self.complete = bool(info.get("complete"))
+        self.metadata: Dict[str, Any] = info.get("metadata", {})
+        self.num_elevators = int(info.get("elevators", 0))
+        self.num_floors = int(info.get("floors", 0))
+        self._columns: Dict[str, np.ndarray] = dict(columns or {})
+        if not self.complete:
+            self.metadata = {**self.metadata, "total_ticks": len(self), "incomplete": True}
+
+    @classmethod
+    def from_snapshots(cls, snapshots: Iterable[Dict[str, Any]], metadata: Dict[str, Any]) -> "ColumnarRecording":
+        """在内存中把快照转成列（用于没有列式文件的记录）"""
+        builder = ColumnBuilder()
+        for snapshot in snapshots:
+            builder.add(snapshot)
+        columns, events = builder.take()
+        return cls(None, _info(metadata, True, builder.ticks, builder.widths), {**columns, "events": events})
+
+    def _open(self, name: str, dtype: np.dtype, width: int) -> np.ndarray:
+        assert self.path is not None
+        npy = self.path / f"{name}.npy"
+        if npy.exists():
+            return np.load(npy, mmap_mode="r")
+        # 运行中断：直接映射原始数据，只取完整的行
+        raw = self.path / f"{name}.bin"
+        row_size = dtype.itemsize * max(width, 1)
+        rows = raw.stat().st_size // row_size if raw.exists() else 0
+        shape: Tuple[int, ...] = (rows,) if width == 0 else (rows, width)
+        if rows == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(raw, dtype=dtype, mode="r", shape=shape)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """按列名取只读内存映射数组"""
+        column = self._columns.get(name)
+        if column is None:
+            dtype, width = COLUMNS[name]
+            size = {"elevators": self.num_elevators, "floors": self.num_floors}.get(width or "", 0)
+            column = self._columns[name] = self._open(name, np.dtype(dtype), size)
+        return column
+
+    def __len__(self) -> int:
+        return int(len(self["tick"]))
+
+    @property
+    def events(self) -> np.ndarray:
+        events = self._columns.get("events")
+        if events is None:
+            events = self._columns["events"] = self._open("events", EVENT_DTYPE, 0)
+        return events
+
+    def metric(self, name: str) -> np.ndarray:
+        return self[f"metric_{name}"]
+
+    @staticmethod
+    def status_code(status: str) -> int:
+        return _STATUS_CODES[status]
+
+    @staticmethod
+    def event_code(event_type: str) -> int:
+        return _EVENT_CODES[event_type]
+
+    def close(self) -> None:
+        """释放内存映射"""
+        self._columns.clear()
+
+
+def load_columns(path: Union[str, Path]) -> ColumnarRecording:
+    """以只读内存映射打开列式记录"""
+    return ColumnarRecording(path)
+
+
+def convert_recording(
+    snapshots: Iterable[Dict[str, Any]], path: Union[str, Path], metadata: Dict[str, Any]
+) -> ColumnarRecording:
+    """把已有记录的快照（如 load_recording(...)["history"]）转成列式记录"""
+    writer = ColumnarRecordingWriter(path, metadata)
+    for snapshot in snapshots:
+        writer.write_snapshot(snapshot)
+    writer.close({**metadata, "total_ticks": writer.ticks})
+    return ColumnarRecording(path)
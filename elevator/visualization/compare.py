@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Recording Comparison
+记录对比 - 把同一流量上的两次运行（如两个版本的 LookV2Controller）按tick对齐，向量化计算逐tick的差异
+
+在仓库根目录运行::
+
+    python -m elevator.client.replay base.json controller:LookV2Controller
+    python -m elevator.visualization.compare base.json candidate.json --top 5
+
+逐tick的差异（candidate - base）:
+
+- position: 各电梯所在楼层之差的绝对值之和
+- queue: 等待人数之差（正数表示 candidate 积压更多）
+- queue_divergence: 各楼层上下行等待人数之差的绝对值之和
+- metric_<名称>: 累计指标之差（见 columnar.METRIC_NAMES）
+
+回退窗口是 queue > 0 的连续tick区间，按多出的等待人次（queue 在区间内之和）排序。
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from elevator.visualization.analytics import load_any, round_ids
+from elevator.visualization.columnar import METRIC_NAMES, ColumnarRecording
+
+DEFAULT_TOP = 5
+
+
+def align(base: ColumnarRecording, candidate: ColumnarRecording) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按 (轮次, tick) 对齐两个记录
+
+    Returns:
+        (base 中的帧下标, candidate 中的帧下标)，按对齐后的顺序排列
+    """
+    keys = [(round_ids(rec) << 32) | np.asarray(rec["tick"], dtype=np.int64) for rec in (base, candidate)]
+    _, base_index, candidate_index = np.intersect1d(keys[0], keys[1], return_indices=True)
+    return base_index, candidate_index
+
+
+def _rows(column: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """按下标取行；下标恰好是全部行时直接使用原数组（常见情况，省去复制）"""
+    if len(index) == len(column) and (not len(index) or (index[0] == 0 and index[-1] == len(index) - 1)):
+        return column
+    return column[index]
+
+
+def divergence(base: ColumnarRecording, candidate: ColumnarRecording) -> Dict[str, np.ndarray]:
+    """
+    逐tick的差异序列
+
+    Returns:
+        {"round", "tick", "position", "queue", "queue_divergence", "metric_<名称>"...}，长度为对齐的tick数
+    """
+    if base.num_elevators != candidate.num_elevators or base.num_floors != candidate.num_floors:
+        raise ValueError(
+            f"buildings differ: {base.num_elevators}x{base.num_floors} vs "
+            f"{candidate.num_elevators}x{candidate.num_floors}"
+        )
+    base_index, candidate_index = align(base, candidate)
+
+    def pair(name: str) -> Tuple[np.ndarray, np.ndarray]:
+        return _rows(base[name], base_index), _rows(candidate[name], candidate_index)
+
+    floor_a, floor_b = pair("elevator_floor")
+    up_a, up_b = pair("floor_up_waiting")
+    down_a, down_b = pair("floor_down_waiting")
+    up = np.subtract(up_b, up_a, dtype=np.int64)
+    down = np.subtract(down_b, down_a, dtype=np.int64)
+
+    result = {
+        "round": round_ids(base)[base_index],
+        "tick": np.asarray(base["tick"], dtype=np.int64)[base_index],
+        "position": np.abs(np.subtract(floor_b, floor_a, dtype=np.int32)).sum(axis=1, dtype=np.int64),
+        "queue": up.sum(axis=1) + down.sum(axis=1),
+        "queue_divergence": np.abs(up).sum(axis=1) + np.abs(down).sum(axis=1),
+    }
+    for name in METRIC_NAMES:
+        metric_a, metric_b = pair(f"metric_{name}")
+        result[f"metric_{name}"] = np.subtract(metric_b, metric_a, dtype=np.float64)
+    return result
+
+
+def first_divergence(series: Dict[str, np.ndarray]) -> Optional[Dict[str, Any]]:
+    """两次运行第一次出现差异的tick以及在哪些方面不同，完全一致时返回 None"""
+    differs = {
+        name: (values != 0) & ~np.isnan(values) if values.dtype.kind == "f" else values != 0
+        for name, values in series.items()
+        if name not in ("round", "tick")
+    }
+    combined = np.logical_or.reduce(list(differs.values())) if differs else np.zeros(0, dtype=bool)
+    if not combined.any():
+        return None
+    index = int(np.argmax(combined))
+    return {
+        "round": int(series["round"][index]),
+        "tick": int(series["tick"][index]),
+        "fields": [name for name, mask in differs.items() if mask[index]],
+    }
+
+
+def worst_windows(series: Dict[str, np.ndarray], top: int = DEFAULT_TOP, sign: int = 1) -> List[Dict[str, Any]]:
+    """
+    candidate 积压更多（sign=-1 时更少）的连续tick区间，按多出的等待人次从大到小
+
+    Returns:
+        [{"round", "start_tick", "end_tick", "ticks", "excess_waiting", "peak"}, ...]
+    """
+    score = series["queue"] * sign
+    worse = score > 0
+    if not worse.any():
+        return []
+    rounds = series["round"]
+    new_round = np.concatenate(([True], rounds[1:] != rounds[:-1]))
+    round_ends = np.concatenate((new_round[1:], [True]))
+    starts = np.flatnonzero(worse & (new_round | ~np.concatenate(([False], worse[:-1]))))
+    stops = np.flatnonzero(worse & (round_ends | ~np.concatenate((worse[1:], [False])))) + 1
+
+    cumulative = np.concatenate(([0], np.cumsum(score)))
+    excess = cumulative[stops] - cumulative[starts]
+    peaks = np.maximum.reduceat(np.where(worse, score, 0), starts)
+    ticks = series["tick"]
+    return [
+        {
+            "round": int(rounds[starts[i]]),
+            "start_tick": int(ticks[starts[i]]),
+            "end_tick": int(ticks[stops[i] - 1]),
+            "ticks": int(stops[i] - starts[i]),
+            "excess_waiting": int(excess[i]),
+            "peak": int(peaks[i]),
+        }
+        for i in np.argsort(-excess, kind="stable")[:top]
+    ]
+
+
+def compare(base: ColumnarRecording, candidate: ColumnarRecording, top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """对比两个记录（可JSON序列化的报告）"""
+    series = divergence(base, candidate)
+    aligned = len(series["tick"])
+    final = {}
+    for name in METRIC_NAMES:
+        values = [rec.metric(name) for rec in (base, candidate)]
+        if all(len(v) for v in values):
+            a, b = float(values[0][-1]), float(values[1][-1])
+            if np.isnan(a) or np.isnan(b):
+                continue
+            final[name] = {"base": a, "candidate": b, "delta": b - a}
+    return {
+        "ticks": aligned,
+        "only_in_base": len(base) - aligned,
+        "only_in_candidate": len(candidate) - aligned,
+        "first_divergence": first_divergence(series),
+        "max_position_divergence": int(series["position"].max()) if aligned else 0,
+        "excess_waiting": int(series["queue"].sum()),
+        "final": final,
+        "regressions": worst_windows(series, top),
+        "improvements": worst_windows(series, top, sign=-1),
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    first = report["first_divergence"]
+    print(
+        f"aligned ticks: {report['ticks']} (only in base {report['only_in_base']}, "
+        f"only in candidate {report['only_in_candidate']})"
+    )
+    if first is None:
+        print("runs are identical")
+        return
+    print(f"first divergence: round {first['round']} tick {first['tick']} ({', '.join(first['fields'])})")
+    print(f"excess waiting (passenger-ticks): {report['excess_waiting']:+d}")
+    for name, values in report["final"].items():
+        print(f"  {name:<24} {values['base']:>10.3f} -> {values['candidate']:>10.3f} ({values['delta']:+.3f})")
+    for title in ("regressions", "improvements"):
+        print(f"{title}:")
+        for w in report[title]:
+            print(
+                f"  round {w['round']} ticks {w['start_tick']}-{w['end_tick']} ({w['ticks']} ticks) "
+                f"excess {w['excess_waiting']} peak {w['peak']}"
+            )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two recordings of the same traffic tick by tick")
+    parser.add_argument("base", type=Path, help="基准记录")
+    parser.add_argument("candidate", type=Path, help="对比记录")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="报告的回退/改进窗口数")
+    parser.add_argument("--output", type=Path, help="把报告写为JSON")
+    args = parser.parse_args(argv)
+
+    report = compare(load_any(args.base), load_any(args.candidate), args.top)
+    _print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
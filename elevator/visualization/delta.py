@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Delta Recordings
+增量记录 - 每 K 个tick写一个完整关键帧，其余tick只写相对上一tick变化的电梯/楼层字段、指标和事件
+
+增量帧格式::
+
+    {"type": "delta", "tick": 12, "timestamp": "...", "events": [...],
+     "elevators": [[下标, {变化的字段}], ...], "floors": [[下标, {变化的字段}], ...], "metrics": {变化的指标}}
+
+没有变化的部分省略。DeltaRecordingReader 建立每个tick在文件中的偏移，
+读取任意tick时定位到之前最近的关键帧，再依次应用之后的增量。
+"""
+import bisect
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+DEFAULT_KEYFRAME_INTERVAL = 50
+
+_ENTITY_LISTS = ("elevators", "floors")
+_KEYFRAME_PREFIX = b'{"type":"keyframe"'
+_DELTA_PREFIX = b'{"type":"delta"'
+_TICK_PREFIX = b'{"type":"tick"'
+
+
+def check_range(start: int, stop: Optional[int]) -> None:
+    """校验帧范围 [start, stop)：start 不能为负，stop 不能小于 start"""
+    if start < 0 or (stop is not None and stop < start):
+        raise ValueError(f"Invalid frame range: start={start}, stop={stop}")
+
+
+def _diff_fields(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in current.items() if previous.get(key) != value}
+
+
+def diff_snapshot(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    current 相对 previous 的增量
+
+    Returns:
+        增量帧内容；电梯或楼层数量变化（无法增量表示）时返回 None
+    """
+    delta: Dict[str, Any] = {
+        "tick": current["tick"],
+        "timestamp": current.get("timestamp"),
+        "events": current.get("events", []),
+    }
+    for name in _ENTITY_LISTS:
+        before, after = previous.get(name, []), current.get(name, [])
+        if len(before) != len(after):
+            return None
+        changes = [
+            [index, fields] for index, (old, new) in enumerate(zip(before, after)) if (fields := _diff_fields(old, new))
+        ]
+        if changes:
+            delta[name] = changes
+    metrics = _diff_fields(previous.get("metrics", {}), current.get("metrics", {}))
+    if metrics:
+        delta["metrics"] = metrics
+    return delta
+
+
+def apply_delta(previous: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """在 previous 上应用增量得到新快照（不修改 previous）"""
+    snapshot = {
+        "tick": delta["tick"],
+        "timestamp": delta.get("timestamp"),
+        "elevators": list(previous.get("elevators", [])),
+        "floors": list(previous.get("floors", [])),
+        "metrics": {**previous.get("metrics", {}), **delta.get("metrics", {})},
+        "events": delta.get("events", []),
+    }
+    for name in _ENTITY_LISTS:
+        entries = snapshot[name]
+        for index, fields in delta.get(name, []):
+            entries[index] = {**entries[index], **fields}
+    return snapshot
+
+
+class DeltaRecordingReader:
+    """
+    可定位的流式记录读取器（.jsonl，增量或完整帧）
+
+    打开时扫描一遍文件，只记录每帧的字节偏移和关键帧位置，不解析快照内容。
+
+    用法::
+
+        reader = DeltaRecordingReader(path)
+        snapshot = reader[1234]          # 第1234个记录的tick
+        for snapshot in reader.iter_range(100, 200): ...
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.header: Dict[str, Any] = {}
+        self.trailer: Optional[Dict[str, Any]] = None
+        self._offsets: List[int] = []  # 第 i 帧在文件中的偏移
+        self._keyframes: List[int] = []  # 关键帧的帧序号（升序）
+        self._scan()
+
+    def _scan(self) -> None:
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 中断时写了一半的最后一行
+                if line.startswith(_DELTA_PREFIX):
+                    self._offsets.append(offset)
+                elif line.startswith(_KEYFRAME_PREFIX) or line.startswith(_TICK_PREFIX):
+                    self._keyframes.append(len(self._offsets))
+                    self._offsets.append(offset)
+                elif line.strip():
+                    record = json.loads(line)
+                    if record.get("type") == "header":
+                        self.header = record
+                    elif record.get("type") == "trailer":
+                        self.trailer = record
+                offset += len(line)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        metadata: Dict[str, Any] = dict(self.header.get("metadata", {}))
+        if self.trailer is not None:
+            metadata.update(self.trailer.get("metadata", {}))
+        else:
+            metadata.update(total_ticks=len(self), incomplete=True)
+        return metadata
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return next(self.iter_range(index, index + 1))
+
+    def iter_range(self, start: int, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """依次产生第 start 到 stop-1 帧的完整快照，从 start 之前最近的关键帧开始解码"""
+        check_range(start, stop)
+        return self._iter_range(start, len(self) if stop is None else min(stop, len(self)))
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        if start >= stop:
+            return
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, start) - 1]
+        with open(self.path, "rb") as f:
+            f.seek(self._offsets[keyframe])
+            snapshot: Dict[str, Any] = {}
+            for index in range(keyframe, stop):
+                record = json.loads(f.readline())
+                kind = record.pop("type")
+                snapshot = apply_delta(snapshot, record) if kind == "delta" else record
+                if index >= start:
+                    yield snapshot
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Level of Detail
+多分辨率记录 - 在完整记录之外，为每 10 / 100 个tick生成一条聚合快照，长时间运行的记录在浏览器中先看概览，
+放大到某段时间时再读取逐tick的完整数据
+
+分级文件放在记录旁边（<记录文件名>.lod10、<记录文件名>.lod100），格式与 .jsonl 流式记录相同。
+聚合快照的电梯/楼层状态取窗口最后一个tick，并附加窗口内的统计：
+
+- 电梯: load_mean、load_max、moving_ticks（非停止状态的tick数）、floor_min、floor_max
+- 楼层: up_waiting_max、down_waiting_max、waiting_mean（上下行等待人数之和的均值）
+- 事件: 不保留事件列表，只保留 event_counts（类型 -> 次数）
+- frames: [窗口第一帧的下标, 帧数]，tick_start 为窗口第一个tick
+"""
+import math
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from elevator.visualization.delta import DeltaRecordingReader, check_range
+from elevator.visualization.recording_io import JsonlRecordingWriter, load_recording, read_ticks
+
+LOD_FACTORS = (1, 10, 100)
+DEFAULT_MAX_POINTS = 1000  # 一次返回给播放器的最大帧数
+
+PathLike = Union[str, Path]
+
+
+def lod_path(path: PathLike, factor: int) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.name}.lod{factor}")
+
+
+class LodAggregator:
+    """把连续 factor 个快照聚合为一条"""
+
+    def __init__(self, factor: int):
+        self.factor = factor
+        self.frames = 0  # 已加入的帧数
+        self._window: List[Dict[str, Any]] = []
+
+    def add(self, snapshot: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """加入一帧，窗口满时返回聚合快照"""
+        self._window.append(snapshot)
+        self.frames += 1
+        if len(self._window) >= self.factor:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """聚合并清空当前窗口（运行结束时处理不满的最后一个窗口）"""
+        window, self._window = self._window, []
+        if not window:
+            return None
+        last = window[-1]
+        count = len(window)
+
+        elevators = []
+        for index, elevator in enumerate(last.get("elevators", [])):
+            history = [s["elevators"][index] for s in window if index < len(s.get("elevators", []))]
+            loads = [e.get("load", 0) for e in history]
+            floors = [e.get("current_floor", 0) for e in history]
+            elevators.append(
+                {
+                    **elevator,
+                    "load_mean": sum(loads) / len(loads),
+                    "load_max": max(loads),
+                    "moving_ticks": sum(1 for e in history if e.get("status") != "stopped"),
+                    "floor_min": min(floors),
+                    "floor_max": max(floors),
+                }
+            )
+
+        floors = []
+        for index, floor in enumerate(last.get("floors", [])):
+            history = [s["floors"][index] for s in window if index < len(s.get("floors", []))]
+            floors.append(
+                {
+                    **floor,
+                    "up_waiting_max": max(f.get("up_waiting", 0) for f in history),
+                    "down_waiting_max": max(f.get("down_waiting", 0) for f in history),
+                    "waiting_mean": sum(f.get("up_waiting", 0) + f.get("down_waiting", 0) for f in history)
+                    / len(history),
+                }
+            )
+
+        event_counts: Dict[str, int] = {}
+        for snapshot in window:
+            for event in snapshot.get("events", []):
+                event_counts[event["type"]] = event_counts.get(event["type"], 0) + 1
+
+        return {
+            "tick": last["tick"],
+            "tick_start": window[0]["tick"],
+            "frames": [self.frames - count, count],
+            "timestamp": last.get("timestamp"),
+            "elevators": elevators,
+            "floors": floors,
+            "metrics": last.get("metrics", {}),
+            "events": [],
+            "event_counts": event_counts,
+        }
+
+
+class LodWriter:
+    """边记录边写出各分级文件"""
+
+    def __init__(self, path: PathLike, metadata: Dict[str, Any], factors: Sequence[int] = LOD_FACTORS[1:]):
+        """
+        Args:
+            path: 完整记录的路径，分级文件写在它旁边
+            metadata: 写入分级文件 header 的元数据
+            factors: 分级的聚合tick数
+        """
+        self.path = Path(path)
+        self._tiers = [
+            (LodAggregator(factor), JsonlRecordingWriter(lod_path(self.path, factor), {**metadata, "lod": factor}))
+            for factor in factors
+            if factor > 1
+        ]
+
+    def write_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        for aggregator, writer in self._tiers:
+            aggregated = aggregator.add(snapshot)
+            if aggregated is not None:
+                writer.write_snapshot(aggregated)
+
+    def close(self, metadata: Dict[str, Any]) -> List[Path]:
+        paths = []
+        for aggregator, writer in self._tiers:
+            aggregated = aggregator.flush()
+            if aggregated is not None:
+                writer.write_snapshot(aggregated)
+            paths.append(
+                writer.close(
+                    {
+                        **metadata,
+                        "lod": aggregator.factor,
+                        "total_ticks": writer.ticks,
+                        "total_frames": aggregator.frames,
+                    }
+                )
+            )
+        return paths
+
+
+def build_lod(
+    path: PathLike,
+    factors: Sequence[int] = LOD_FACTORS[1:],
+    snapshots: Optional[Iterable[Dict[str, Any]]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> List[Path]:
+    """
+    为已有记录生成分级文件
+
+    Args:
+        path: 记录路径
+        snapshots/metadata: 记录内容，不提供时从 path 读取
+    """
+    if snapshots is None or metadata is None:
+        recording = load_recording(path)
+        snapshots, metadata = recording.get("history", []), recording.get("metadata", {})
+    writer = LodWriter(path, metadata, factors)
+    for snapshot in snapshots:
+        writer.write_snapshot(snapshot)
+    return writer.close(metadata)
+
+
+def choose_factor(frames: int, max_points: int = DEFAULT_MAX_POINTS) -> int:
+    """帧数不超过 max_points 的最精细分级"""
+    for factor in LOD_FACTORS:
+        if math.ceil(frames / factor) <= max_points:
+            return factor
+    return LOD_FACTORS[-1]
+
+
+def read_lod_window(
+    path: PathLike, start: int = 0, stop: Optional[int] = None, max_points: int = DEFAULT_MAX_POINTS
+) -> Dict[str, Any]:
+    """
+    读取记录第 start 到 stop-1 帧，按窗口长度自动选择分级
+
+    分级文件不存在或比记录旧时先生成。
+
+    Returns:
+        {"factor", "total", "start", "stop", "history"}，total 和下标都以完整记录的帧计
+
+    Raises:
+        ValueError: start 为负或 stop 小于 start
+    """
+    check_range(start, stop)
+    path = Path(path)
+    if stop is None:
+        stop = read_ticks(path, 0, 0)["total"]
+    factor = choose_factor(max(0, stop - start), max_points)
+    if factor == 1:
+        window = read_ticks(path, start, stop)
+        return {"factor": 1, "total": window["total"], "start": start, "stop": stop, "history": window["history"]}
+
+    tier = lod_path(path, factor)
+    if not tier.exists() or tier.stat().st_mtime < path.stat().st_mtime:
+        build_lod(path)
+    reader = DeltaRecordingReader(tier)
+    total = int(reader.metadata.get("total_frames") or _total_frames(reader))
+    history = list(reader.iter_range(start // factor, math.ceil(stop / factor)))
+    return {"factor": factor, "total": total, "start": start, "stop": stop, "history": history}
+
+
+def _total_frames(reader: DeltaRecordingReader) -> int:
+    """分级文件覆盖的完整记录帧数（最后一条聚合快照的帧范围）"""
+    if not len(reader):
+        return 0
+    first, count = reader[-1]["frames"]
+    return int(first + count)
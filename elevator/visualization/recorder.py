@@ -1,30 +1,109 @@
 #!/usr/bin/env python3
 """
 运行记录器 - 自动记录电梯调度过程
+
+记录格式（构造参数 format 或环境变量 ELEVATOR_RECORDING_FORMAT）：
+- json: 运行结束时一次写出整个记录（默认）
+- jsonl: 流式记录，每个tick产生时立即追加写出，不在内存中保留历史
+- delta: 增量编码的流式记录（.jsonl），每 keyframe_interval 个tick一个完整关键帧，其余只写变化的字段
+- chunked: 分块压缩记录（.recz），每 chunk_ticks 个tick压缩一块，文件末尾带块索引
+- columnar: 列式记录（.columns 目录），每个状态字段一个 .npy 列，供离线分析（见 columnar.py）
+
+background=True 时 record_state 只把状态对象放入有界队列，快照的构造和写出由后台写入线程完成；
+队列满时按 when_full 阻塞（block）或丢弃该tick（drop）。状态对象每个tick由API客户端重新解码，
+控制器不会修改，因此可以直接传引用。
+
+lod_factors 非空时同时写出多分辨率分级文件（见 lod.py）；默认不写，播放器请求缩放视图时由服务器按需生成。
+
+配置了记录存储（构造参数 store，或设置了 ELEVATOR_RECORDING_QUOTA_MB / ELEVATOR_RECORDING_KEEP_FULL）时，
+保存后把记录加入存储（见 recording_store.py）：存储写入的旧记录被压缩，超过配额时删除其中最旧的记录。
+默认不使用存储，不会改动目录中的其他记录。
 """
 import json
+import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from elevator.core.models import EventType, SimulationState, SimulationEvent
+from elevator.utils.log import get_logger
+from elevator.visualization.chunked import CHUNKED_SUFFIX, DEFAULT_CHUNK_TICKS, ChunkedRecordingWriter
+from elevator.visualization.columnar import COLUMNAR_SUFFIX, ColumnarRecordingWriter
+from elevator.visualization.delta import DEFAULT_KEYFRAME_INTERVAL
+from elevator.visualization.lod import LodWriter, build_lod
+from elevator.visualization.recording_index import write_sidecar
+from elevator.visualization.recording_io import JSON_SUFFIX, JSONL_SUFFIX, JsonlRecordingWriter
+from elevator.visualization.recording_store import RecordingStore, store_from_environment
+
+RECORDING_FORMATS = ("json", "jsonl", "delta", "chunked", "columnar")
+STREAMING_FORMATS = ("jsonl", "delta", "chunked", "columnar")
+_SUFFIXES = {
+    "json": JSON_SUFFIX,
+    "jsonl": JSONL_SUFFIX,
+    "delta": JSONL_SUFFIX,
+    "chunked": CHUNKED_SUFFIX,
+    "columnar": COLUMNAR_SUFFIX,
+}
 
-from elevator.core.models import SimulationState, SimulationEvent
+RecordingWriter = Union[JsonlRecordingWriter, ChunkedRecordingWriter, ColumnarRecordingWriter]
+
+DEFAULT_QUEUE_SIZE = 1024  # 后台写入队列的容量（tick）
+WHEN_FULL_POLICIES = ("block", "drop")
+_STOP: Any = object()  # 写入线程的结束标记
+
+log = get_logger("recordings")
 
 
 class SimulationRecorder:
     """模拟运行记录器 - 记录所有事件和状态变化"""
 
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(
+        self,
+        output_dir: Optional[Path] = None,
+        format: Optional[str] = None,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+        chunk_ticks: int = DEFAULT_CHUNK_TICKS,
+        background: bool = False,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        when_full: str = "block",
+        lod_factors: Sequence[int] = (),
+        store: Optional[RecordingStore] = None,
+    ):
         """
         初始化记录器
 
         Args:
             output_dir: 输出目录，默认为visualization/recordings
+            format: 记录格式 json/jsonl/delta/chunked/columnar，
+                默认读取环境变量 ELEVATOR_RECORDING_FORMAT，未设置时为 json
+            keyframe_interval: delta 格式的关键帧间隔（tick）
+            chunk_ticks: chunked 格式每块的tick数
+            background: 是否由后台线程构造和写出快照
+            queue_size: 后台写入队列的容量
+            when_full: 队列满时的策略，block 等待写入线程，drop 丢弃该tick（计入 dropped_ticks）
+            lod_factors: 多分辨率分级的聚合tick数，如 (10, 100)；为空时不生成分级文件
+            store: 保存后维护的记录存储；默认只在设置了配额或保留个数环境变量时使用输出目录的存储
         """
+        if when_full not in WHEN_FULL_POLICIES:
+            raise ValueError(f"Unknown queue policy: {when_full}")
+        if format is None:
+            format = os.environ.get("ELEVATOR_RECORDING_FORMAT", "json")
+        format = format.lower()
+        if format not in RECORDING_FORMATS:
+            raise ValueError(f"Unknown recording format: {format}")
+        self.format = format
+        self.keyframe_interval = keyframe_interval
+        self.chunk_ticks = chunk_ticks
+
         if output_dir is None:
             output_dir = Path(__file__).parent / "recordings"
 
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.store = store if store is not None else store_from_environment(self.output_dir)
 
         # 记录数据
         self.metadata: Dict[str, Any] = {
@@ -38,6 +117,20 @@ class SimulationRecorder:
 
         self.history: List[Dict[str, Any]] = []
         self.building_config: Dict[str, Any] = {}
+        # 默认保存文件名（None 时按算法名和时间生成）和最近一次保存的路径
+        self.filename: Optional[str] = None
+        self.saved_path: Optional[Path] = None
+        # 流式记录的写入器和分级文件写入器，第一次记录快照时创建
+        self._writer: Optional[RecordingWriter] = None
+        self.lod_factors = tuple(lod_factors)
+        self._lod: Optional[LodWriter] = None
+
+        # 后台写入：队列和写入线程（第一次记录时启动），线程中的异常在 save 时抛出
+        self.when_full = when_full
+        self.dropped_ticks = 0
+        self._queue: Optional["queue.Queue[Any]"] = queue.Queue(maxsize=queue_size) if background else None
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
 
     def set_metadata(
         self,
@@ -62,6 +155,47 @@ class SimulationRecorder:
         """
         if events is None:
             events = []
+        if self._queue is None:
+            self._record(state, events, time.time())
+            return
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, name="recorder", daemon=True)
+            self._thread.start()
+        item = (state, events, time.time())
+        if self.when_full == "drop":
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.dropped_ticks += 1
+        else:
+            self._queue.put(item)
+
+    def _write_loop(self) -> None:
+        """后台写入线程：依次构造并写出队列中的快照"""
+        assert self._queue is not None
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._error is None:
+                try:
+                    self._record(*item)
+                except BaseException as e:  # 在 save 时抛出
+                    self._error = e
+
+    def _drain(self) -> None:
+        """等待后台写入线程处理完队列中的所有快照"""
+        if self._thread is not None and self._queue is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _record(self, state: SimulationState, events: List[SimulationEvent], created: float) -> None:
+        """构造快照并追加到历史或写出"""
 
         # 提取电梯信息
         elevators_data = []
@@ -98,20 +232,29 @@ class SimulationRecorder:
                 }
             )
 
+        if state.elevators and "elevator_capacity" not in self.metadata:
+            self.metadata["elevator_capacity"] = state.elevators[0].max_capacity
+
         # 提取事件信息
         events_data = []
         for event in events:
+            data = event.data
+            if event.type in (EventType.UP_BUTTON_PRESSED, EventType.DOWN_BUTTON_PRESSED):
+                # 补充乘客起点和目的地，使记录可以回放为流量
+                passenger = state.passengers.get(data.get("passenger"))
+                if passenger is not None:
+                    data = {**data, "origin": passenger.origin, "destination": passenger.destination}
             events_data.append(
                 {
                     "type": event.type.value,
-                    "data": event.data,
+                    "data": data,
                 }
             )
 
         # 创建快照
         snapshot = {
             "tick": state.tick,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.fromtimestamp(created).isoformat(),
             "elevators": elevators_data,
             "floors": floors_data,
             "metrics": {
@@ -125,27 +268,72 @@ class SimulationRecorder:
             "events": events_data,
         }
 
-        self.history.append(snapshot)
+        if self.format in STREAMING_FORMATS:
+            self._open_writer().write_snapshot(snapshot)
+            if self._lod is not None:
+                self._lod.write_snapshot(snapshot)
+        else:
+            self.history.append(snapshot)
         # 更新元数据
         self.metadata["completed_passengers"] = state.metrics.completed_passengers
         self.metadata["total_passengers"] = state.metrics.total_passengers
 
+    def _open_writer(self) -> RecordingWriter:
+        """流式记录的写入器，第一次调用时创建文件并写入 header"""
+        if self._writer is None and self.format == "columnar":
+            self._writer = ColumnarRecordingWriter(self.output_dir / self._default_filename(), self.metadata)
+        elif self._writer is None and self.format == "chunked":
+            self._writer = ChunkedRecordingWriter(
+                self.output_dir / self._default_filename(), self.metadata, chunk_ticks=self.chunk_ticks
+            )
+        elif self._writer is None:
+            self._writer = JsonlRecordingWriter(
+                self.output_dir / self._default_filename(),
+                self.metadata,
+                keyframe_interval=self.keyframe_interval if self.format == "delta" else None,
+            )
+        if self._lod is None and self.lod_factors:
+            self._lod = LodWriter(self._writer.path, self.metadata, self.lod_factors)
+        return self._writer
+
+    def _default_filename(self) -> str:
+        """默认文件名：指定的 filename（扩展名按格式替换）或按算法名和时间生成"""
+        suffix = _SUFFIXES[self.format]
+        if self.filename is not None:
+            return str(Path(self.filename).with_suffix(suffix))
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        algorithm_name = self.metadata.get("algorithm", "unknown").replace(" ", "_")
+        return f"{algorithm_name}_{timestamp}{suffix}"
+
     def save(self, filename: Optional[str] = None) -> Path:
         """
         保存记录到JSON文件
 
+        流式记录的快照已经写出，这里只写入最终元数据并关闭文件（filename 被忽略）。
+
         Args:
             filename: 文件名，如不提供则自动生成
 
         Returns:
             保存的文件路径
         """
-        if filename is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            algorithm_name = self.metadata.get("algorithm", "unknown").replace(" ", "_")
-            filename = f"{algorithm_name}_{timestamp}.json"
+        self._drain()
+        if self.dropped_ticks:
+            self.metadata["dropped_ticks"] = self.dropped_ticks
+        if self.format in STREAMING_FORMATS:
+            writer = self._open_writer()
+            metadata = {**self.metadata, "end_time": datetime.now().isoformat(), "total_ticks": writer.ticks}
+            file_path = writer.close(metadata)
+            if self._lod is not None:
+                self._lod.close(metadata)
+            if file_path.is_file():
+                write_sidecar(file_path, metadata)
+            print(f"[OK] Recording saved: {file_path}", flush=True)
+            self.saved_path = file_path
+            self._update_store(file_path)
+            return file_path
 
-        file_path = self.output_dir / filename
+        file_path = self.output_dir / (filename or self._default_filename())
 
         # 添加元数据
         data = {
@@ -160,7 +348,22 @@ class SimulationRecorder:
         # 保存为JSON
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        # 元数据旁注，列出记录时不必解析整个文件
+        write_sidecar(file_path, data["metadata"])
+        if self.lod_factors:
+            build_lod(file_path, self.lod_factors, self.history, data["metadata"])
 
         # 使用 ensure_ascii=True 来避免编码问题
         print(f"[OK] Recording saved: {file_path}", flush=True)
+        self.saved_path = file_path
+        self._update_store(file_path)
         return file_path
+
+    def _update_store(self, file_path: Path) -> None:
+        """压缩旧记录并执行配额（失败时只记录警告，本次记录已经保存）"""
+        if self.store is None:
+            return
+        try:
+            self.store.add(file_path)
+        except Exception as e:
+            log.warning("recording store maintenance failed: %s", e)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Recording Index
+记录列表索引 - 列出记录目录时不再逐个解析记录文件
+
+- 元数据旁注文件：<记录文件名>.meta，保存元数据以及写入时记录文件的大小和修改时间
+- RecordingIndex：按 (修改时间, 大小) 校验的内存缓存，只有新增或修改过的记录才会读取旁注或解析记录本身，
+  解析后补写旁注，服务器重启后也不必重新解析
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from elevator.visualization.recording_io import RECORDING_SUFFIXES, read_metadata
+
+SIDECAR_SUFFIX = ".meta"
+
+PathLike = Union[str, Path]
+
+
+def sidecar_path(path: PathLike) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def _signature(stat: os.stat_result) -> Tuple[int, int]:
+    return stat.st_mtime_ns, stat.st_size
+
+
+def write_sidecar(path: PathLike, metadata: Dict[str, Any]) -> Path:
+    """为记录文件写元数据旁注（记录文件写完之后调用）"""
+    mtime_ns, size = _signature(os.stat(path))
+    sidecar = sidecar_path(path)
+    with open(sidecar, "w", encoding="utf-8") as f:
+        json.dump({"metadata": metadata, "mtime_ns": mtime_ns, "size": size}, f, ensure_ascii=False)
+    return sidecar
+
+
+def read_sidecar(path: PathLike, stat: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
+    """读取旁注中的元数据；旁注不存在、损坏或与记录文件不一致时返回 None"""
+    try:
+        with open(sidecar_path(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stat = stat or os.stat(path)
+    if (data.get("mtime_ns"), data.get("size")) != _signature(stat):
+        return None
+    metadata: Dict[str, Any] = data.get("metadata", {})
+    return metadata
+
+
+class RecordingIndex:
+    """
+    记录目录的元数据缓存
+
+    用法::
+
+        index = RecordingIndex(recordings_dir)
+        recordings = index.list()  # 最新的在前
+    """
+
+    def __init__(self, directory: PathLike):
+        self.directory = Path(directory)
+        self._entries: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}  # 文件名 -> (签名, 元数据)
+        self._lock = threading.Lock()
+        self.parsed = 0  # 解析记录文件的次数（旁注和缓存都未命中）
+
+    def _metadata(self, path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        metadata = read_sidecar(path, stat)
+        if metadata is not None:
+            return metadata
+        metadata = read_metadata(path)
+        self.parsed += 1
+        try:
+            if not metadata.get("incomplete"):
+                # 未完成的记录还会继续写入，不写旁注
+                write_sidecar(path, metadata)
+        except OSError:
+            pass
+        return metadata
+
+    def list(self) -> List[Dict[str, Any]]:
+        """
+        目录中的所有记录，按修改时间倒序
+
+        Returns:
+            [{"filename", "path", "metadata", "mtime"}, ...]
+        """
+        recordings = []
+        seen = set()
+        with self._lock:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.is_file() or Path(entry.name).suffix not in RECORDING_SUFFIXES:
+                        continue
+                    stat = entry.stat()
+                    signature = _signature(stat)
+                    cached = self._entries.get(entry.name)
+                    if cached is None or cached[0] != signature:
+                        cached = self._entries[entry.name] = (signature, self._metadata(Path(entry.path), stat))
+                    seen.add(entry.name)
+                    recordings.append(
+                        {"filename": entry.name, "path": entry.path, "metadata": cached[1], "mtime": stat.st_mtime}
+                    )
+            for name in set(self._entries) - seen:
+                del self._entries[name]
+        recordings.sort(key=lambda x: x["mtime"], reverse=True)
+        return recordings
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Recording Formats
+运行记录的读写 - 各种记录格式统一读取为 {"metadata": ..., "history": [...]}
+
+- .json: 整个运行一次写出的JSON（默认格式）
+- .jsonl: 流式记录，每行一个JSON对象：首行 header（元数据），之后每个tick一行，结束时写 trailer（最终元数据）；
+  运行中断时没有 trailer，已写出的tick仍可读取。header 中 encoding 为 delta 时tick行为关键帧/增量帧（见 delta.py）
+- .recz: 分块压缩记录，带块索引，可以只解压某个tick窗口（见 chunked.py）
+"""
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from elevator.visualization.chunked import CHUNKED_SUFFIX, ChunkedRecordingReader
+from elevator.visualization.delta import DeltaRecordingReader, apply_delta, check_range, diff_snapshot
+
+JSON_SUFFIX = ".json"
+JSONL_SUFFIX = ".jsonl"
+RECORDING_SUFFIXES = (JSON_SUFFIX, JSONL_SUFFIX, CHUNKED_SUFFIX)
+FORMAT_VERSION = 1
+
+PathLike = Union[str, Path]
+
+
+class JsonlRecordingWriter:
+    """流式记录写入器：每个tick写一行并立即刷新，内存占用与运行长度无关"""
+
+    def __init__(self, path: PathLike, metadata: Dict[str, Any], keyframe_interval: Optional[int] = None):
+        """
+        Args:
+            path: 输出文件
+            metadata: 写入 header 的元数据
+            keyframe_interval: 增量编码的关键帧间隔，None 表示每个tick写完整快照
+        """
+        self.path = Path(path)
+        self.ticks = 0
+        self.keyframe_interval = keyframe_interval
+        self._previous: Optional[Dict[str, Any]] = None
+        self._file: Optional[IO[str]] = open(self.path, "w", encoding="utf-8")
+        header: Dict[str, Any] = {"type": "header", "version": FORMAT_VERSION, "metadata": metadata}
+        if keyframe_interval is not None:
+            header.update(encoding="delta", keyframe_interval=keyframe_interval)
+        self._write_line(header)
+
+    def _write_line(self, record: Dict[str, Any]) -> None:
+        assert self._file is not None, "recording already closed"
+        self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def write_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        if self.keyframe_interval is None:
+            self._write_line({"type": "tick", **snapshot})
+        else:
+            delta = None
+            if self._previous is not None and self.ticks % self.keyframe_interval:
+                delta = diff_snapshot(self._previous, snapshot)
+            if delta is None:
+                self._write_line({"type": "keyframe", **snapshot})
+            else:
+                self._write_line({"type": "delta", **delta})
+            self._previous = snapshot
+        self.ticks += 1
+
+    def close(self, metadata: Dict[str, Any]) -> Path:
+        """写入 trailer 并关闭文件"""
+        if self._file is not None:
+            self._write_line({"type": "trailer", "metadata": metadata})
+            self._file.close()
+            self._file = None
+        return self.path
+
+
+def iter_jsonl(path: PathLike) -> Iterator[Dict[str, Any]]:
+    """逐行读取流式记录，忽略中断时写了一半的最后一行"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                break
+
+
+def _load_jsonl(path: PathLike) -> Dict[str, Any]:
+    metadata: Dict[str, Any] = {}
+    history: List[Dict[str, Any]] = []
+    finished = False
+    for record in iter_jsonl(path):
+        kind = record.pop("type", "tick")
+        if kind in ("tick", "keyframe"):
+            history.append(record)
+        elif kind == "delta":
+            history.append(apply_delta(history[-1], record))
+        elif kind == "header":
+            metadata = record.get("metadata", {})
+        elif kind == "trailer":
+            metadata = {**metadata, **record.get("metadata", {})}
+            finished = True
+    if not finished:
+        metadata = {**metadata, "total_ticks": len(history), "incomplete": True}
+    return {"metadata": metadata, "history": history}
+
+
+def _last_line(path: PathLike, block_size: int = 65536) -> str:
+    """文件最后一个非空行（从文件末尾向前读取）"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        data = b""
+        while end > 0:
+            start = max(0, end - block_size)
+            f.seek(start)
+            data = f.read(end - start) + data
+            end = start
+            stripped = data.rstrip(b"\n")
+            if b"\n" in stripped or start == 0:
+                return stripped.rsplit(b"\n", 1)[-1].decode("utf-8")
+    return ""
+
+
+def load_recording(path: PathLike) -> Dict[str, Any]:
+    """读取运行记录文件（按扩展名识别格式）"""
+    suffix = Path(path).suffix
+    if suffix == JSONL_SUFFIX:
+        return _load_jsonl(path)
+    if suffix == CHUNKED_SUFFIX:
+        return ChunkedRecordingReader(path).load()
+    with open(path, "r", encoding="utf-8") as f:
+        data: Dict[str, Any] = json.load(f)
+    return data
+
+
+def iter_recording(path: PathLike) -> Tuple[Dict[str, Any], Iterable[Dict[str, Any]]]:
+    """记录的元数据和快照迭代器（流式和分块记录逐帧解码，不整体载入）"""
+    suffix = Path(path).suffix
+    if suffix == CHUNKED_SUFFIX or suffix == JSONL_SUFFIX:
+        reader: Union[ChunkedRecordingReader, DeltaRecordingReader] = (
+            ChunkedRecordingReader(path) if suffix == CHUNKED_SUFFIX else DeltaRecordingReader(path)
+        )
+        return reader.metadata, reader.iter_range(0)
+    recording = load_recording(path)
+    return recording.get("metadata", {}), recording.get("history", [])
+
+
+def read_metadata(path: PathLike) -> Dict[str, Any]:
+    """
+    只读取记录的元数据
+
+    流式记录只读首行和末行，分块记录只读索引；运行中断（没有 trailer）时返回 header 中的元数据。
+    """
+    if Path(path).suffix == CHUNKED_SUFFIX:
+        return ChunkedRecordingReader(path).metadata
+    if Path(path).suffix != JSONL_SUFFIX:
+        return load_recording(path).get("metadata", {})
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline() or "{}")
+    metadata: Dict[str, Any] = header.get("metadata", {})
+    try:
+        last = json.loads(_last_line(path))
+    except json.JSONDecodeError:
+        last = {}
+    if last.get("type") == "trailer":
+        return {**metadata, **last.get("metadata", {})}
+    return {**metadata, "incomplete": True}
+
+
+def read_ticks(path: PathLike, start: int, stop: int) -> Dict[str, Any]:
+    """
+    读取记录中第 start 到 stop-1 个快照
+
+    分块记录只解压覆盖该窗口的块，流式记录从之前最近的关键帧开始解码，.json 需要读取整个文件。
+
+    Returns:
+        {"total": 快照总数, "start": start, "history": [...]}
+
+    Raises:
+        ValueError: start 为负或 stop 小于 start
+    """
+    check_range(start, stop)
+    suffix = Path(path).suffix
+    if suffix == CHUNKED_SUFFIX or suffix == JSONL_SUFFIX:
+        reader: Union[ChunkedRecordingReader, DeltaRecordingReader] = (
+            ChunkedRecordingReader(path) if suffix == CHUNKED_SUFFIX else DeltaRecordingReader(path)
+        )
+        return {"total": len(reader), "start": start, "history": list(reader.iter_range(start, stop))}
+    history = load_recording(path).get("history", [])
+    return {"total": len(history), "start": start, "history": history[start:stop]}
+
+
+def list_recording_files(directory: PathLike) -> List[Path]:
+    """目录中所有格式的记录文件"""
+    return [path for path in Path(directory).iterdir() if path.is_file() and path.suffix in RECORDING_SUFFIXES]
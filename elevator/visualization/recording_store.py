@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Recording Store
+记录存储 - 限制记录目录的总大小，自动压缩旧记录，维护目录中记录的索引
+
+存储只管理自己登记过的记录（add/track），登记的文件名保存在目录中的 .recording_store 索引里；
+目录中其他文件（如仓库自带的示例记录）只参与 latest()/list()，不会被压缩或删除。
+每次保存记录后（SimulationRecorder.save，配置了存储时）调用 RecordingStore.add：
+
+- 最新的 keep_full 个登记记录保持原样，更早的 .json/.jsonl 记录转换为分块压缩记录（.recz，见 chunked.py），
+  保留原来的修改时间和元数据（另加 compacted_from）
+- 登记记录的总大小超过配额时从最旧的开始删除，刚保存的和最新的记录不会删除
+- 记录的附属文件（<记录文件名>.meta 旁注、<记录文件名>.lodN 分级文件）计入记录的大小并随记录删除；
+  登记记录已不存在时清理其附属文件
+
+索引只在目录的修改时间变化（新增、删除、改名）时重新扫描，扫描只读 stat，不解析记录；
+目录没有变化时 latest() 是 O(1) 的。
+
+配额和保留个数默认读取环境变量 ELEVATOR_RECORDING_QUOTA_MB（默认 256，0 表示不限制）
+和 ELEVATOR_RECORDING_KEEP_FULL（默认 5）。记录器默认不使用存储，设置了其中任一环境变量时
+才使用输出目录的存储（见 store_from_environment）。
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Union
+
+from elevator.utils.log import get_logger
+from elevator.visualization.chunked import CHUNKED_SUFFIX, ChunkedRecordingWriter
+from elevator.visualization.columnar import COLUMNAR_SUFFIX
+from elevator.visualization.recording_index import write_sidecar
+from elevator.visualization.recording_io import JSON_SUFFIX, JSONL_SUFFIX, RECORDING_SUFFIXES, iter_recording
+
+DEFAULT_QUOTA_MB = 256
+DEFAULT_KEEP_FULL = 5  # 保持原格式的最新记录数
+COMPACTABLE_SUFFIXES = (JSON_SUFFIX, JSONL_SUFFIX)
+_COMPANION = re.compile(r"(?P<recording>.+)\.(?:meta|lod\d+)$")
+_TEMP_SUFFIX = ".tmp"
+STORE_INDEX = ".recording_store"  # 存储登记的记录文件名
+QUOTA_ENV = "ELEVATOR_RECORDING_QUOTA_MB"
+KEEP_FULL_ENV = "ELEVATOR_RECORDING_KEEP_FULL"
+_MTIME_SLACK_NS = 2_000_000_000  # 目录修改时间的精度（FAT 为 2 秒）
+
+PathLike = Union[str, Path]
+
+log = get_logger("recordings")
+
+
+@dataclass
+class StoredRecording:
+    """索引中的一个记录"""
+
+    path: Path
+    mtime_ns: int
+    size: int  # 记录和附属文件的总字节数
+    companions: List[Path] = field(default_factory=list)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def store_from_environment(directory: PathLike) -> Optional["RecordingStore"]:
+    """设置了配额或保留个数环境变量时返回 directory 的存储，否则返回 None（记录器默认不维护目录）"""
+    if os.environ.get(QUOTA_ENV) or os.environ.get(KEEP_FULL_ENV):
+        return RecordingStore(directory)
+    return None
+
+
+def _size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+class RecordingStore:
+    """
+    有大小配额的记录目录
+
+    用法::
+
+        store = RecordingStore(recordings_dir)
+        store.add(saved_path)   # 保存记录后：登记该记录，压缩旧记录并执行配额
+        latest = store.latest()  # 最新的记录文件（包括未登记的）
+    """
+
+    def __init__(self, directory: PathLike, quota_bytes: Optional[int] = None, keep_full: Optional[int] = None):
+        """
+        Args:
+            directory: 记录目录
+            quota_bytes: 登记记录的总大小上限，0 表示不限制
+            keep_full: 保持原格式（不压缩）的最新登记记录数
+        """
+        self.directory = Path(directory)
+        if quota_bytes is None:
+            quota_bytes = _env_int(QUOTA_ENV, DEFAULT_QUOTA_MB) * 1024 * 1024
+        if keep_full is None:
+            keep_full = _env_int(KEEP_FULL_ENV, DEFAULT_KEEP_FULL)
+        self.quota_bytes = quota_bytes
+        self.keep_full = max(1, keep_full)
+        self._entries: List[StoredRecording] = []  # 按修改时间从旧到新
+        self._orphans: List[Path] = []  # 对应记录已不存在的附属文件
+        self._latest: Optional[StoredRecording] = None
+        self._signature: Optional[int] = None  # 上次扫描时目录的修改时间
+        self._lock = threading.Lock()
+        self.scans = 0  # 扫描目录的次数
+
+    def _sync(self, force: bool = False) -> None:
+        """目录有变化时重新扫描"""
+        try:
+            mtime_ns = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            self._entries, self._orphans, self._latest, self._signature = [], [], None, None
+            return
+        if not force and mtime_ns == self._signature:
+            return
+        self._scan()
+        # 修改时间距现在不到一个精度单位时，之后的变化可能不改变修改时间，下次仍然扫描
+        self._signature = mtime_ns if time.time_ns() - mtime_ns > _MTIME_SLACK_NS else None
+
+    def _scan(self) -> None:
+        self.scans += 1
+        recordings: Dict[str, StoredRecording] = {}
+        companions: List[Path] = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                path = Path(entry.path)
+                try:
+                    if entry.is_dir():
+                        if path.suffix == COLUMNAR_SUFFIX:
+                            recordings[entry.name] = StoredRecording(path, entry.stat().st_mtime_ns, _size(path))
+                    elif path.suffix in RECORDING_SUFFIXES:
+                        stat = entry.stat()
+                        recordings[entry.name] = StoredRecording(path, stat.st_mtime_ns, stat.st_size)
+                    elif _COMPANION.match(entry.name):
+                        companions.append(path)
+                except FileNotFoundError:
+                    continue  # 扫描期间被删除
+
+        orphans = []
+        for path in companions:
+            match = _COMPANION.match(path.name)
+            owner = recordings.get(match.group("recording")) if match else None
+            if owner is None:
+                orphans.append(path)
+                continue
+            try:
+                owner.size += path.stat().st_size
+            except FileNotFoundError:
+                continue
+            owner.companions.append(path)
+
+        self._entries = sorted(recordings.values(), key=lambda r: (r.mtime_ns, r.path.name))
+        self._orphans = orphans
+        self._latest = next((r for r in reversed(self._entries) if r.path.suffix in RECORDING_SUFFIXES), None)
+
+    def latest(self) -> Optional[Path]:
+        """最新的记录文件（可由 load_recording 读取的格式），目录为空时返回 None"""
+        with self._lock:
+            self._sync()
+            return self._latest.path if self._latest is not None else None
+
+    def list(self) -> List[StoredRecording]:
+        """所有记录，最新的在前"""
+        with self._lock:
+            self._sync()
+            return self._entries[::-1]
+
+    def total_size(self) -> int:
+        with self._lock:
+            self._sync()
+            return sum(r.size for r in self._entries)
+
+    def track(self, *paths: PathLike) -> None:
+        """登记目录中已有的记录，交给存储管理（不立即压缩或执行配额）"""
+        with self._lock:
+            owned = self._read_owned()
+            owned.update(self._name(path) for path in paths)
+            self._write_owned(owned)
+
+    def add(self, path: Optional[PathLike] = None) -> Dict[str, int]:
+        """
+        记录保存后调用：登记该记录，压缩旧记录并执行配额
+
+        Args:
+            path: 刚保存的记录，不会被删除
+
+        Returns:
+            {"compacted": 压缩的记录数, "removed": 删除的记录数, "freed": 释放的字节数}
+        """
+        with self._lock:
+            if path is None:
+                return self._enforce(None)
+            owned = self._read_owned()
+            owned.add(self._name(path))
+            self._write_owned(owned)
+            return self._enforce(Path(path).resolve())
+
+    def enforce(self) -> Dict[str, int]:
+        """压缩旧记录并执行配额（返回值同 add）"""
+        with self._lock:
+            return self._enforce(None)
+
+    def _name(self, path: PathLike) -> str:
+        path = Path(path)
+        if path.resolve().parent != self.directory.resolve():
+            raise ValueError(f"{path} is not in {self.directory}")
+        return path.name
+
+    def _read_owned(self) -> Set[str]:
+        try:
+            with open(self.directory / STORE_INDEX, encoding="utf-8") as f:
+                return set(json.load(f).get("recordings", []))
+        except FileNotFoundError:
+            return set()
+        except (OSError, ValueError, AttributeError) as e:
+            log.warning("ignoring unreadable store index: %s", e)
+            return set()
+
+    def _write_owned(self, owned: Set[str]) -> None:
+        index = self.directory / STORE_INDEX
+        temporary = index.with_name(index.name + _TEMP_SUFFIX)
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"recordings": sorted(owned)}, f, ensure_ascii=False, indent=2)
+        os.replace(temporary, index)
+
+    def _enforce(self, protected: Optional[Path]) -> Dict[str, int]:
+        self._sync(force=True)
+        owned = self._read_owned()
+        present = {entry.path.name for entry in self._entries}
+        # 只清理登记记录留下的附属文件
+        orphans = [p for p in self._orphans if _COMPANION.match(p.name).group("recording") in owned - present]
+        managed = [entry for entry in self._entries if entry.path.name in owned]
+        before = sum(r.size for r in managed) + sum(_size(p) for p in orphans if p.exists())
+        for path in orphans:
+            _remove(path)
+
+        compacted = 0
+        for entry in managed[: -self.keep_full]:
+            if entry.path.suffix in COMPACTABLE_SUFFIXES:
+                target = self._compact(entry)
+                if target is not None:
+                    owned.discard(entry.path.name)
+                    owned.add(target.name)
+                    compacted += 1
+        owned &= present | {entry.path.with_suffix(CHUNKED_SUFFIX).name for entry in managed}
+        self._write_owned(owned)
+        self._sync(force=True)
+        managed = [entry for entry in self._entries if entry.path.name in owned]
+
+        removed = 0
+        if self.quota_bytes:
+            total = sum(r.size for r in managed)
+            for entry in managed[:-1]:
+                if total <= self.quota_bytes:
+                    break
+                if protected is not None and entry.path.resolve() == protected:
+                    continue
+                for path in [entry.path, *entry.companions]:
+                    _remove(path)
+                log.info("removed %s (%d bytes) to stay within the quota", entry.path.name, entry.size)
+                owned.discard(entry.path.name)
+                total -= entry.size
+                removed += 1
+            if removed:
+                self._write_owned(owned)
+            self._sync(force=True)
+
+        freed = before - sum(r.size for r in self._entries if r.path.name in owned)
+        return {"compacted": compacted, "removed": removed, "freed": freed}
+
+    def _compact(self, entry: StoredRecording) -> Optional[Path]:
+        """把记录转换为 .recz（保留修改时间），返回新文件；未完成或目标已存在时跳过"""
+        source = entry.path
+        target = source.with_suffix(CHUNKED_SUFFIX)
+        if target.exists():
+            return None
+        metadata, snapshots = iter_recording(source)
+        if metadata.get("incomplete"):
+            return None  # 运行中断或仍在写入
+
+        metadata = {**metadata, "compacted_from": source.suffix.lstrip(".")}
+        temporary = target.with_name(target.name + _TEMP_SUFFIX)
+        writer = ChunkedRecordingWriter(temporary, metadata)
+        try:
+            for snapshot in snapshots:
+                writer.write_snapshot(snapshot)
+            writer.close(metadata)
+            os.utime(temporary, ns=(entry.mtime_ns, entry.mtime_ns))
+            os.replace(temporary, target)
+        except BaseException:
+            writer.close(metadata)
+            temporary.unlink(missing_ok=True)
+            raise
+        write_sidecar(target, metadata)
+        for path in [source, *entry.companions]:
+            _remove(path)  # 分级文件按新文件名在需要时重新生成
+        log.info("compacted %s -> %s (%d -> %d bytes)", source.name, target.name, entry.size, _size(target))
+        return target
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Algorithm Runner
+算法运行池 - 在服务器进程内复用已导入的控制器类运行算法，不再为每次运行启动新的解释器
+
+算法文件按模块导入一次并缓存控制器类，文件修改后自动重新加载。
+所有运行共用同一个模拟器，因此由单个工作线程依次执行；运行结束直接返回记录文件路径。
+"""
+import concurrent.futures
+import contextlib
+import importlib
+import inspect
+import io
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, Optional, Tuple, Type
+
+from elevator.client.base_controller import ElevatorController
+from elevator.visualization.recorder import SimulationRecorder
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+OUTPUT_TAIL_CHARS = 4000  # 返回的算法输出末尾字符数
+
+
+@dataclass
+class RunResult:
+    """一次算法运行的结果"""
+
+    recording: Path
+    output: str
+    elapsed: float
+
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    按线程分流的 sys.stdout
+
+    contextlib.redirect_stdout 替换的是整个进程的 sys.stdout，算法运行期间服务器其他线程的输出也会被捕获。
+    安装此对象后，只有在 capture() 中的线程写入自己的缓冲区，其他线程照常写入原来的 stdout。
+    """
+
+    def __init__(self, default: IO[str]):
+        self.default = default
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def capture(self, buffer: IO[str]) -> Iterator[None]:
+        previous = getattr(self._local, "buffer", None)
+        self._local.buffer = buffer
+        try:
+            yield
+        finally:
+            self._local.buffer = previous
+
+    def _target(self) -> IO[str]:
+        buffer = getattr(self._local, "buffer", None)
+        return buffer if buffer is not None else self.default
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self._target().isatty()
+
+    @property
+    def encoding(self) -> str:  # type: ignore[override]
+        return getattr(self.default, "encoding", "utf-8")
+
+
+_install_lock = threading.Lock()
+
+
+def _thread_output() -> _ThreadOutput:
+    """安装（或复用已安装的）按线程分流的 sys.stdout"""
+    with _install_lock:
+        if not isinstance(sys.stdout, _ThreadOutput):
+            sys.stdout = _ThreadOutput(sys.stdout)
+        return sys.stdout
+
+
+def find_controller_class(module: object) -> Type[ElevatorController]:
+    """模块中定义的第一个可实例化的 ElevatorController 子类（不含从其他模块导入的类）"""
+    for value in vars(module).values():
+        if (
+            isinstance(value, type)
+            and issubclass(value, ElevatorController)
+            and value.__module__ == getattr(module, "__name__", None)
+            and not inspect.isabstract(value)
+        ):
+            return value
+    raise ValueError(f"{getattr(module, '__name__', module)} 中没有 ElevatorController 子类")
+
+
+class AlgorithmRunner:
+    """
+    常驻的算法运行池
+
+    用法::
+
+        runner = AlgorithmRunner("http://127.0.0.1:8000", recordings_dir)
+        result = runner.run(Path("controller.py"), "look_v2_lunch_rush.json", timeout=300)
+    """
+
+    def __init__(self, server_url: str, recordings_dir: Path, project_root: Path = PROJECT_ROOT):
+        """
+        初始化运行池
+
+        Args:
+            server_url: 模拟器地址
+            recordings_dir: 记录文件目录
+            project_root: 项目根目录，算法文件按相对它的模块名导入
+        """
+        self.server_url = server_url
+        self.recordings_dir = Path(recordings_dir)
+        self.project_root = Path(project_root).resolve()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="algorithm")
+        self._classes: Dict[Path, Tuple[float, Type[ElevatorController]]] = {}  # 文件 -> (mtime, 控制器类)
+        self._lock = threading.Lock()
+        self._current: Optional[ElevatorController] = None
+
+    def _module_name(self, path: Path) -> str:
+        try:
+            relative = path.relative_to(self.project_root)
+        except ValueError:
+            raise ValueError(f"算法文件不在项目目录中: {path}") from None
+        return ".".join(relative.with_suffix("").parts)
+
+    def load(self, path: Path) -> Type[ElevatorController]:
+        """导入算法文件并返回控制器类，文件未修改时直接使用缓存"""
+        path = Path(path).resolve()
+        mtime = path.stat().st_mtime
+        with self._lock:
+            cached = self._classes.get(path)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            if str(self.project_root) not in sys.path:
+                sys.path.insert(0, str(self.project_root))
+            name = self._module_name(path)
+            module = sys.modules.get(name)
+            if module is None:
+                module = importlib.import_module(name)
+            elif cached is not None:
+                # 文件已修改，重新加载
+                module = importlib.reload(module)
+            controller_class = find_controller_class(module)
+            self._classes[path] = (mtime, controller_class)
+            return controller_class
+
+    def preload(self, paths: Iterable[Path]) -> "Future[None]":
+        """在工作线程中预先导入算法文件，导入失败的文件在运行时再报错"""
+
+        def _preload() -> None:
+            for path in paths:
+                try:
+                    self.load(path)
+                except Exception as e:
+                    print(f"[RUNNER] 预加载 {Path(path).name} 失败: {e}")
+
+        return self._executor.submit(_preload)
+
+    def submit(self, path: Path, recording_filename: Optional[str] = None) -> "Future[RunResult]":
+        """提交一次运行，排在之前的运行之后执行"""
+        return self._executor.submit(self._run, Path(path), recording_filename)
+
+    def run(self, path: Path, recording_filename: Optional[str] = None, timeout: Optional[float] = None) -> RunResult:
+        """
+        运行算法直到模拟结束
+
+        Raises:
+            concurrent.futures.TimeoutError: 超时，正在运行的控制器会被停止
+        """
+        future = self.submit(path, recording_filename)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Python 3.10 中与内置 TimeoutError 不是同一个类
+            self.cancel()
+            raise
+
+    def cancel(self) -> None:
+        """停止正在运行的控制器（在下一个tick退出）"""
+        controller = self._current
+        if controller is not None:
+            controller.stop()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _run(self, path: Path, recording_filename: Optional[str]) -> RunResult:
+        start = time.perf_counter()
+        controller_class = self.load(path)
+        recorder = SimulationRecorder(self.recordings_dir, background=True)
+        recorder.filename = recording_filename
+        output = io.StringIO()
+        # 只捕获本线程（控制器）的输出，返回末尾部分；服务器其他线程的输出不受影响
+        with _thread_output().capture(output):
+            controller = controller_class(server_url=self.server_url)
+            controller.client_type = "algorithm"
+            controller.recorder = recorder
+            self._current = controller
+            try:
+                controller.start()
+            finally:
+                self._current = None
+        if recorder.saved_path is None:
+            raise RuntimeError("算法运行完成但未生成记录文件")
+        return RunResult(recorder.saved_path, output.getvalue()[-OUTPUT_TAIL_CHARS:], time.perf_counter() - start)
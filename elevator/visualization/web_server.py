@@ -6,18 +6,22 @@ Web Visualization Server
 import asyncio
 import json
 import os
-import subprocess
-import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from queue import Queue
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
 from fastapi.responses import FileResponse, HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
+from elevator.visualization.lod import DEFAULT_MAX_POINTS, read_lod_window
+from elevator.visualization.recording_index import RecordingIndex
+from elevator.visualization.recording_io import load_recording, read_ticks
+from elevator.visualization.recording_store import RecordingStore
+from elevator.visualization.runner import AlgorithmRunner
+
 # 全局事件队列（用于 GUIController 推送事件给 WebSocket）
 _event_queue: Queue = Queue()
 
@@ -43,13 +47,23 @@ class VisualizationServer:
         # 确保目录存在
         self.recordings_dir.mkdir(parents=True, exist_ok=True)
         self.static_dir.mkdir(parents=True, exist_ok=True)
+        self.recording_index = RecordingIndex(self.recordings_dir)
+        self.recording_store = RecordingStore(self.recordings_dir)
 
-        # 运行状态跟踪
-        self.running_processes: Dict[str, subprocess.Popen] = {}
+        # 算法运行池：控制器类只导入一次，在进程内依次运行
+        self.simulator_url = "http://127.0.0.1:8000"
+        self.runner = AlgorithmRunner(self.simulator_url, self.recordings_dir)
+        self.runner.preload(self._algorithm_files())
 
         # 设置路由
         self._setup_routes()
 
+    def _algorithm_files(self) -> List[Path]:
+        """可运行的算法文件：项目根目录的 controller.py 和 client_examples 中的算法"""
+        files = [Path(__file__).parent.parent.parent / "controller.py"]
+        files += [f for f in sorted(self.client_examples_dir.glob("*.py")) if not f.name.startswith("__")]
+        return [f for f in files if f.exists()]
+
     def _setup_routes(self):
         """设置路由"""
 
@@ -81,22 +95,8 @@ class VisualizationServer:
         async def list_recordings():
             """列出所有记录文件"""
             try:
-                recordings = []
-                for file_path in self.recordings_dir.glob("*.json"):
-                    # 读取元数据
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        metadata = data.get("metadata", {})
-                        recordings.append(
-                            {
-                                "filename": file_path.name,
-                                "path": str(file_path),
-                                "metadata": metadata,
-                                "mtime": file_path.stat().st_mtime,  # 文件修改时间
-                            }
-                        )
-                # 按文件修改时间倒序排列（最新的在前）
-                recordings.sort(key=lambda x: x["mtime"], reverse=True)
+                # 元数据来自按修改时间校验的缓存，只解析新增或修改过的记录
+                recordings = self.recording_index.list()
                 return {"success": True, "recordings": recordings}
             except Exception as e:
                 return {"success": False, "error": str(e)}
@@ -109,9 +109,36 @@ class VisualizationServer:
                 if not file_path.exists():
                     return {"success": False, "error": "File not found"}
 
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return {"success": True, "data": data}
+                return {"success": True, "data": load_recording(file_path)}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+        @self.app.get("/api/recording/{filename}/ticks")
+        async def get_recording_ticks(filename: str, start: int = Query(0, ge=0), stop: int = Query(500, ge=0)):
+            """获取记录中第 start 到 stop-1 个快照（.recz 只解压覆盖该窗口的块）"""
+            try:
+                file_path = self.recordings_dir / filename
+                if not file_path.exists():
+                    return {"success": False, "error": "File not found"}
+
+                return {"success": True, "data": read_ticks(file_path, start, stop)}
+            except Exception as e:
+                return {"success": False, "error": str(e)}
+
+        @self.app.get("/api/recording/{filename}/lod")
+        async def get_recording_lod(
+            filename: str,
+            start: int = Query(0, ge=0),
+            stop: Optional[int] = Query(None, ge=0),
+            max_points: int = Query(DEFAULT_MAX_POINTS, ge=1),
+        ):
+            """按缩放级别获取记录：窗口帧数超过 max_points 时返回每 10 / 100 个tick的聚合快照"""
+            try:
+                file_path = self.recordings_dir / filename
+                if not file_path.exists():
+                    return {"success": False, "error": "File not found"}
+
+                return {"success": True, "data": read_lod_window(file_path, start, stop, max_points)}
             except Exception as e:
                 return {"success": False, "error": str(e)}
 
@@ -242,7 +269,7 @@ class VisualizationServer:
                 recording_filename = f"{algorithm_name}_{traffic_name}_{timestamp}.json"
 
                 # 1. 先获取simulator的流量文件列表，找到目标流量文件的索引
-                simulator_url = "http://127.0.0.1:8000"
+                simulator_url = self.simulator_url
                 try:
                     # 绕过系统代理设置，直接连接localhost
                     async with httpx.AsyncClient(trust_env=False) as client:
@@ -277,64 +304,33 @@ class VisualizationServer:
                 except Exception as e:
                     return {"success": False, "error": f"配置模拟器失败: {str(e)}"}
 
-                # 2. 启动算法脚本
+                # 2. 在运行池中运行算法（控制器类已预先导入）
                 print(f"🚀 启动算法: {algorithm_name}, 流量: {traffic_name}")
 
-                # 使用subprocess运行Python脚本，设置UTF-8编码避免Windows下的emoji错误
-                import os
-                env = os.environ.copy()
-                env["PYTHONIOENCODING"] = "utf-8"  # 强制使用UTF-8编码
-
-                process = subprocess.Popen(
-                    [sys.executable, str(algorithm_file)],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    encoding="utf-8",
-                    errors="replace",  # 遇到无法编码的字符时替换而不是报错
-                    env=env,
-                )
+                recording_path = self.recordings_dir / recording_filename
+                i = 1
+                while recording_path.exists():
+                    # 如果文件已存在，添加序号
+                    recording_path = self.recordings_dir / f"{algorithm_name}_{traffic_name}_{timestamp}_{i}.json"
+                    i += 1
+
+                future = self.runner.submit(algorithm_file, recording_path.name)
+                try:
+                    result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=300)  # 5分钟超时
+                except asyncio.TimeoutError:
+                    self.runner.cancel()
+                    return {"success": False, "error": "算法运行超时（5分钟）"}
+                except Exception as e:
+                    print(f"❌ 算法运行失败: {e}")
+                    return {"success": False, "error": f"算法运行失败: {e}"}
+
+                print(f"✅ 算法运行完成，耗时 {result.elapsed:.1f}s")
+                return {
+                    "success": True,
+                    "recording": result.recording.name,
+                    "message": "算法运行成功",
+                }
 
-                # 等待进程完成
-                stdout, stderr = process.communicate(timeout=300)  # 5分钟超时
-
-                if process.returncode == 0:
-                    print(f"✅ 算法运行完成")
-                    # 查找最新生成的记录文件
-                    recordings = list(self.recordings_dir.glob("*.json"))
-                    if recordings:
-                        recordings.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-                        latest_recording = recordings[0]
-
-                        # 重命名为规范格式
-                        new_path = self.recordings_dir / recording_filename
-                        if new_path.exists():
-                            # 如果文件已存在，添加序号
-                            i = 1
-                            while new_path.exists():
-                                new_path = self.recordings_dir / f"{algorithm_name}_{traffic_name}_{timestamp}_{i}.json"
-                                i += 1
-                        latest_recording.rename(new_path)
-
-                        return {
-                            "success": True,
-                            "recording": new_path.name,
-                            "message": "算法运行成功",
-                        }
-                    else:
-                        return {
-                            "success": False,
-                            "error": "算法运行完成但未找到记录文件",
-                        }
-                else:
-                    print(f"❌ 算法运行失败: {stderr}")
-                    return {
-                        "success": False,
-                        "error": f"算法运行失败: {stderr}",
-                    }
-
-            except subprocess.TimeoutExpired:
-                return {"success": False, "error": "算法运行超时（5分钟）"}
             except Exception as e:
                 import traceback
                 traceback.print_exc()
@@ -392,13 +388,11 @@ class VisualizationServer:
         try:
             if not filename:
                 # 如果没有指定文件名，发送最新的记录
-                recordings = list(self.recordings_dir.glob("*.json"))
-                if not recordings:
+                # 记录存储的索引只在目录变化时重新扫描
+                file_path = self.recording_store.latest()
+                if file_path is None:
                     await websocket.send_json({"type": "error", "message": "No recordings found"})
                     return
-                # 按文件修改时间倒序排列（最新的在前）
-                recordings.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-                file_path = recordings[0]
             else:
                 file_path = self.recordings_dir / filename
 
@@ -407,8 +401,7 @@ class VisualizationServer:
                 return
 
             # 读取记录文件
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = load_recording(file_path)
 
             # 发送元数据
             await websocket.send_json(
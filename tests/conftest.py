@@ -0,0 +1,58 @@
+"""
+Shared fixtures for the recording tests
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from controller import LookV2Controller
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+from elevator.visualization.recorder import SimulationRecorder
+
+# 录制用的随机流量，测试模块可以用模块级的 TRAFFIC 覆盖其中的参数
+DEFAULT_TRAFFIC = {"elevators": 2, "floors": 6, "duration": 60, "density": 0.5, "seed": 4}
+
+
+def _strip_timestamps(history):
+    return [{k: v for k, v in snapshot.items() if k != "timestamp"} for snapshot in history]
+
+
+@pytest.fixture
+def record(request):
+    """
+    在测试模块的流量上运行控制器并录制，返回记录文件路径
+
+    用法: record(directory, format="json", controller=None, recorder=None, **recorder_options)
+    recorder 为 None 时用 directory、format 和 recorder_options 创建 SimulationRecorder；
+    controller 默认为 LookV2Controller。
+    """
+    traffic = {**DEFAULT_TRAFFIC, **getattr(request.module, "TRAFFIC", {})}
+
+    def _record(directory=None, format="json", controller=None, recorder=None, **recorder_options):
+        if recorder is None:
+            recorder = SimulationRecorder(directory, format=format, **recorder_options)
+        pattern = create_random_traffic_pattern(
+            traffic["elevators"],
+            traffic["floors"],
+            duration=traffic["duration"],
+            density=traffic["density"],
+            seed=traffic["seed"],
+        )
+        if controller is None:
+            controller = LookV2Controller()
+        controller.api_client = LocalAPIClient(ElevatorSimulation(pattern))
+        controller.recorder = recorder
+        with contextlib.redirect_stdout(io.StringIO()):
+            controller.start()
+        return recorder.saved_path
+
+    return _record
+
+
+@pytest.fixture
+def strip():
+    """去掉快照中的 timestamp（每次运行都不同），用于比较两个记录的历史"""
+    return _strip_timestamps
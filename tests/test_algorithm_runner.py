@@ -0,0 +1,92 @@
+"""
+Test the in-process algorithm runner pool
+"""
+
+import concurrent.futures
+import contextlib
+import io
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from controller import LookV2Controller
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+from elevator.server.local_server import LocalSimulatorServer
+from elevator.visualization.runner import PROJECT_ROOT, AlgorithmRunner, _ThreadOutput
+
+
+def test_runner_reuses_loaded_controller_and_returns_recording(tmp_path):
+    """Test that runs share one imported class and return their recording paths"""
+    controller_file = PROJECT_ROOT / "controller.py"
+    traffic = create_random_traffic_pattern(2, 6, duration=30, density=0.3, seed=1)
+    with LocalSimulatorServer(ElevatorSimulation(traffic)) as server:
+        runner = AlgorithmRunner(server.url, tmp_path)
+        try:
+            runner.preload([controller_file]).result()
+            assert runner.load(controller_file) is LookV2Controller
+
+            first = runner.run(controller_file, "first.json", timeout=60)
+            assert first.recording == tmp_path / "first.json" and first.recording.exists()
+
+            second = runner.run(Path(controller_file), "second.json", timeout=60)
+            assert second.recording.exists()
+            assert runner.load(controller_file) is LookV2Controller
+        finally:
+            runner.shutdown()
+
+
+def test_captured_output_is_per_thread():
+    """Test that only the capturing thread's prints go to its buffer"""
+    server_output, run_output = io.StringIO(), io.StringIO()
+    stdout = _ThreadOutput(server_output)
+    started, printed = threading.Event(), threading.Event()
+
+    def run():
+        with stdout.capture(run_output):
+            started.set()
+            print("from the algorithm", file=stdout)
+            printed.wait(5)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    started.wait(5)
+    print("from the server", file=stdout)
+    printed.set()
+    thread.join()
+    assert run_output.getvalue() == "from the algorithm\n"
+    assert server_output.getvalue() == "from the server\n"
+
+
+class _ResetClient(LocalAPIClient):
+    def get_state(self, *args, **kwargs):
+        raise ConnectionResetError("connection reset by peer")
+
+
+def test_unreachable_simulator_raises_instead_of_exiting():
+    """Test that a reset connection surfaces as an exception rather than terminating the process"""
+    controller = LookV2Controller()
+    controller.api_client = _ResetClient(ElevatorSimulation())
+    controller.recorder = None
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(ConnectionError, match="模拟器"):
+        controller.start()
+
+
+def test_timeout_cancels_the_running_controller(tmp_path):
+    """Test that a timed-out run is stopped so the next run is not stuck behind it"""
+    controller_file = PROJECT_ROOT / "controller.py"
+    traffic = create_random_traffic_pattern(2, 6, duration=100000, density=0.05, seed=2)
+    with LocalSimulatorServer(ElevatorSimulation(traffic)) as server:
+        runner = AlgorithmRunner(server.url, tmp_path)
+        try:
+            with pytest.raises(concurrent.futures.TimeoutError):
+                runner.run(controller_file, "slow.json", timeout=0.5)
+            # 被停止的运行在下一个tick退出并保存记录；未停止时需要跑完 100000 个tick
+            deadline = time.monotonic() + 10
+            while not (tmp_path / "slow.json").exists() and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert (tmp_path / "slow.json").exists()
+        finally:
+            runner.shutdown()
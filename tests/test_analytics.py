@@ -0,0 +1,61 @@
+"""
+Test the vectorized recording analytics
+"""
+
+import contextlib
+import io
+import json
+
+from elevator.visualization.analytics import car_stats, load_any, main, passenger_times, summarize
+from elevator.visualization.recording_io import load_recording
+
+TRAFFIC = {"elevators": 3, "floors": 8, "duration": 120, "density": 0.6, "seed": 12}
+
+
+def _loop_kpis(history):
+    """逐帧循环计算的参考值"""
+    called, boarded, waits, stops = {}, {}, {}, {}
+    distance = [0] * len(history[0]["elevators"])
+    for index, snapshot in enumerate(history):
+        for event in snapshot["events"]:
+            data = event["data"]
+            if event["type"] in ("up_button_pressed", "down_button_pressed"):
+                called.setdefault(data["passenger"], snapshot["tick"])
+            elif event["type"] == "passenger_board" and data["passenger"] not in boarded:
+                boarded[data["passenger"]] = snapshot["tick"]
+                waits[data["passenger"]] = snapshot["tick"] - called[data["passenger"]]
+            elif event["type"] == "stopped_at_floor":
+                stops[data["elevator"]] = stops.get(data["elevator"], 0) + 1
+        if index:
+            for car, elevator in enumerate(snapshot["elevators"]):
+                distance[car] += abs(elevator["current_floor"] - history[index - 1]["elevators"][car]["current_floor"])
+    return waits, stops, distance
+
+
+def test_kpis_match_loop_reference(tmp_path, record):
+    """Test that the vectorized KPIs equal a per-snapshot Python loop"""
+    path = record(tmp_path, "json")
+    history = load_recording(path)["history"]
+    waits, stops, distance = _loop_kpis(history)
+
+    rec = load_any(path)
+    times = passenger_times(rec)
+    boarded = times["wait"] >= 0
+    assert dict(zip(times["passenger"][boarded].tolist(), times["wait"][boarded].tolist())) == waits
+    cars = car_stats(rec)
+    assert cars["stops"].tolist() == [stops.get(car, 0) for car in range(3)]
+    assert cars["distance"].tolist() == distance
+    assert 0 < cars["utilization"].min() and cars["utilization"].max() <= 1
+
+
+def test_every_format_gives_the_same_summary(tmp_path, record):
+    """Test that JSON, streamed, chunked and columnar recordings summarize identically, and the CLI runs in parallel"""
+    summaries = [summarize(load_any(record(tmp_path, fmt))) for fmt in ("json", "jsonl", "chunked", "columnar")]
+    assert all(summary == summaries[0] for summary in summaries[1:])
+    assert summaries[0]["delivered"] > 0 and summaries[0]["ticks"] == 120
+
+    output = tmp_path / "summary.json"
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert main([str(tmp_path), "--workers", "2", "--output", str(output)]) == 0
+    results = json.loads(output.read_text(encoding="utf-8"))
+    assert len(results) == 4 and {r["wait"]["mean"] for r in results} == {summaries[0]["wait"]["mean"]}
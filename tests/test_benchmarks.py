@@ -0,0 +1,48 @@
+"""
+Test the tick loop benchmark harness on a tiny building
+"""
+
+from benchmarks.tick_loop import BenchmarkCase, build_cases, compare, run_case
+
+
+def test_run_case_both_transports():
+    """Test that both transports report the same simulation and request counts"""
+    results = [run_case(BenchmarkCase(2, 6, density=0.3, ticks=30, transport=t)) for t in ("inprocess", "http")]
+    local, http = results
+
+    for result in results:
+        assert result["ticks_run"] == 30
+        assert result["ticks_per_s"] > 0
+        assert result["requests_per_tick"] >= 2  # 至少 step + get_state
+        assert result["recorder_ms_per_tick"] > 0
+        assert "on_elevator_stopped" in result["callbacks"]
+
+    # 同一流量、同一算法，两种传输方式的结果应完全一致
+    assert local["metrics"] == http["metrics"]
+    assert local["requests"] == http["requests"]
+
+
+def test_build_cases_and_compare():
+    """Test grid generation and comparison between two reports"""
+    cases = build_cases(buildings=[(2, 6)], densities=[0.1, 0.3], transports=["inprocess"], ticks=10)
+    assert [c.name for c in cases] == ["inprocess/2x6/d0.1", "inprocess/2x6/d0.3"]
+
+    baseline = {"results": [{"case": "a", "ticks_per_s": 100.0, "requests_per_tick": 3.0}]}
+    current = {"results": [{"case": "a", "ticks_per_s": 200.0, "requests_per_tick": 2.0}, {"case": "b"}]}
+    lines = compare(current, baseline)
+    assert len(lines) == 1
+    assert "x2.00" in lines[0]
+
+
+def test_algorithm_comparison_on_same_traffic():
+    """Test that every algorithm runs the same traffic and reports censored metrics"""
+    from benchmarks.algorithms import AlgorithmCase, run_comparison
+
+    report = run_comparison([AlgorithmCase(2, 6, density=0.1, arrival_ticks=30, duration=120)])
+    results = report["results"][0]["algorithms"]
+    assert set(results) == {"look_v2", "optimal_look"}
+    totals = {r["metrics"]["total_passengers"] for r in results.values()}
+    assert len(totals) == 1 and totals.pop() > 0
+    for name, result in results.items():
+        assert result["censored"]["p95_system_time"] >= result["censored"]["average_wait_time"] > 0
+        assert report["summary"][name]["completion"] == 1.0
@@ -0,0 +1,26 @@
+"""
+Test LookV2Controller's capacity handling
+"""
+
+import contextlib
+import io
+from types import SimpleNamespace
+
+from controller import LookV2Controller
+from elevator.client.floor_set import FloorSet
+from elevator.core.models import Direction
+
+
+def test_full_car_skips_pickups_until_riders_alight():
+    """Test that predicted load from known destinations skips pickups a full car cannot take"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = LookV2Controller()
+    controller.passenger_destinations = {p: (9 if p < 2 else 15) for p in range(10)}
+    car = SimpleNamespace(id=0, passengers=list(range(10)), max_capacity=10)
+    calls = FloorSet([2, 6, 8, 9, 12, 14])
+
+    kept = controller._skip_full_pickups(car, 5, Direction.UP, calls)
+    # 9 层有两人下梯，之后才有空位；5 层以下不在扫描方向前方，不受影响
+    assert list(kept) == [2, 9, 12, 14]
+    car.passengers = list(range(9))
+    assert controller._skip_full_pickups(car, 5, Direction.UP, calls) == calls
@@ -0,0 +1,55 @@
+"""
+Test the compressed chunked recording container
+"""
+
+import pytest
+
+from elevator.visualization.chunked import ChunkedRecordingReader
+from elevator.visualization.recording_io import load_recording, read_metadata, read_ticks
+
+TRAFFIC = {"duration": 150, "seed": 4}
+
+
+def test_chunked_recording_round_trip_and_window(tmp_path, record, strip):
+    """Test that the container loads in full, and a window only decompresses its chunks"""
+    json_path = record(tmp_path / "json", "json", chunk_ticks=32)
+    path = record(tmp_path / "chunked", "chunked", chunk_ticks=32)
+    assert path.suffix == ".recz" and path.stat().st_size * 10 < json_path.stat().st_size
+
+    expected = strip(load_recording(json_path)["history"])
+    assert strip(load_recording(path)["history"]) == expected
+    assert read_metadata(path)["total_ticks"] == 150
+
+    reader = ChunkedRecordingReader(path)
+    assert [chunk["count"] for chunk in reader.chunks] == [32, 32, 32, 32, 22]
+    assert strip(reader.iter_range(70, 90)) == expected[70:90]
+    assert sorted(reader._cache) == [2]
+    assert strip([reader[-1]]) == [expected[-1]]
+
+    window = read_ticks(path, 140, 200)
+    assert window["total"] == 150 and strip(window["history"]) == expected[140:]
+
+
+def test_chunked_recording_without_index_is_readable(tmp_path, record, strip):
+    """Test that an interrupted container recovers every complete chunk"""
+    path = record(tmp_path, "chunked", chunk_ticks=32)
+    reader = ChunkedRecordingReader(path)
+    cut = reader.chunks[3]["offset"] + 10
+    path.write_bytes(path.read_bytes()[:cut])
+
+    recovered = ChunkedRecordingReader(path)
+    assert not recovered.complete and len(recovered) == 96
+    assert recovered.metadata["incomplete"] and recovered.metadata["algorithm"] == "LookV2Controller"
+    assert strip([recovered[95]]) == strip([reader[95]])
+
+
+@pytest.mark.parametrize("format", ["json", "delta", "chunked"])
+@pytest.mark.parametrize("start, stop", [(-1, 200), (50, 10)])
+def test_invalid_tick_range_is_rejected(tmp_path, record, format, start, stop):
+    """Test that every format rejects a negative start or a stop before start"""
+    path = record(tmp_path, format, chunk_ticks=32)
+    with pytest.raises(ValueError):
+        read_ticks(path, start, stop)
+    if format == "chunked":
+        with pytest.raises(ValueError):
+            ChunkedRecordingReader(path).iter_range(start, stop)
@@ -0,0 +1,51 @@
+"""
+Test the columnar NumPy recording backend
+"""
+
+import numpy as np
+
+from elevator.visualization.columnar import ColumnarRecordingWriter, convert_recording, load_columns
+from elevator.visualization.recording_io import load_recording
+
+TRAFFIC = {"elevators": 3, "floors": 7, "duration": 90, "density": 0.6, "seed": 6}
+
+
+def test_columnar_recording_matches_snapshots(tmp_path, record):
+    """Test that the memory-mapped columns hold the same state as the JSON recording"""
+    history = load_recording(record(tmp_path / "json", "json"))["history"]
+    path = record(tmp_path / "columnar", "columnar")
+    assert path.suffix == ".columns" and path.is_dir() and not list(path.glob("*.bin"))
+
+    rec = load_columns(path)
+    assert isinstance(rec["elevator_floor"], np.memmap) and rec["elevator_floor"].shape == (90, 3)
+    assert rec.metadata["total_ticks"] == len(rec) == 90
+    assert rec["tick"].tolist() == [s["tick"] for s in history]
+    assert rec["elevator_load"].tolist() == [[e["load"] for e in s["elevators"]] for s in history]
+    assert rec["floor_up_waiting"].tolist() == [[f["up_waiting"] for f in s["floors"]] for s in history]
+    assert rec.metric("completed_passengers")[-1] == history[-1]["metrics"]["completed_passengers"]
+    stopped = [[e["status"] == "stopped" for e in s["elevators"]] for s in history]
+    assert (rec["elevator_status"] == rec.status_code("stopped")).tolist() == stopped
+
+    boards = rec.events[rec.events["type"] == rec.event_code("passenger_board")]
+    expected = [
+        (i, e["data"]["passenger"])
+        for i, s in enumerate(history)
+        for e in s["events"]
+        if e["type"] == "passenger_board"
+    ]
+    assert list(zip(boards["frame"].tolist(), boards["passenger"].tolist())) == expected
+
+
+def test_interrupted_columnar_recording_is_readable(tmp_path, record):
+    """Test that columns of a run that never closed are mapped from the raw files"""
+    history = load_recording(record(tmp_path / "json", "json"))["history"]
+    writer = ColumnarRecordingWriter(tmp_path / "partial.columns", {"algorithm": "x"})
+    for snapshot in history[:40]:
+        writer.write_snapshot(snapshot)
+    writer._flush()
+    rec = load_columns(tmp_path / "partial.columns")
+    assert not rec.complete and len(rec) == 40 and rec.metadata["incomplete"]
+    assert rec["elevator_target"][39].tolist() == [e["target_floor"] for e in history[39]["elevators"]]
+
+    converted = convert_recording(history, tmp_path / "full.columns", {"algorithm": "x"})
+    assert converted.complete and len(converted) == len(history)
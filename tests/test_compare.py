@@ -0,0 +1,57 @@
+"""
+Test the tick-aligned recording comparison
+"""
+
+import contextlib
+import copy
+import io
+import json
+
+from elevator.client_examples.optimal_look import OptimalLookController
+from elevator.visualization.columnar import ColumnarRecording
+from elevator.visualization.compare import compare, main
+from elevator.visualization.recording_io import load_recording
+
+TRAFFIC = {"elevators": 3, "floors": 8, "duration": 120, "density": 0.6, "seed": 21}
+
+
+def test_divergence_is_located_exactly(tmp_path, record):
+    """Test that identical runs do not diverge and an injected backlog is reported as one regression window"""
+    recording = load_recording(record(tmp_path))
+    history, metadata = recording["history"], recording["metadata"]
+    base = ColumnarRecording.from_snapshots(history, metadata)
+
+    same = compare(base, ColumnarRecording.from_snapshots(history, metadata))
+    assert same["first_divergence"] is None and same["ticks"] == 120
+    assert same["regressions"] == same["improvements"] == [] and same["max_position_divergence"] == 0
+
+    changed = copy.deepcopy(history)
+    by_tick = {snapshot["tick"]: snapshot for snapshot in changed}
+    for tick in range(30, 40):
+        by_tick[tick]["floors"][2]["up_waiting"] += 2
+    for tick in range(60, 63):
+        by_tick[tick]["floors"][0]["down_waiting"] -= 1
+    by_tick[50]["elevators"][1]["current_floor"] += 3
+    report = compare(base, ColumnarRecording.from_snapshots(changed[5:], metadata))
+    assert report["ticks"] == 115 and report["only_in_base"] == 5
+    assert report["first_divergence"] == {"round": 0, "tick": 30, "fields": ["queue", "queue_divergence"]}
+    assert report["max_position_divergence"] == 3 and report["excess_waiting"] == 20 - 3
+    assert report["regressions"] == [
+        {"round": 0, "start_tick": 30, "end_tick": 39, "ticks": 10, "excess_waiting": 20, "peak": 2}
+    ]
+    assert [(w["start_tick"], w["end_tick"]) for w in report["improvements"]] == [(60, 62)]
+
+
+def test_compare_two_controllers(tmp_path, record):
+    """Test the CLI on two controllers running the same traffic in different recording formats"""
+    base = record(tmp_path / "base", "jsonl")
+    candidate = record(tmp_path / "candidate", "chunked", controller=OptimalLookController())
+    output = tmp_path / "report.json"
+    with contextlib.redirect_stdout(io.StringIO()) as stdout:
+        assert main([str(base), str(candidate), "--top", "3", "--output", str(output)]) == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert "first divergence" in stdout.getvalue()
+    assert report["ticks"] == 120 and report["first_divergence"] is not None
+    assert len(report["regressions"]) <= 3 and len(report["improvements"]) <= 3
+    expected = load_recording(candidate)["history"][-1]["metrics"]["completed_passengers"]
+    assert report["final"]["completed_passengers"]["candidate"] == expected
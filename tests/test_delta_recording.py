@@ -0,0 +1,46 @@
+"""
+Test delta-encoded recordings and the seeking reader
+"""
+
+import pytest
+
+from elevator.visualization.delta import DeltaRecordingReader, apply_delta, diff_snapshot
+from elevator.visualization.recording_io import load_recording
+
+TRAFFIC = {"duration": 120, "seed": 8}
+
+
+def test_diff_and_apply_round_trip():
+    """Test that applying a delta rebuilds the snapshot and unchanged entities are omitted"""
+    previous = {
+        "tick": 1,
+        "elevators": [{"id": 0, "current_floor": 1}, {"id": 1, "current_floor": 4}],
+        "floors": [{"floor": 0, "up_waiting": 2}],
+        "metrics": {"completed_passengers": 0},
+        "events": [],
+    }
+    current = {**previous, "tick": 2, "elevators": [{"id": 0, "current_floor": 2}, previous["elevators"][1]]}
+    delta = diff_snapshot(previous, current)
+    assert delta["elevators"] == [[0, {"current_floor": 2}]] and "floors" not in delta and "metrics" not in delta
+    assert apply_delta(previous, delta) == {**current, "timestamp": None}
+    assert diff_snapshot(previous, {**current, "floors": []}) is None
+
+
+def test_delta_recording_matches_full_and_seeks(tmp_path, record, strip):
+    """Test that a delta recording is smaller, loads to the same history, and seeks to any tick"""
+    full_path = record(tmp_path / "full", "jsonl")
+    delta_path = record(tmp_path / "delta", "delta", keyframe_interval=16)
+    assert delta_path.stat().st_size < full_path.stat().st_size * 0.6
+
+    expected = strip(load_recording(full_path)["history"])
+    assert strip(load_recording(delta_path)["history"]) == expected
+
+    reader = DeltaRecordingReader(delta_path)
+    assert len(reader) == len(expected) == 120
+    assert reader.metadata["total_ticks"] == 120 and "incomplete" not in reader.metadata
+    for index in (0, 15, 16, 17, 77, 119, -1):
+        assert strip([reader[index]]) == [expected[index]]
+    assert strip(reader.iter_range(30, 40)) == expected[30:40]
+    for start, stop in ((-1, 10), (40, 30)):
+        with pytest.raises(ValueError):
+            reader.iter_range(start, stop)
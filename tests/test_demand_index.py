@@ -0,0 +1,51 @@
+"""
+Test the event-maintained demand index
+"""
+
+from elevator.client.demand_index import DemandIndex
+from elevator.core.models import Direction, EventType, SimulationEvent
+
+
+def _event(event_type, **data):
+    return SimulationEvent(tick=1, type=event_type, data=data)
+
+
+def test_calls_and_boarding():
+    """Test that call and board events keep sorted floors and counts"""
+    index = DemandIndex()
+    index.apply_event(_event(EventType.UP_BUTTON_PRESSED, floor=5, passenger=1))
+    index.apply_event(_event(EventType.UP_BUTTON_PRESSED, floor=2, passenger=2))
+    index.apply_event(_event(EventType.UP_BUTTON_PRESSED, floor=5, passenger=3))
+    index.apply_event(_event(EventType.DOWN_BUTTON_PRESSED, floor=8, passenger=4))
+    index.apply_event(_event(EventType.IDLE, elevator=0, floor=0))
+
+    assert list(index.floors(Direction.UP)) == [2, 5]
+    assert list(index.floors(Direction.DOWN)) == [8]
+    assert index.count(5, Direction.UP) == 2
+    assert len(index) == 4
+
+    index.apply_event(_event(EventType.PASSENGER_BOARD, elevator=0, floor=5, passenger=1))
+    assert index.count(5, Direction.UP) == 1
+    index.apply_event(_event(EventType.PASSENGER_BOARD, elevator=0, floor=5, passenger=3))
+    assert list(index.floors(Direction.UP)) == [2]
+    assert index.count(5, Direction.UP) == 0
+    # 未知乘客上梯不影响索引
+    assert index.remove_call(99) is None
+    assert len(index) == 2
+
+
+def test_floor_sets():
+    """Test that the per-direction floor sets support ordered queries"""
+    index = DemandIndex()
+    for passenger_id, floor in enumerate([1, 4, 9]):
+        index.add_call(passenger_id, floor, Direction.UP)
+    index.add_call(10, 6, Direction.DOWN)
+
+    assert index.floors(Direction.UP).successor(4) == 9
+    assert index.floors(Direction.DOWN).max() == 6
+    assert list(index.all_floors()) == [1, 4, 6, 9]
+    assert index.all_floors().nearest(5) == 4
+
+    index.clear()
+    assert not index
+    assert index.all_floors().nearest(3) is None
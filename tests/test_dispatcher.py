@@ -0,0 +1,112 @@
+"""
+Test the global cost-matrix dispatcher
+"""
+
+import contextlib
+import io
+import itertools
+
+import numpy as np
+
+from controller import LookV2Controller
+from elevator.client.dispatcher import FULL_PENALTY, GlobalDispatcher, solve_assignment
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.models import Direction, ElevatorState, Position
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+
+
+def _brute_force(cost):
+    n, m = cost.shape
+    if n <= m:
+        return min(sum(cost[i, p[i]] for i in range(n)) for p in itertools.permutations(range(m), n))
+    return min(sum(cost[p[j], j] for j in range(m)) for p in itertools.permutations(range(n), m))
+
+
+def _elevator(elevator_id, floor):
+    return ElevatorState(id=elevator_id, position=Position(current_floor=floor, target_floor=floor))
+
+
+def test_solve_assignment_is_optimal():
+    """Test that the solver matches brute force on small rectangular matrices"""
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        n, m = int(rng.integers(1, 6)), int(rng.integers(1, 6))
+        cost = rng.integers(0, 8, (n, m)).astype(float)
+        assignment, optimal = solve_assignment(cost)
+        assert optimal
+        used = [col for col in assignment if col >= 0]
+        assert len(used) == min(n, m) == len(set(used))
+        total = sum(cost[row, col] for row, col in enumerate(assignment) if col >= 0)
+        assert total == _brute_force(cost)
+
+
+def test_solve_assignment_deadline_falls_back_to_greedy():
+    """Test that an expired deadline still yields a valid matching"""
+    cost = np.random.default_rng(1).random((20, 50))
+    assignment, optimal = solve_assignment(cost, deadline=0.0)
+    assert not optimal
+    used = [col for col in assignment if col >= 0]
+    assert len(used) == 20 == len(set(used))
+
+
+def test_cost_matrix_prefers_nearby_idle_car():
+    """Test ETA ordering and the full-car penalty"""
+    dispatcher = GlobalDispatcher(num_floors=20)
+    elevators = [_elevator(0, 0), _elevator(1, 10), _elevator(2, 12)]
+    elevators[2].passengers = list(range(elevators[2].max_capacity))
+    calls = [(11, Direction.UP), (2, Direction.DOWN)]
+    sweep = [Direction.STOPPED] * 3
+    cost = dispatcher.cost_matrix(elevators, calls, [[], [], []], sweep)
+
+    assert cost[1, 0] < cost[0, 0]
+    assert cost[0, 1] < cost[1, 1]
+    assert cost[2, 0] >= FULL_PENALTY
+
+    result = dispatcher.assign(elevators, calls, [[], [], []], sweep)
+    assert result == {(11, Direction.UP): [1], (2, Direction.DOWN): [0]}
+
+
+def test_assign_splits_demand_by_remaining_capacity():
+    """Test that a queue larger than one car's free seats is shared by several cars"""
+    dispatcher = GlobalDispatcher(num_floors=20)
+    elevators = [_elevator(0, 4), _elevator(1, 6), _elevator(2, 19)]
+    elevators[0].passengers = list(range(6))
+    calls = [(5, Direction.UP), (18, Direction.DOWN)]
+    sweep = [Direction.STOPPED] * 3
+
+    # 5 层 8 人：第一部电梯只剩 4 个座位，再指派一部
+    result = dispatcher.assign(elevators, calls, [[], [], []], sweep, waiting=[8, 1])
+    assert sorted(result[(5, Direction.UP)]) == [0, 1]
+    assert result[(18, Direction.DOWN)] == [2]
+    assert dispatcher.calls_of(1) == [(5, Direction.UP)]
+
+    # 装得下时只指派一部
+    result = dispatcher.assign(elevators, calls, [[], [], []], sweep, waiting=[3, 1])
+    assert len(result[(5, Direction.UP)]) == 1
+
+
+def test_cost_matrix_counts_detours():
+    """Test that a call behind the sweep costs a full detour"""
+    dispatcher = GlobalDispatcher(num_floors=20)
+    elevators = [_elevator(0, 5)]
+    calls = [(8, Direction.UP), (8, Direction.DOWN), (3, Direction.UP)]
+    cost = dispatcher.cost_matrix(elevators, calls, [[7, 15]], [Direction.UP])
+
+    # 顺路：途中停靠 7 层
+    assert cost[0, 0] < cost[0, 1]
+    # 反向呼叫需先到 15 层再折返
+    assert cost[0, 1] < cost[0, 2]
+
+
+def test_controller_with_dispatcher_completes_run():
+    """Test that the dispatcher-driven controller delivers every passenger"""
+    traffic = create_random_traffic_pattern(3, 10, duration=60, density=0.5, seed=4)
+    traffic.metadata["duration"] = 400
+    simulation = ElevatorSimulation(traffic)
+    controller = LookV2Controller()
+    controller.api_client = LocalAPIClient(simulation)
+    controller.recorder = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller.start()
+    metrics = simulation.round_results[0]["metrics"]
+    assert metrics["completed_passengers"] == metrics["total_passengers"] > 0
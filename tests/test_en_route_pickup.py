@@ -0,0 +1,66 @@
+"""
+Test en-route pickups of moving LOOK V2 cars
+"""
+
+import contextlib
+import io
+from types import SimpleNamespace
+
+from benchmarks.algorithms import _CapturingSimulation
+from controller import LookV2Controller
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.models import Direction, TrafficEntry, TrafficPattern
+
+
+def _run(en_route_pickup):
+    traffic = TrafficPattern(
+        name="en_route",
+        description="A same-direction call appears ahead of a moving car",
+        entries=[
+            TrafficEntry(id=1, origin=0, destination=10, tick=1),
+            TrafficEntry(id=2, origin=6, destination=9, tick=10),
+        ],
+        metadata={"elevators": 1, "floors": 12, "duration": 200},
+    )
+    simulation = _CapturingSimulation(traffic)
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = LookV2Controller(debug=False, en_route_pickup=en_route_pickup)
+        controller.api_client = LocalAPIClient(simulation)
+        controller.recorder = None
+        controller.start()
+    (_, _, first_dropoff, _), (_, second_pickup, _, _) = simulation.captured
+    return second_pickup, first_dropoff
+
+
+def test_moving_car_stops_for_call_ahead():
+    """Test that a call appearing ahead of a moving car is picked up on the way"""
+    second_pickup, first_dropoff = _run(en_route_pickup=True)
+    assert 0 < second_pickup < first_dropoff
+    second_pickup, first_dropoff = _run(en_route_pickup=False)
+    assert second_pickup > first_dropoff
+
+
+def test_en_route_guards():
+    """Test that stopped cars and stops without riders continuing are not retargeted"""
+    controller = LookV2Controller(debug=False, use_dispatcher=False)
+    controller.demand.add_call(100, 5, Direction.UP)
+    commands = []
+
+    def car(direction, riders):
+        return SimpleNamespace(
+            id=0,
+            target_floor=8,
+            target_floor_direction=direction,
+            passengers=list(riders),
+            max_capacity=10,
+            go_to_floor=lambda floor, immediate=False: commands.append((floor, immediate)),
+        )
+
+    controller.elevators = []
+    controller.passenger_destinations = {1: 5, 2: 8}
+    controller._retarget_en_route(car(Direction.STOPPED, [2]), 3, Direction.UP)
+    controller._retarget_en_route(car(Direction.UP, [1]), 3, Direction.UP)
+    controller._retarget_en_route(car(Direction.UP, [2]), 5, Direction.UP)
+    assert commands == []
+    controller._retarget_en_route(car(Direction.UP, [2]), 3, Direction.UP)
+    assert commands == [(5, True)]
@@ -0,0 +1,48 @@
+"""
+Test the bitmask-backed ordered floor set
+"""
+
+import random
+
+import pytest
+
+from elevator.client.floor_set import FloorSet
+
+
+def test_ordered_queries_match_brute_force():
+    """Test successor/predecessor/nearest against a plain sorted list on 200 floors"""
+    rng = random.Random(5)
+    for _ in range(50):
+        floors = sorted(rng.sample(range(200), rng.randrange(0, 30)))
+        floor_set = FloorSet(floors)
+        assert list(floor_set) == floors
+        assert len(floor_set) == len(floors)
+        assert floor_set.min() == (floors[0] if floors else None)
+        assert floor_set.max() == (floors[-1] if floors else None)
+        for floor in range(-1, 201):
+            above = [f for f in floors if f > floor]
+            below = [f for f in floors if f < floor]
+            assert floor_set.successor(floor) == (above[0] if above else None)
+            assert floor_set.predecessor(floor) == (below[-1] if below else None)
+            assert list(floor_set.above(floor)) == above
+            assert list(floor_set.below(floor)) == below
+            expected = min(floors, key=lambda f: (abs(f - floor), f)) if floors else None
+            assert floor_set.nearest(floor) == expected
+
+
+def test_mutation_and_set_operations():
+    """Test add/discard and the set operators"""
+    floor_set = FloorSet([3, 7])
+    floor_set.add(0)
+    floor_set.discard(7)
+    floor_set.discard(50)
+    assert list(floor_set) == [0, 3]
+    assert 3 in floor_set and 7 not in floor_set and -1 not in floor_set
+    assert list(floor_set | FloorSet([5])) == [0, 3, 5]
+    assert list(floor_set & FloorSet([3, 5])) == [3]
+    assert list(floor_set - FloorSet([0])) == [3]
+    assert floor_set == FloorSet([3, 0])
+    with pytest.raises(ValueError):
+        floor_set.add(-1)
+    with pytest.raises(TypeError):
+        hash(floor_set)
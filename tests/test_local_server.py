@@ -0,0 +1,59 @@
+"""
+Test the local simulator HTTP server against the real API client
+"""
+
+from elevator.client.api_client import ElevatorAPIClient
+from elevator.core.models import EventType
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+from elevator.server.local_server import LocalSimulatorServer
+
+
+def test_api_client_round_trip():
+    """Test all documented endpoints through ElevatorAPIClient"""
+    traffic = create_random_traffic_pattern(2, 6, duration=50, density=0.5, seed=7)
+    with LocalSimulatorServer(ElevatorSimulation(traffic)) as server:
+        client = ElevatorAPIClient(server.url)
+        assert client.register_client("algorithm")
+        assert client.get_traffic_info()["max_tick"] == 50
+
+        state = client.get_state()
+        assert state.tick == 0
+        assert len(state.elevators) == 2
+        assert len(state.floors) == 6
+
+        assert client.go_to_floor(0, 3)
+        response = client.step(1)
+        assert response.tick == 1
+        assert any(e.type == EventType.ELEVATOR_MOVE for e in response.events)
+
+        client.mark_tick_processed()
+        state = client.get_state()
+        assert state.tick == 1
+        assert state.elevators[0].target_floor == 3
+
+        assert not client.go_to_floor(0, 99)
+        assert client.reset()
+        assert client.get_state(force_reload=True).tick == 0
+        assert not client.next_traffic_round()
+        assert client.next_traffic_round(full_reset=True)
+
+
+def test_unknown_route_returns_error():
+    """Test that unknown routes are reported as errors"""
+    with LocalSimulatorServer() as server:
+        status, body = server.api.handle("GET", "/api/unknown", {}, {})
+        assert status == 404
+        assert "error" in body
+
+
+def test_malformed_requests_return_400():
+    """Test that missing or invalid fields and out-of-range targets are client errors"""
+    with LocalSimulatorServer() as server:
+        status, body = server.api.handle("POST", "/api/elevators/0/go_to_floor", {}, {})
+        assert status == 400 and body["error"] == "Missing field: floor"
+        status, body = server.api.handle("POST", "/api/elevators/0/go_to_floor", {"floor": "x"}, {})
+        assert status == 400 and "floor" in body["error"]
+        status, _ = server.api.handle("POST", "/api/elevators/99/go_to_floor", {"floor": 0}, {})
+        assert status == 400
+        status, _ = server.api.handle("POST", "/api/step", {"ticks": None}, {})
+        assert status == 400
@@ -0,0 +1,62 @@
+"""
+Test the multi-resolution recording tiers
+"""
+
+from elevator.visualization.lod import LodAggregator, choose_factor, lod_path, read_lod_window
+from elevator.visualization.recording_io import load_recording
+
+TRAFFIC = {"duration": 250, "density": 0.6, "seed": 9}
+
+
+def test_aggregator_summarizes_window():
+    """Test that an aggregated snapshot keeps the last state and window statistics"""
+    aggregator = LodAggregator(3)
+    frames = [
+        {
+            "tick": tick,
+            "elevators": [{"id": 0, "current_floor": floor, "load": load, "status": status}],
+            "floors": [{"floor": 0, "up_waiting": up, "down_waiting": 1}],
+            "metrics": {"completed_passengers": tick},
+            "events": [{"type": "idle", "data": {}}] * tick,
+        }
+        for tick, floor, load, status, up in [
+            (1, 2, 4, "stopped", 3),
+            (2, 3, 2, "start_up", 0),
+            (3, 5, 0, "stopped", 1),
+        ]
+    ]
+    assert aggregator.add(frames[0]) is None and aggregator.add(frames[1]) is None
+    summary = aggregator.add(frames[2])
+    elevator = summary["elevators"][0]
+    assert summary["tick"] == 3 and summary["tick_start"] == 1 and summary["frames"] == [0, 3]
+    assert (elevator["current_floor"], elevator["load_mean"], elevator["load_max"]) == (5, 2, 4)
+    assert (elevator["moving_ticks"], elevator["floor_min"], elevator["floor_max"]) == (1, 2, 5)
+    assert summary["floors"][0]["up_waiting_max"] == 3 and summary["floors"][0]["waiting_mean"] == 7 / 3
+    assert summary["event_counts"] == {"idle": 6} and summary["metrics"]["completed_passengers"] == 3
+    assert aggregator.flush() is None
+
+
+def test_recorder_writes_tiers_and_server_picks_by_zoom(tmp_path, record):
+    """Test that both recorder paths write the tiers and the window picks the finest tier that fits"""
+    json_path = record(tmp_path / "json", "json", lod_factors=(10, 100))
+    jsonl_path = record(tmp_path / "jsonl", "jsonl", lod_factors=(10, 100))
+    for path in (json_path, jsonl_path):
+        assert lod_path(path, 10).exists() and lod_path(path, 100).exists()
+
+    history = load_recording(json_path)["history"]
+    assert choose_factor(250, 1000) == 1 and choose_factor(250, 100) == 10 and choose_factor(250, 10) == 100
+
+    full = read_lod_window(jsonl_path, 40, 60, max_points=100)
+    assert full["factor"] == 1 and [s["tick"] for s in full["history"]] == [s["tick"] for s in history[40:60]]
+    coarse = read_lod_window(jsonl_path, 0, None, max_points=30)
+    assert coarse["factor"] == 10 and coarse["total"] == 250 and len(coarse["history"]) == 25
+    assert coarse["history"][4]["tick"] == history[49]["tick"] and coarse["history"][4]["frames"] == [40, 10]
+    assert read_lod_window(json_path, 0, 250, max_points=5)["history"][-1]["frames"] == [200, 50]
+
+
+def test_tiers_are_built_for_old_recordings(tmp_path, record):
+    """Test that a recording without tiers gets them generated on first request"""
+    path = record(tmp_path, "json", lod_factors=())
+    assert not lod_path(path, 10).exists()
+    window = read_lod_window(path, 0, 250, max_points=100)
+    assert window["factor"] == 10 and len(window["history"]) == 25 and lod_path(path, 100).exists()
@@ -0,0 +1,83 @@
+"""
+Test the leveled logging subsystem
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from controller import LookV2Controller
+from elevator.client.local_client import LocalAPIClient
+from elevator.client_examples.optimal_look import OptimalLookController
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+from elevator.utils import log
+from elevator.utils.debug import debug_log, is_debug_enabled, set_debug_mode
+
+
+@pytest.fixture
+def captured():
+    stream = io.StringIO()
+    level = log.get_level()
+    log.configure(level=log.INFO, stream=stream, buffer_size=3)
+    yield stream
+    log.configure(level=level, stream=log._STDERR, buffer_size=log.DEFAULT_BUFFER_SIZE)
+
+
+def test_disabled_levels_do_not_build_messages(captured):
+    """Test that messages below the threshold are never formatted"""
+    logger = log.get_logger("test")
+    built = []
+    logger.debug(lambda: built.append(1) or "hidden")
+    logger.info(lambda: built.append(2) or "shown %d")
+    logger.info("E%d -> F%d", 1, 5)
+    assert built == [2]
+    assert [record.message for record in log.recent()][-2:] == ["shown %d", "E1 -> F5"]
+
+
+def test_ring_buffer_and_batched_flush(captured):
+    """Test that only recent records are kept and pending records are written in one batch"""
+    logger = log.get_logger("test")
+    for i in range(5):
+        logger.warning("record %d", i)
+    assert [record.message for record in log.recent()] == ["record 2", "record 3", "record 4"]
+    assert [record.message for record in log.recent(1, level=log.WARNING)] == ["record 4"]
+    log.flush()
+    assert captured.getvalue().splitlines() == [f"[WARNING] test: record {i}" for i in range(5)]
+
+
+def test_debug_log_follows_debug_mode(captured):
+    """Test that debug_log is silent unless debug mode is enabled"""
+    debug_log("quiet %s", "call")
+    assert not is_debug_enabled()
+    set_debug_mode(True)
+    debug_log("loud %s", "call")
+    assert is_debug_enabled()
+    log.flush()
+    assert captured.getvalue() == "[DEBUG] elevator: loud call\n"
+
+
+def test_debug_controller_restores_level(captured):
+    """Test that debug=True only raises verbosity for the duration of that controller's run"""
+    controller = LookV2Controller(debug=True)
+    assert log.get_level() == log.INFO
+    simulation = ElevatorSimulation(create_random_traffic_pattern(2, 5, duration=10, density=0.5, seed=3))
+    controller.api_client = LocalAPIClient(simulation)
+    controller.recorder = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller.start()
+    assert log.get_level() == log.INFO
+    assert any(record.level == log.DEBUG for record in log.recent(level=log.DEBUG))
+
+
+def test_optimal_look_logs_instead_of_printing(captured):
+    """Test that OptimalLookController reports through the logger rather than stdout"""
+    controller = OptimalLookController()
+    simulation = ElevatorSimulation(create_random_traffic_pattern(2, 5, duration=10, density=0.5, seed=3))
+    controller.api_client = LocalAPIClient(simulation)
+    controller.recorder = None
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        controller.start()
+    assert "[OPTIMAL LOOK]" not in stdout.getvalue()
+    assert "[OPTIMAL LOOK] 算法初始化" in [record.message for record in log.recent(level=log.INFO)]
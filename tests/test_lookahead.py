@@ -0,0 +1,98 @@
+"""
+Test lookahead planning on local simulation forks
+"""
+
+from elevator.client.api_client import ElevatorAPIClient
+from elevator.client.base_controller import ElevatorController
+from elevator.client.lookahead import LookaheadPlanner
+from elevator.core.models import create_simple_traffic_pattern
+from elevator.core.simulator import ElevatorSimulation
+from elevator.server.local_server import LocalSimulatorServer
+
+
+class _NoopController(ElevatorController):
+    """不做任何决策的控制器，仅用于测试前瞻API"""
+
+    def on_init(self, elevators, floors):
+        pass
+
+    def on_event_execute_start(self, tick, events, elevators, floors):
+        pass
+
+    def on_event_execute_end(self, tick, events, elevators, floors):
+        pass
+
+    def on_passenger_call(self, passenger, floor, direction):
+        pass
+
+    def on_elevator_idle(self, elevator):
+        pass
+
+    def on_elevator_stopped(self, elevator, floor):
+        pass
+
+    def on_passenger_board(self, elevator, passenger):
+        pass
+
+    def on_passenger_alight(self, elevator, passenger, floor):
+        pass
+
+    def on_elevator_passing_floor(self, elevator, floor, direction):
+        pass
+
+    def on_elevator_approaching(self, elevator, floor, direction):
+        pass
+
+
+def _waiting_simulation():
+    traffic = create_simple_traffic_pattern("lookahead", [(0, 5, 1), (4, 0, 1)])
+    traffic.metadata.update({"elevators": 1, "floors": 6, "duration": 100})
+    sim = ElevatorSimulation(traffic)
+    sim.step(1)
+    return sim
+
+
+def test_better_plan_has_lower_cost():
+    """Test that serving both calls beats an idle plan"""
+    sim = _waiting_simulation()
+    planner = LookaheadPlanner(sim)
+    idle = planner.evaluate({}, ticks=60)
+    serve = planner.evaluate({0: [5, 4, 0]}, ticks=60)
+
+    assert idle.waiting_passengers == 2
+    assert serve.completed_passengers == 2
+    assert serve.cost < idle.cost
+    assert serve.finished_plans == {0}
+    # 基准模拟不受前瞻影响
+    assert sim.tick == 1
+
+
+def test_budget_truncates_and_many_evaluates_in_order():
+    """Test that the budget truncates evaluation and evaluate_many runs plans sequentially in input order"""
+    planner = LookaheadPlanner(_waiting_simulation())
+    truncated = planner.evaluate({0: 5}, ticks=10_000, budget_ms=0)
+    assert truncated.truncated
+    assert truncated.ticks == 0
+
+    results = planner.evaluate_many([{0: 5}, {0: [5, 4, 0]}], ticks=60)
+    assert [r.plan for r in results] == [{0: [5]}, {0: [5, 4, 0]}]
+    # 所有方案共享同一个预算，预算耗尽后每个方案都被截断但仍按输入顺序返回
+    exhausted = planner.evaluate_many([{0: 5}, {0: 4}], ticks=10_000, budget_ms=0)
+    assert [r.plan for r in exhausted] == [{0: [5]}, {0: [4]}]
+    assert all(r.truncated for r in exhausted)
+
+
+def test_controller_simulate_ahead_from_client_state():
+    """Test simulate_ahead against the state fetched over HTTP"""
+    with LocalSimulatorServer(_waiting_simulation()) as server:
+        controller = _NoopController(server.url, enable_recording=False)
+        client_state = ElevatorAPIClient(server.url).get_state()
+        assert (
+            ElevatorSimulation.from_state(client_state).get_state()["floors"] == server.simulation.get_state()["floors"]
+        )
+
+        result = controller.simulate_ahead({0: [5, 4, 0]}, ticks=60, budget_ms=1000)
+        assert result.completed_passengers == 2
+        results = controller.simulate_ahead_many([{0: 5}, {0: 4}], ticks=30, budget_ms=1000)
+        assert len(results) == 2
+        assert server.simulation.tick == 1
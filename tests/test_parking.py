@@ -0,0 +1,88 @@
+"""
+Test the demand-forecasting idle parking policy
+"""
+
+import contextlib
+import io
+import itertools
+
+import numpy as np
+
+from controller import LookV2Controller
+from elevator.client.local_client import LocalAPIClient
+from elevator.client.parking import DemandForecast, ParkingPlanner, parking_floors
+from elevator.core.simulator import ElevatorSimulation, create_down_peak_traffic_pattern
+
+
+def _brute_force_cost(weights, count):
+    floors = range(len(weights))
+    return min(
+        sum(w * min(abs(f - p) for p in parks) for f, w in zip(floors, weights))
+        for parks in itertools.combinations(floors, count)
+    )
+
+
+def test_parking_floors_minimize_expected_distance():
+    """Test that the k-median matches brute force"""
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        weights = rng.random(9) * (rng.random(9) < 0.6)
+        for count in (1, 2, 3):
+            parks = parking_floors(weights, count)
+            assert parks == sorted(parks) and len(parks) == count
+            cost = sum(w * min(abs(f - p) for p in parks) for f, w in enumerate(weights))
+            assert abs(cost - _brute_force_cost(weights, count)) < 1e-9
+    assert parking_floors(np.ones(3), 5) == [0, 1, 2]
+
+
+def test_forecast_decays_old_calls():
+    """Test that recent calls outweigh old ones"""
+    forecast = DemandForecast(4, half_life=10)
+    forecast.record_call(3, tick=0)
+    forecast.record_call(1, tick=10)
+    histogram = forecast.histogram(10)
+    assert histogram[1] == 1.0 and abs(histogram[3] - 0.5) < 1e-12
+
+
+def test_planner_spreads_cars_by_floor_order():
+    """Test that idle cars park across demand zones without crossing"""
+    planner = ParkingPlanner(20, prior_weight=0.0)
+    for tick in range(10):
+        planner.record_call(2, tick)
+        planner.record_call(15, tick)
+    assert planner.assign({7: 18, 8: 0}, tick=10) == {8: 2, 7: 15}
+    # 电梯比楼层多时多出的电梯原地待命
+    small = ParkingPlanner(2)
+    assert small.assign({0: 0, 1: 1, 2: 1}, tick=0) == {0: 0, 1: 1, 2: 1}
+
+
+def test_look_v2_parks_idle_cars_and_delivers():
+    """Test that parked cars wake up for new calls and every passenger is delivered"""
+    traffic = create_down_peak_traffic_pattern(3, 12, duration=150, density=0.1, seed=2)
+    traffic.metadata["duration"] = 400
+    simulation = ElevatorSimulation(traffic)
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = LookV2Controller(debug=False)
+        controller.api_client = LocalAPIClient(simulation)
+        controller.recorder = None
+        controller.start()
+    metrics = simulation.round_results[0]["metrics"]
+    assert metrics["completed_passengers"] == metrics["total_passengers"] > 0
+    assert controller._parked
+
+
+def test_parking_defaults_to_in_process_simulator_only():
+    """Test that HTTP clients keep the F0/F1 standby bounce unless parking is asked for explicitly"""
+    controller = LookV2Controller(debug=False)
+    controller.on_init([], [])
+    assert controller.parking is None
+
+    controller.api_client = LocalAPIClient(
+        ElevatorSimulation(create_down_peak_traffic_pattern(1, 4, duration=10, density=0.1))
+    )
+    controller.on_init([], [])
+    assert controller.parking is not None
+
+    controller = LookV2Controller(debug=False, use_parking=True)
+    controller.on_init([], [])
+    assert controller.parking is not None
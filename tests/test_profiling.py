@@ -0,0 +1,58 @@
+"""
+Test per-callback latency profiling
+"""
+
+import contextlib
+import io
+import json
+
+from controller import LookV2Controller
+from elevator.client.api_client import ElevatorAPIClient
+from elevator.client.profiling import CallbackProfiler, LatencyHistogram
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+from elevator.server.local_server import LocalSimulatorServer
+
+
+def test_histogram_percentiles():
+    """Test power-of-two bucket percentiles"""
+    histogram = LatencyHistogram()
+    for microseconds in [1, 3, 3, 100, 5000]:
+        histogram.add(microseconds / 1e6)
+    assert histogram.count == 5
+    assert histogram.percentile(50) == 4 / 1e6
+    assert histogram.percentile(100) == 5000 / 1e6
+    assert histogram.to_dict()["buckets_us"] == {"<2": 1, "<4": 2, "<128": 1, "<8192": 1}
+
+
+def test_slow_ticks_keep_the_slowest():
+    """Test that only the slowest ticks over budget are reported"""
+    profiler = CallbackProfiler(budget_ms=0.0, max_slow_ticks=2)
+    for tick in range(1, 6):
+        profiler.begin_tick()
+        profiler.mark_callback("on_elevator_stopped")
+        profiler._current.phases["dispatch"] = tick / 1e3
+        profiler.end_tick(tick)
+    assert profiler.slow_tick_count == 5
+    assert [profile.tick for profile in profiler.slow_ticks] == [5, 4]
+    assert profiler.report()["callbacks"]["on_elevator_stopped"]["count"] == 5
+
+
+def test_controller_profiles_a_run_over_http(tmp_path):
+    """Test that a profiled run breaks ticks into phases and writes the report"""
+    traffic = create_random_traffic_pattern(2, 8, duration=40, density=0.5, seed=3)
+    output = tmp_path / "profile.json"
+    with LocalSimulatorServer(ElevatorSimulation(traffic)) as server, contextlib.redirect_stdout(io.StringIO()):
+        controller = LookV2Controller(server_url=server.url)
+        controller.api_client = ElevatorAPIClient(server.url)
+        controller.recorder = None
+        controller.enable_profiling(budget_ms=1000.0, output=output)
+        controller.start()
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report == json.loads(json.dumps(controller.profiling_report()))
+    assert report["ticks"]["count"] == 40
+    assert report["phases"]["network"]["total_ms"] > 0
+    assert report["phases"]["decode"]["total_ms"] > 0
+    assert report["callbacks"]["on_event_execute_end"]["count"] == 40
+    assert report["callbacks"]["on_passenger_call"]["count"] > 0
+    assert report["slow_tick_count"] == 0
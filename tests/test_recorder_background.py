@@ -0,0 +1,52 @@
+"""
+Test the recorder's background writer thread
+"""
+
+import threading
+
+import pytest
+
+from elevator.client.local_client import LocalAPIClient
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+from elevator.visualization.recorder import SimulationRecorder
+from elevator.visualization.recording_io import load_recording
+
+TRAFFIC = {"duration": 50, "seed": 2}
+
+
+def test_background_recording_matches_synchronous(tmp_path, record, strip):
+    """Test that the writer thread produces the same recording as synchronous recording"""
+    expected = load_recording(record(tmp_path / "sync"))
+    recorded = load_recording(record(tmp_path / "background", background=True, queue_size=4))
+    assert strip(recorded["history"]) == strip(expected["history"])
+    assert recorded["metadata"]["total_ticks"] == 50 and "dropped_ticks" not in recorded["metadata"]
+
+
+def test_drop_policy_counts_dropped_ticks(tmp_path):
+    """Test that a full queue drops ticks instead of blocking the caller"""
+    recorder = SimulationRecorder(tmp_path, background=True, queue_size=2, when_full="drop")
+    started, release = threading.Event(), threading.Event()
+    record = recorder._record
+
+    def _stuck_record(*args):
+        started.set()
+        release.wait()
+        record(*args)
+
+    recorder._record = _stuck_record
+    state = LocalAPIClient(ElevatorSimulation(create_random_traffic_pattern(1, 3, duration=5, density=0.1))).get_state()
+    recorder.record_state(state, [])
+    started.wait(5)
+    for _ in range(9):
+        recorder.record_state(state, [])
+    release.set()
+    metadata = load_recording(recorder.save())["metadata"]
+    assert metadata["total_ticks"] == 3 and metadata["dropped_ticks"] == 7
+
+
+def test_writer_errors_surface_on_save(tmp_path):
+    """Test that an exception in the writer thread is raised by save()"""
+    recorder = SimulationRecorder(tmp_path, background=True)
+    recorder.record_state(None, [])
+    with pytest.raises(AttributeError):
+        recorder.save()
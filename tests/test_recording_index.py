@@ -0,0 +1,43 @@
+"""
+Test the recording metadata sidecars and the listing cache
+"""
+
+import os
+
+from elevator.visualization.recording_index import RecordingIndex, read_sidecar, sidecar_path
+
+TRAFFIC = {"floors": 5, "duration": 30, "seed": 1}
+
+
+def test_save_writes_sidecar_and_listing_skips_parsing(tmp_path, record):
+    """Test that saved recordings are listed from their sidecars without being parsed"""
+    json_path = record(tmp_path)
+    jsonl_path = record(tmp_path, "jsonl")
+    assert read_sidecar(json_path)["total_ticks"] == 30
+    assert read_sidecar(jsonl_path)["algorithm"] == "LookV2Controller"
+
+    index = RecordingIndex(tmp_path)
+    listed = index.list()
+    assert sorted(r["filename"] for r in listed) == sorted([json_path.name, jsonl_path.name])
+    assert index.parsed == 0 and all(r["metadata"]["total_ticks"] == 30 for r in listed)
+
+
+def test_listing_cache_revalidates_changed_files(tmp_path, record):
+    """Test that stale or missing sidecars fall back to parsing once, and deleted files drop out"""
+    path = record(tmp_path)
+    sidecar_path(path).unlink()
+    index = RecordingIndex(tmp_path)
+    assert index.list()[0]["metadata"]["total_ticks"] == 30 and index.parsed == 1
+    assert sidecar_path(path).exists()
+    index.list()
+    assert index.parsed == 1
+
+    # 记录被改写后旁注失效
+    text = path.read_text(encoding="utf-8").replace('"total_ticks": 30', '"total_ticks": 31')
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    assert read_sidecar(path) is None
+    assert index.list()[0]["metadata"]["total_ticks"] == 31 and index.parsed == 2
+
+    path.unlink()
+    assert index.list() == []
@@ -0,0 +1,138 @@
+"""
+Test the size-bounded recording store
+"""
+
+import os
+import shutil
+import time
+
+from elevator.visualization.lod import build_lod
+from elevator.visualization.recorder import SimulationRecorder
+from elevator.visualization.recording_index import RecordingIndex, read_sidecar
+from elevator.visualization.recording_io import load_recording
+from elevator.visualization.recording_store import RecordingStore
+
+
+def _populate(directory, source, count):
+    """复制出 count 个修改时间依次增加一分钟的记录，返回从旧到新的路径"""
+    base = time.time() - 3600
+    paths = []
+    for i in range(count):
+        path = directory / f"run_{i}{source.suffix}"
+        shutil.copy(source, path)
+        os.utime(path, (base + 60 * i, base + 60 * i))
+        paths.append(path)
+    return paths
+
+
+def test_old_recordings_are_compacted(tmp_path, record):
+    """Test that recordings past keep_full become .recz with the same content, mtime and companions cleaned up"""
+    source = record(tmp_path / "source")
+    jsonl = record(tmp_path / "source", "jsonl")
+    directory = tmp_path / "store"
+    directory.mkdir()
+    paths = _populate(directory, source, 3)
+    shutil.copy(jsonl, directory / "stream.jsonl")
+    os.utime(directory / "stream.jsonl", (time.time() - 7200, time.time() - 7200))
+    build_lod(paths[0])
+    (directory / "deleted.json.meta").write_text("{}", encoding="utf-8")
+
+    mtime = paths[0].stat().st_mtime_ns
+    store = RecordingStore(directory, quota_bytes=0, keep_full=2)
+    store.track(*paths, directory / "stream.jsonl", directory / "deleted.json")
+    report = store.enforce()
+    assert report["compacted"] == 2 and report["removed"] == 0 and report["freed"] > 0
+    names = sorted(p.name for p in directory.iterdir())
+    assert names == sorted(
+        [
+            ".recording_store",
+            "run_0.recz",
+            "run_0.recz.meta",
+            "run_1.json",
+            "run_2.json",
+            "stream.recz",
+            "stream.recz.meta",
+        ]
+    )
+
+    compacted = directory / "run_0.recz"
+    assert compacted.stat().st_mtime_ns == mtime
+    assert load_recording(compacted)["history"] == load_recording(source)["history"]
+    assert load_recording(directory / "stream.recz")["history"] == load_recording(jsonl)["history"]
+    assert read_sidecar(compacted)["compacted_from"] == "json"
+    assert [r["filename"] for r in RecordingIndex(directory).list()] == [
+        "run_2.json",
+        "run_1.json",
+        "run_0.recz",
+        "stream.recz",
+    ]
+
+
+def test_quota_removes_oldest_recordings(tmp_path, record):
+    """Test that the quota deletes the oldest recordings with their companions but never the newest"""
+    source = record(tmp_path / "source")
+    directory = tmp_path / "store"
+    directory.mkdir()
+    paths = _populate(directory, source, 4)
+    build_lod(paths[0])
+    size = sum(p.stat().st_size for p in directory.iterdir()) // 4
+
+    store = RecordingStore(directory, quota_bytes=int(size * 2.5), keep_full=10)
+    store.track(*paths)
+    report = store.add(paths[-1])
+    assert report["removed"] == 2 and report["compacted"] == 0
+    assert sorted(p.name for p in directory.iterdir()) == [".recording_store", "run_2.json", "run_3.json"]
+
+    report = RecordingStore(directory, quota_bytes=1, keep_full=10).add(paths[2])
+    assert report["removed"] == 0
+    assert sorted(p.name for p in directory.iterdir()) == [".recording_store", "run_2.json", "run_3.json"]
+
+
+def test_latest_rescans_only_when_the_directory_changes(tmp_path, record):
+    """Test that latest() is answered from the index until a recording is added"""
+    source = record(tmp_path / "source")
+    directory = tmp_path / "store"
+    directory.mkdir()
+    paths = _populate(directory, source, 3)
+    past = time.time() - 60
+    os.utime(directory, (past, past))
+
+    store = RecordingStore(directory, quota_bytes=0)
+    assert store.latest() == paths[-1] and store.scans == 1
+    assert store.latest() == paths[-1] and store.scans == 1
+
+    newest = directory / "newest.json"
+    shutil.copy(source, newest)
+    assert store.latest() == newest and store.scans == 2
+    assert [r.path for r in store.list()] == [newest, *paths[::-1]]
+
+    saved = record(directory, "jsonl")
+    assert store.latest() == saved
+
+
+def test_untracked_recordings_are_never_touched(tmp_path, record):
+    """Test that the store only compacts and deletes recordings it added itself"""
+    source = record(tmp_path / "source")
+    directory = tmp_path / "store"
+    directory.mkdir()
+    foreign = _populate(directory, source, 3)
+    (directory / "gone.json.meta").write_text("{}", encoding="utf-8")
+    before = {p.name: p.read_bytes() for p in directory.iterdir()}
+
+    saved = record(directory)
+    store = RecordingStore(directory, quota_bytes=1, keep_full=1)
+    report = store.add(saved)
+    assert report == {"compacted": 0, "removed": 0, "freed": 0}
+    assert {p.name: p.read_bytes() for p in foreign + [directory / "gone.json.meta"]} == before
+    assert store.latest() == saved
+
+
+def test_recorder_uses_a_store_only_when_configured(tmp_path, monkeypatch):
+    """Test that the recorder leaves its directory alone unless a store or the environment asks for one"""
+    monkeypatch.delenv("ELEVATOR_RECORDING_QUOTA_MB", raising=False)
+    monkeypatch.delenv("ELEVATOR_RECORDING_KEEP_FULL", raising=False)
+    assert SimulationRecorder(tmp_path).store is None
+
+    monkeypatch.setenv("ELEVATOR_RECORDING_KEEP_FULL", "2")
+    store = SimulationRecorder(tmp_path).store
+    assert store is not None and store.keep_full == 2
@@ -0,0 +1,38 @@
+"""
+Test the streaming JSONL recording format
+"""
+
+import json
+
+from elevator.visualization.recorder import SimulationRecorder
+from elevator.visualization.recording_io import list_recording_files, load_recording, read_metadata
+
+TRAFFIC = {"floors": 8, "duration": 40, "seed": 5}
+
+
+def test_jsonl_matches_json_recording(tmp_path, record, strip):
+    """Test that a streamed recording loads to the same content as the JSON one"""
+    streamed = SimulationRecorder(tmp_path / "jsonl", format="jsonl")
+    record(recorder=streamed)
+    assert streamed.history == [] and streamed.saved_path.suffix == ".jsonl"
+    stored = SimulationRecorder(tmp_path / "json")
+    record(recorder=stored)
+
+    jsonl, whole = load_recording(streamed.saved_path), load_recording(stored.saved_path)
+    assert strip(jsonl["history"]) == strip(whole["history"])
+    assert jsonl["metadata"]["total_ticks"] == whole["metadata"]["total_ticks"] == 40
+    assert read_metadata(streamed.saved_path) == jsonl["metadata"]
+    assert list_recording_files(tmp_path / "jsonl") == [streamed.saved_path]
+
+
+def test_jsonl_interrupted_run_is_readable(tmp_path, record):
+    """Test that a recording without a trailer and with a torn last line still loads"""
+    path = record(tmp_path / "jsonl", "jsonl")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0])["type"] == "header" and json.loads(lines[-1])["type"] == "trailer"
+    path.write_text("\n".join(lines[:11]) + "\n" + lines[11][:20], encoding="utf-8")
+
+    recording = load_recording(path)
+    assert len(recording["history"]) == 10
+    assert recording["metadata"]["incomplete"] and recording["metadata"]["total_ticks"] == 10
+    assert read_metadata(path)["algorithm"] == "LookV2Controller"
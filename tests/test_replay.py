@@ -0,0 +1,69 @@
+"""
+Test replaying a recorded run in the local engine
+"""
+
+import contextlib
+import io
+
+from controller import LookV2Controller
+from elevator.client.replay import load_recording, recording_to_traffic, replay_recording
+from elevator.core.simulator import create_random_traffic_pattern
+
+TRAFFIC = {"elevators": 3, "floors": 10, "duration": 80, "density": 0.8, "seed": 3}
+
+
+def test_recording_round_trip(tmp_path, record):
+    """Test that a recording converts back into the original traffic"""
+    path = record(tmp_path)
+    traffic = create_random_traffic_pattern(
+        TRAFFIC["elevators"],
+        TRAFFIC["floors"],
+        duration=TRAFFIC["duration"],
+        density=TRAFFIC["density"],
+        seed=TRAFFIC["seed"],
+    )
+
+    recording = load_recording(path)
+    assert recording["metadata"]["elevator_capacity"] == 10
+    patterns = recording_to_traffic(recording)
+    assert len(patterns) == 1
+    pattern = patterns[0]
+    assert pattern.metadata["elevators"] == 3
+    assert pattern.metadata["floors"] == 10
+    assert pattern.metadata["duration"] == TRAFFIC["duration"]
+    assert pattern.metadata["dropped_passengers"] == 0
+    assert [(e.id, e.origin, e.destination, e.tick) for e in pattern.entries] == [
+        (e.id, e.origin, e.destination, e.tick) for e in traffic.entries
+    ]
+
+
+def test_replay_reproduces_metrics(tmp_path, record):
+    """Test that replaying with the same controller reproduces the run exactly"""
+    controller = LookV2Controller()
+    path = record(tmp_path, controller=controller)
+    original = controller.api_client.simulation.round_results
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        replayed = replay_recording(path, LookV2Controller)
+    assert len(replayed) == 1
+    assert replayed[0]["tick"] == TRAFFIC["duration"]
+    assert replayed[0]["metrics"] == original[0]["metrics"]
+
+
+def test_legacy_recording_uses_alight_floor():
+    """Test that recordings without destinations fall back to alight events"""
+    recording = {
+        "metadata": {"algorithm": "Old", "elevators": 1, "floors": 4},
+        "history": [
+            {"tick": 1, "events": [{"type": "up_button_pressed", "data": {"floor": 0, "passenger": 1}}]},
+            {"tick": 2, "events": [{"type": "down_button_pressed", "data": {"floor": 3, "passenger": 2}}]},
+            {"tick": 9, "events": [{"type": "passenger_alight", "data": {"elevator": 0, "floor": 2, "passenger": 1}}]},
+            {"tick": 1, "events": [{"type": "up_button_pressed", "data": {"floor": 1, "passenger": 1}}]},
+        ],
+    }
+    first, second = recording_to_traffic(recording, name="old")
+    assert [(e.id, e.origin, e.destination, e.tick) for e in first.entries] == [(1, 0, 2, 1)]
+    assert first.metadata["dropped_passengers"] == 1
+    assert first.metadata["duration"] == 9
+    assert second.name == "old_round1"
+    assert second.entries == []
@@ -0,0 +1,127 @@
+"""
+Test the destination-aware route planner and the Optimal LOOK controller
+"""
+
+import contextlib
+import io
+
+from elevator.client.local_client import LocalAPIClient
+from elevator.client.route_planner import DROPOFF, PICKUP, ElevatorPlan, ElevatorTask, RequestManager
+from elevator.client_examples.optimal_look import OptimalLookController
+from elevator.core.models import Direction
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+
+
+def _plan(position, direction=Direction.STOPPED, load=0, capacity=10):
+    plan = ElevatorPlan(0)
+    plan.update_state(position, direction, load, capacity)
+    return plan
+
+
+def test_insertion_rides_along_the_sweep():
+    """Test that a request on the way is inserted between existing stops"""
+    manager = RequestManager()
+    plan = _plan(0)
+    plan.apply(plan.best_insertion(manager.add_request(1, 0, 10, 0)))
+    assert [(t.floor, t.task_type) for t in plan.task_queue] == [(0, PICKUP), (10, DROPOFF)]
+
+    plan.apply(plan.best_insertion(manager.add_request(2, 3, 6, 0)))
+    assert [t.floor for t in plan.task_queue] == [0, 3, 6, 10]
+    assert plan.estimated_load == [1, 2, 1, 0]
+
+
+def test_feasibility_respects_direction_and_capacity():
+    """Test moving-direction, boarding-direction and capacity constraints"""
+    moving = _plan(5.5, Direction.UP)
+    assert not moving.is_feasible([ElevatorTask(4, DROPOFF, [1])])
+    assert moving.is_feasible([ElevatorTask(7, DROPOFF, [1])])
+
+    # 停靠中的电梯：出发方向决定哪些乘客上梯
+    stopped = _plan(5)
+    up = ElevatorTask(5, PICKUP, [1], Direction.UP)
+    assert stopped.is_feasible([up, ElevatorTask(8, DROPOFF, [1])])
+    assert not stopped.is_feasible([up, ElevatorTask(2, DROPOFF, [1])])
+
+    full = _plan(0, load=2, capacity=2)
+    assert not full.is_feasible([ElevatorTask(0, PICKUP, [1], Direction.UP), ElevatorTask(3, DROPOFF, [1])])
+    assert full.best_insertion(RequestManager().add_request(1, 0, 3, 0)) is None
+
+
+def test_ride_time_limit_rejects_long_detours():
+    """Test that riders are not dragged across the building for a new pickup"""
+    plan = _plan(10, load=1)
+    rider = ElevatorTask(12, DROPOFF, [1])
+    pickup = ElevatorTask(2, PICKUP, [2], Direction.DOWN)
+    dropoff = ElevatorTask(0, DROPOFF, [2])
+    assert not plan.is_feasible([pickup, dropoff, rider])
+    assert plan.is_feasible([rider, pickup, dropoff])
+    # 顺路的短暂绕行仍然允许
+    assert plan.is_feasible([ElevatorTask(11, PICKUP, [3], Direction.UP), rider, ElevatorTask(13, DROPOFF, [3])])
+
+
+def test_request_manager_pending_and_priority():
+    """Test pending order, assignment and aging priority"""
+    manager = RequestManager()
+    manager.add_request(2, 5, 1, arrive_tick=4)
+    first = manager.add_request(1, 0, 3, arrive_tick=2)
+    assert first.direction == Direction.UP
+    assert [r.passenger_id for r in manager.get_pending_requests()] == [1, 2]
+
+    manager.assign_request(1, 0)
+    assert [r.passenger_id for r in manager.get_pending_requests()] == [2]
+    manager.assign_request(1, None)
+    manager.mark_boarded(1, 0)
+    assert [r.passenger_id for r in manager.get_pending_requests()] == [2]
+
+    assert manager.calculate_priority(first, 2) == 1.0
+    assert manager.calculate_priority(first, 102) == 2.0
+    assert manager.remove(1) is first and manager.get(1) is None
+
+
+def test_optimal_look_completes_run():
+    """Test that the planner-driven controller delivers every passenger"""
+    traffic = create_random_traffic_pattern(3, 10, duration=60, density=0.5, seed=4)
+    traffic.metadata["duration"] = 400
+    simulation = ElevatorSimulation(traffic)
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = OptimalLookController()
+        controller.api_client = LocalAPIClient(simulation)
+        controller.recorder = None
+        controller.start()
+    metrics = simulation.round_results[0]["metrics"]
+    assert metrics["completed_passengers"] == metrics["total_passengers"] > 0
+
+
+def test_rebalance_moves_waiting_passenger_to_cheaper_car():
+    """Test that a passenger not yet picked up moves to a car that can serve it sooner"""
+    controller = OptimalLookController()
+    controller.plans = {0: _plan(9), 1: _plan(1)}
+    controller.plans[1].elevator_id = 1
+    request = controller.requests.add_request(1, 2, 4, 0)
+    controller.requests.calculate_priority(request, 0)
+    controller.plans[0].apply(controller.plans[0].best_insertion(request, request.priority))
+    controller.requests.assign_request(1, 0)
+
+    controller._rebalance()
+    assert request.assigned_elevator == 1
+    assert not controller.plans[0].task_queue
+    assert [task.floor for task in controller.plans[1].task_queue] == [2, 4]
+
+
+def test_idle_car_serves_untracked_waiting_passengers():
+    """Test that an idle car picks up passengers the controller never saw a call for"""
+
+    class MissedCalls(OptimalLookController):
+        def on_passenger_call(self, passenger, floor, direction):
+            pass
+
+    traffic = create_random_traffic_pattern(2, 6, duration=40, density=0.3, seed=1)
+    traffic.metadata["duration"] = 300
+    simulation = ElevatorSimulation(traffic)
+    with contextlib.redirect_stdout(io.StringIO()):
+        controller = MissedCalls()
+        controller.api_client = LocalAPIClient(simulation)
+        controller.recorder = None
+        controller.start()
+    metrics = simulation.round_results[0]["metrics"]
+    assert metrics["completed_passengers"] == metrics["total_passengers"] > 0
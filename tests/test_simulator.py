@@ -0,0 +1,107 @@
+"""
+Test the local simulation engine
+"""
+
+from elevator.core.models import EventType, create_simple_traffic_pattern
+from elevator.core.simulator import ElevatorSimulation, create_random_traffic_pattern
+
+
+def _make_simulation(passengers, floors=6, elevators=1, duration=100):
+    traffic = create_simple_traffic_pattern("test", passengers)
+    traffic.metadata.update({"elevators": elevators, "floors": floors, "duration": duration})
+    return ElevatorSimulation(traffic)
+
+
+def _event_types(events):
+    return [e.type for e in events if e.type != EventType.ELEVATOR_MOVE]
+
+
+def test_idle_and_call_events_on_first_tick():
+    """Test that idle elevators and new passengers are reported on the first tick"""
+    sim = _make_simulation([(1, 0, 1)])
+    events = sim.step(1)
+
+    assert _event_types(events) == [EventType.IDLE, EventType.DOWN_BUTTON_PRESSED]
+    assert sim.get_state()["floors"][1]["down_queue"] == [1]
+
+
+def test_one_floor_trip_timing():
+    """Test the start_up -> constant_speed -> start_down -> stopped cycle for one floor"""
+    sim = _make_simulation([])
+    sim.step(1)
+    sim.elevator_go_to_floor(0, 1)
+
+    stop_tick = None
+    approaching_tick = None
+    for _ in range(10):
+        for event in sim.step(1):
+            if event.type == EventType.ELEVATOR_APPROACHING:
+                approaching_tick = event.tick
+            if event.type == EventType.STOPPED_AT_FLOOR:
+                stop_tick = event.tick
+        if stop_tick:
+            break
+
+    assert approaching_tick == 6
+    assert stop_tick == 7
+    elevator = sim.get_state()["elevators"][0]
+    assert elevator["position"] == {"current_floor": 1, "target_floor": 1, "floor_up_position": 0}
+    assert elevator["run_status"] == "stopped"
+
+
+def test_boarding_requires_matching_direction():
+    """Test that passengers board on departure only in the matching direction"""
+    sim = _make_simulation([(0, 3, 1), (0, 2, 1)])
+    sim.step(1)
+    sim.elevator_go_to_floor(0, 3)
+    events = sim.step(1)
+
+    boarded = [e.data["passenger"] for e in events if e.type == EventType.PASSENGER_BOARD]
+    assert boarded == [1, 2]
+
+    alighted = []
+    for _ in range(40):
+        alighted += [e.data["passenger"] for e in sim.step(1) if e.type == EventType.PASSENGER_ALIGHT]
+    # 只前往F3，F2的乘客不会下梯
+    assert alighted == [1]
+
+
+def test_traffic_rounds_and_metrics():
+    """Test traffic switching records the finished round"""
+    traffic = create_random_traffic_pattern(2, 6, duration=20, density=0.5, seed=3)
+    sim = ElevatorSimulation([traffic, traffic])
+    sim.step(5)
+
+    assert sim.get_traffic_info()["max_tick"] == 20
+    assert sim.next_traffic_round()
+    assert sim.tick == 0
+    assert not sim.next_traffic_round()
+    assert sim.get_traffic_info()["max_tick"] == 0
+    assert sim.next_traffic_round(full_reset=True)
+    assert sim.get_traffic_info()["current_index"] == 0
+    assert sim.round_results[0]["tick"] == 5
+
+
+def test_fork_is_isolated_from_parent():
+    """Test that forks share records copy-on-write without leaking changes"""
+    traffic = create_random_traffic_pattern(4, 10, duration=100, density=1.0, seed=5)
+    sim = ElevatorSimulation(traffic)
+    sim.step(10)
+    snapshot = sim.snapshot()
+    before = sim.get_state()
+
+    fork = sim.fork()
+    # 未修改的记录在分支间共享
+    assert fork.state.floors[9] is sim.state.floors[9]
+
+    fork.elevator_go_to_floor(0, 9)
+    fork.step(30)
+    assert sim.get_state() == before
+
+    sim.elevator_go_to_floor(1, 5)
+    sim.step(5)
+    assert snapshot.fork().get_state() == before
+
+    sim.restore(snapshot)
+    assert sim.get_state() == before
+    assert len(sim.passengers) == before["metrics"]["total_passengers"]